@@ -0,0 +1,145 @@
+# batching.py
+import asyncio
+import inspect
+import time
+from collections import deque
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+
+class PredictionBatcher:
+    """Coalesce concurrent single-record predictions into vectorized batches.
+
+    Callers ``await submit(features, key)``. A background task collects
+    requests for up to ``window_ms`` milliseconds or ``max_batch`` requests,
+    whichever comes first, runs ``predict_batch(records, key)`` (plain or
+    async) once per distinct ``key`` object in the batch (e.g. the models)
+    and resolves each caller's future with its own result. A result that
+    is an exception fails only its own caller, so ``predict_batch`` should
+    validate records itself; an exception it raises fails the whole batch.
+    """
+
+    def __init__(self, predict_batch, window_ms=2.0, max_batch=256, wait_samples=10000):
+        self.predict_batch = predict_batch
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = None
+        self._worker = None
+
+        # Metrics
+        self.batches = 0
+        self.requests = 0
+        self.max_batch_size = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self._recent_waits = deque(maxlen=wait_samples)
+
+    def _ensure_worker(self):
+        """Start the collector task on the running event loop if needed.
+
+        A restarted collector keeps the existing queue, so requests already
+        waiting in it are still served.
+        """
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, features, key=None):
+        """Queue one feature dict and wait for its prediction."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((features, future, time.perf_counter(), key))
+        return await future
+
+    async def _collect(self):
+        """Wait for the first request, then gather more until the window closes."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self._record(batch)
+            # Keys need not be hashable (e.g. a model dict), so group by identity
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[3]), (item[3], []))[1].append(item)
+            for key, group in groups.values():
+                await self._dispatch(group, key)
+
+    async def _dispatch(self, batch, key):
+        """Run one prediction for the batch and resolve every caller."""
+        try:
+            results = await self._predict([features for features, _, _, _ in batch], key)
+        except Exception as e:
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _predict(self, records, key):
+        result = self.predict_batch(records, key)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _record(self, batch):
+        now = time.perf_counter()
+        size = len(batch)
+        self.batches += 1
+        self.requests += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        bucket = next((i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if size <= bound), len(BATCH_SIZE_BUCKETS))
+        self.batch_size_counts[bucket] += 1
+        for _, _, enqueued, _ in batch:
+            wait = now - enqueued
+            self.queue_wait_total += wait
+            self.queue_wait_max = max(self.queue_wait_max, wait)
+            self._recent_waits.append(wait)
+
+    def stats(self):
+        """Return batch-size and queue-wait metrics."""
+        waits = np.fromiter(self._recent_waits, dtype=float)
+        percentiles = np.percentile(waits, [50, 99]) * 1000 if len(waits) else [0.0, 0.0]
+        labels = [f"<={bound}" for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "batch_size_histogram": dict(zip(labels, self.batch_size_counts)),
+            "queue_wait_ms": {
+                "mean": self.queue_wait_total / self.requests * 1000 if self.requests else 0.0,
+                "p50": float(percentiles[0]),
+                "p99": float(percentiles[1]),
+                "max": self.queue_wait_max * 1000
+            },
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0
+        }
@@ -0,0 +1,51 @@
+# binary.py
+"""Compact binary wire format for high-volume prediction clients.
+
+Request body (``FEATURES_CONTENT_TYPE``): a row-major little-endian
+float32 matrix with one row per record and one column per feature, in the
+model's ``feature_names`` order (see ``GET /predict/binary/schema``).
+Categorical columns carry their raw codes. There is no header; the row
+count follows from the body length.
+
+Response body (``PREDICTIONS_CONTENT_TYPE``): ``n`` little-endian int32
+cluster ids followed by ``n`` little-endian float32 confidences. The row
+count is also sent in the ``X-Rows`` header.
+"""
+import numpy as np
+
+FEATURES_CONTENT_TYPE = "application/x-adaptnet-features-f32"
+PREDICTIONS_CONTENT_TYPE = "application/x-adaptnet-predictions"
+FEATURE_DTYPE = np.dtype("<f4")
+CLUSTER_DTYPE = np.dtype("<i4")
+CONFIDENCE_DTYPE = np.dtype("<f4")
+
+def decode_features(body, n_features):
+    """View a request body as an ``(n, n_features)`` float32 matrix without copying."""
+    row_bytes = n_features * FEATURE_DTYPE.itemsize
+    if len(body) % row_bytes:
+        raise ValueError(
+            f"Body length {len(body)} is not a multiple of {row_bytes} bytes "
+            f"({n_features} float32 features per row)"
+        )
+    return np.frombuffer(body, dtype=FEATURE_DTYPE).reshape(-1, n_features)
+
+def encode_predictions(clusters, confidences):
+    return (np.asarray(clusters, dtype=CLUSTER_DTYPE).tobytes()
+            + np.asarray(confidences, dtype=CONFIDENCE_DTYPE).tobytes())
+
+# Client-side helpers
+
+def encode_features(records, feature_names):
+    """Pack feature dicts (or a dict of columns) into a request body."""
+    if isinstance(records, dict):
+        X = np.column_stack([np.asarray(records[name], dtype=FEATURE_DTYPE) for name in feature_names])
+    else:
+        X = np.array([[record[name] for name in feature_names] for record in records], dtype=FEATURE_DTYPE)
+    return np.ascontiguousarray(X).tobytes()
+
+def decode_predictions(body):
+    """Split a response body into ``(clusters, confidences)`` arrays without copying."""
+    n = len(body) // (CLUSTER_DTYPE.itemsize + CONFIDENCE_DTYPE.itemsize)
+    clusters = np.frombuffer(body, dtype=CLUSTER_DTYPE, count=n)
+    confidences = np.frombuffer(body, dtype=CONFIDENCE_DTYPE, count=n, offset=n * CLUSTER_DTYPE.itemsize)
+    return clusters, confidences
@@ -0,0 +1,141 @@
+# bulk.py
+"""Chunked bulk scoring of CSV/Parquet datasets with the saved model artifacts.
+
+Command line usage (from the repository root):
+
+    python -m app.bulk data/climate_vulnerability_dataset.csv scored.csv --chunksize 50000
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from app.model_utils import load_all_models, predict_compiled_batch
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# Text categories as mapped by AdaptationNetTrainer; unknown values become 0
+CATEGORY_MAPPINGS = {
+    "Climate_Risk_Level": {
+        "Very Low": 0,
+        "Low": 1,
+        "Medium": 2,
+        "High": 3,
+        "Very High": 4
+    },
+    "Land_Use_Type": {
+        "Natural": 0,
+        "Agricultural": 1,
+        "Urban": 2,
+        "Mixed": 3
+    }
+}
+
+def detect_format(filename, default="csv"):
+    """Guess the input format from a file name."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext == ".csv":
+        return "csv"
+    return default
+
+def iter_chunks(source, fmt="csv", chunksize=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of at most ``chunksize`` rows from a path or file object."""
+    # pandas is imported here so that importing the API does not pull it in
+    import pandas as pd
+
+    if fmt == "csv":
+        yield from pd.read_csv(source, chunksize=chunksize)
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet input requires pyarrow to be installed")
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported format '{fmt}', expected 'csv' or 'parquet'")
+
+def score_chunk(chunk, compiled):
+    """Add ``Cluster`` and ``Confidence`` columns to one chunk, preprocessing it like the trainer does."""
+    import pandas as pd
+
+    numerical_cols = compiled["numerical_cols"]
+    categorical_cols = compiled["categorical_cols"]
+    missing = [col for col in numerical_cols + categorical_cols if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    columns = {}
+    # Missing numbers are imputed with the training mean, i.e. the scaler mean
+    for i, col in enumerate(numerical_cols):
+        values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64)
+        columns[col] = np.where(np.isnan(values), compiled["mean"][i], values)
+    for col in categorical_cols:
+        values = chunk[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values.map(CATEGORY_MAPPINGS.get(col, {}))
+        columns[col] = values.fillna(0).to_numpy(dtype=np.float64)
+
+    chunk["Cluster"], chunk["Confidence"] = predict_compiled_batch(columns, compiled, return_confidence=True)
+    return chunk
+
+def score_file(source, compiled, fmt="csv", chunksize=DEFAULT_CHUNK_SIZE):
+    """Yield cluster-labelled chunks of ``source``."""
+    for chunk in iter_chunks(source, fmt, chunksize):
+        yield score_chunk(chunk, compiled)
+
+def iter_csv(chunks):
+    """Serialize labelled chunks as one CSV document, writing the header once."""
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header)
+        header = False
+
+def write_scored(chunks, output_path):
+    """Write labelled chunks to a CSV or Parquet file one chunk at a time."""
+    rows = 0
+    if detect_format(output_path) == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(output_path, "w", newline="") as f:
+            header = True
+            for chunk in chunks:
+                chunk.to_csv(f, index=False, header=header)
+                header = False
+                rows += len(chunk)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign clusters to every row of a CSV or Parquet file.")
+    parser.add_argument("input", help="Input .csv or .parquet file")
+    parser.add_argument("output", help="Output .csv or .parquet file")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="Input format (default: from extension)")
+    args = parser.parse_args()
+
+    try:
+        models = load_all_models()
+        fmt = args.format or detect_format(args.input)
+        rows = write_scored(score_file(args.input, models["compiled"], fmt, args.chunksize), args.output)
+        print(f"Scored {rows} rows into {args.output}")
+    except Exception as e:
+        print(f"Bulk scoring failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# bundle.py
+"""Compact binary model bundle holding only the arrays needed for inference.
+
+Layout (all integers little-endian):
+
+    0   4s   magic b"ADNB"
+    4   H    format version
+    6   H    reserved
+    8   Q    header length in bytes
+    16  32s  SHA-256 of the header and payload
+    48  ...  UTF-8 JSON header (feature order, array table, metadata)
+    ...      payload: raw arrays, each aligned to 64 bytes
+
+The loader memory-maps the file and builds NumPy views on it, so it needs
+neither sklearn nor pandas.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"ADNB"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<4sHHQ32s")
+ALIGNMENT = 64
+
+class BundleError(Exception):
+    """Raised when a bundle is missing, corrupt or of an unsupported version."""
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def write_bundle(path, compiled, source_version=None):
+    """Write the arrays of a compiled model (see ``compile_models``) to ``path``."""
+    arrays = {
+        "mean": compiled["mean"],
+        "scale": compiled["scale"],
+        "centers": compiled["centers"]
+    }
+    for col, classes in compiled["encoder_classes"].items():
+        arrays[f"encoder_classes/{col}"] = classes
+
+    table, chunks, offset = {}, [], 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        dtype = array.dtype.newbyteorder("<")
+        data = array.astype(dtype, copy=False).tobytes()
+        offset = _align(offset)
+        table[name] = {"dtype": dtype.str, "shape": list(array.shape), "offset": offset}
+        chunks.append((offset, data))
+        offset += len(data)
+
+    payload = bytearray(offset)
+    for start, data in chunks:
+        payload[start:start + len(data)] = data
+
+    header = json.dumps({
+        "numerical_cols": compiled["numerical_cols"],
+        "categorical_cols": compiled["categorical_cols"],
+        "source_version": source_version,
+        "arrays": table
+    }, sort_keys=True).encode("utf-8")
+    # Pad the header so the payload starts on an aligned file offset
+    header += b" " * (_align(PREAMBLE.size + len(header)) - PREAMBLE.size - len(header))
+
+    digest = hashlib.sha256(header)
+    digest.update(payload)
+    preamble = PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header), digest.digest())
+
+    # Write to a temporary file and rename so readers never see a partial bundle
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(preamble)
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return digest.hexdigest()[:12]
+
+def load_bundle(path, verify=True):
+    """Memory-map a bundle and return ``(compiled, metadata)``.
+
+    ``compiled`` has the same keys as ``compile_models`` produces; its arrays
+    are read-only views on the mapped file.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        raise BundleError(f"Model bundle not found: {path}")
+    except ValueError:
+        raise BundleError(f"Model bundle is empty: {path}")
+
+    if len(buffer) < PREAMBLE.size:
+        raise BundleError(f"Model bundle is truncated: {path}")
+    magic, version, _, header_len, checksum = PREAMBLE.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise BundleError(f"Not a model bundle: {path}")
+    if version != FORMAT_VERSION:
+        raise BundleError(f"Unsupported bundle version {version} (expected {FORMAT_VERSION})")
+    if verify and hashlib.sha256(memoryview(buffer)[PREAMBLE.size:]).digest() != checksum:
+        raise BundleError(f"Model bundle checksum mismatch: {path}")
+
+    header = json.loads(bytes(buffer[PREAMBLE.size:PREAMBLE.size + header_len]))
+    payload_start = PREAMBLE.size + header_len
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=payload_start + spec["offset"]
+        ).reshape(spec["shape"])
+
+    numerical_cols = header["numerical_cols"]
+    categorical_cols = header["categorical_cols"]
+    encoder_classes = {col: arrays[f"encoder_classes/{col}"] for col in categorical_cols}
+    compiled = {
+        "feature_names": numerical_cols + categorical_cols,
+        "numerical_cols": numerical_cols,
+        "categorical_cols": categorical_cols,
+        "encoder_tables": {
+            col: {int(value): index for index, value in enumerate(classes)}
+            for col, classes in encoder_classes.items()
+        },
+        "encoder_classes": encoder_classes,
+        "mean": arrays["mean"],
+        "scale": arrays["scale"],
+        "centers": arrays["centers"]
+    }
+    metadata = {
+        "format_version": version,
+        "checksum": checksum.hex(),
+        "source_version": header.get("source_version")
+    }
+    return compiled, metadata
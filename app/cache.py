@@ -0,0 +1,98 @@
+# cache.py
+import time
+from collections import OrderedDict
+
+def parse_quantization(spec):
+    """Parse ``"Latitude=0.01,Longitude=0.01"`` into ``{"Latitude": 0.01, ...}``."""
+    steps = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, step = item.partition("=")
+        try:
+            steps[name.strip()] = float(step)
+        except ValueError:
+            raise ValueError(f"Invalid quantization step for '{name.strip()}': '{step}'")
+        if steps[name.strip()] <= 0:
+            raise ValueError(f"Quantization step for '{name.strip()}' must be positive")
+    return steps
+
+class PredictionCache:
+    """Bounded LRU cache of predictions keyed on quantized feature vectors.
+
+    Each feature listed in ``quantization`` is snapped to a multiple of its
+    step before building the key, so nearby inputs share one entry; other
+    features must match exactly. Entries older than ``ttl`` seconds are
+    treated as misses. Entries are stored per model version, so versions
+    served side by side never see each other's predictions.
+    """
+
+    def __init__(self, feature_names, max_size=10000, ttl=None, quantization=None):
+        quantization = quantization or {}
+        unknown = set(quantization) - set(feature_names)
+        if unknown:
+            raise ValueError(f"Quantization given for unknown features: {sorted(unknown)}")
+        self.feature_names = list(feature_names)
+        self.steps = [quantization.get(name) for name in self.feature_names]
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, features):
+        """Return the cache key for ``features``, or None if a feature is missing."""
+        try:
+            return tuple(
+                round(features[name] / step) if step else features[name]
+                for name, step in zip(self.feature_names, self.steps)
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get(self, key, version):
+        """Return the cached value for ``key`` under ``version`` or None on a miss."""
+        if key is not None:
+            key = (version, key)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        value, stored_at = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, version):
+        """Store ``value`` under ``key``, evicting the least recently used entry if full."""
+        if key is None or self.max_size <= 0:
+            return
+        key = (version, key)
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "quantization": {
+                name: step for name, step in zip(self.feature_names, self.steps) if step
+            },
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
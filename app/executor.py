@@ -0,0 +1,143 @@
+# executor.py
+import asyncio
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.model_utils import (
+    load_all_models, predict_compiled, predict_compiled_batch, predict_compiled_matrix, predict_compiled_records
+)
+from app.profiling import INFERENCE_THREAD_PREFIX
+from app.registry import ModelVersionUnavailable
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+class ExecutorSaturated(Exception):
+    """Raised when the inference backend has no free queue slots."""
+
+# Prediction tasks. They take the model dict as their first argument so the
+# same function runs against the parent's models or a worker's own copy.
+
+def predict_single(models, features):
+    """Return ``(cluster, confidence)`` for one feature dict."""
+    return predict_compiled(features, models["compiled"], return_confidence=True)
+
+def predict_many(models, records):
+    """Return ``(clusters, confidences)`` arrays for a batch."""
+    return predict_compiled_batch(records, models["compiled"], return_confidence=True)
+
+def predict_records(models, records):
+    """Return ``(clusters, confidences, errors)`` for feature dicts; bad records only get an error."""
+    return predict_compiled_records(records, models["compiled"])
+
+def predict_matrix(models, X):
+    """Return ``(clusters, confidences)`` arrays for a raw feature matrix."""
+    return predict_compiled_matrix(X, models["compiled"], return_confidence=True)
+
+# Process-pool workers keep their own copies of recently used model versions,
+# keyed by version. The artifacts on disk are loaded once in the pool
+# initializer; any other version is shipped by the parent the first time a
+# worker is asked for it, and kept from then on.
+WORKER_MAX_VERSIONS = 3
+_worker_models = OrderedDict()
+
+def _keep_worker_models(models):
+    _worker_models[models["version"]] = models
+    _worker_models.move_to_end(models["version"])
+    while len(_worker_models) > WORKER_MAX_VERSIONS:
+        _worker_models.popitem(last=False)
+
+def _init_worker():
+    try:
+        _keep_worker_models(load_all_models())
+    except Exception as e:
+        print(f"Error loading models in worker: {str(e)}")
+
+def _run_in_worker(task, version, args):
+    models = _worker_models.get(version)
+    if models is None:
+        # Reloading from disk could give yet another version; the parent ships the models
+        raise ModelVersionUnavailable(f"Model version '{version}' is not loaded in worker {os.getpid()}")
+    return task(models, *args)
+
+def _run_with_models(task, models, args):
+    _keep_worker_models(models)
+    return task(models, *args)
+
+def _portable(models):
+    """The part of a model dict the tasks need, cheap to pickle to a worker."""
+    return {key: models[key] for key in ("compiled", "version", "format")}
+
+class InferenceExecutor:
+    """Dispatch CPU-bound prediction work away from the event loop.
+
+    ``mode`` is one of ``inline`` (run on the event loop, as before),
+    ``thread`` or ``process``. At most ``max_pending`` tasks may be queued
+    or running at once; further submissions raise ``ExecutorSaturated``.
+    """
+
+    def __init__(self, mode="inline", max_workers=None, max_pending=64):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._pool = None
+
+        # Metrics
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.model_transfers = 0
+
+    def _get_pool(self):
+        # Pools are created on first use so that no threads or worker
+        # processes exist before a forking launcher has forked
+        if self._pool is None:
+            if self.mode == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=INFERENCE_THREAD_PREFIX)
+            else:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+        return self._pool
+
+    async def run(self, task, models, *args):
+        """Run ``task(models, *args)`` on the configured backend.
+
+        Process workers look ``models`` up by version; the full models are
+        only pickled over to a worker that does not have that version.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorSaturated(f"Inference queue is full ({self.max_pending} pending)")
+
+        self.pending += 1
+        try:
+            if self.mode == "inline":
+                return task(models, *args)
+            loop = asyncio.get_running_loop()
+            if self.mode == "thread":
+                return await loop.run_in_executor(self._get_pool(), task, models, *args)
+            try:
+                return await loop.run_in_executor(self._get_pool(), _run_in_worker, task, models["version"], args)
+            except ModelVersionUnavailable:
+                self.model_transfers += 1
+                return await loop.run_in_executor(self._get_pool(), _run_with_models, task, _portable(models), args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers if self.mode != "inline" else 0,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "model_transfers": self.model_transfers
+        }
@@ -88,23 +88,218 @@
 
 
 
-from typing import Dict
-from fastapi import FastAPI, HTTPException
-from app.model_utils import load_all_models, preprocess_input
+import os
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from fastapi import FastAPI, File, Header, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.batching import PredictionBatcher
+from app.binary import FEATURES_CONTENT_TYPE, PREDICTIONS_CONTENT_TYPE, decode_features, encode_predictions
+from app.bulk import DEFAULT_CHUNK_SIZE, detect_format, iter_csv, score_file
+from app.cache import PredictionCache, parse_quantization
+from app.executor import (
+    ExecutorSaturated, InferenceExecutor, predict_many, predict_matrix, predict_records, predict_single
+)
+from app.metrics import MetricsMiddleware, MetricsRegistry
+from app.profiling import ProfilingMiddleware, SamplingProfiler
+from app.registry import ModelRegistry, ModelVersionUnavailable
+from app.spatial import DEFAULT_CELL_DEG, load_spatial_index
 from pydantic import BaseModel, Field
 
+# Request coalescing for /predict (off by default)
+BATCHING_ENABLED = os.environ.get("ADAPTNET_BATCHING", "0") == "1"
+BATCH_WINDOW_MS = float(os.environ.get("ADAPTNET_BATCH_WINDOW_MS", 2.0))
+BATCH_MAX_SIZE = int(os.environ.get("ADAPTNET_BATCH_MAX_SIZE", 256))
+
+# Where prediction work runs: inline on the event loop, a thread pool or a process pool
+EXECUTOR_MODE = os.environ.get("ADAPTNET_EXECUTOR", "inline")
+EXECUTOR_WORKERS = int(os.environ.get("ADAPTNET_EXECUTOR_WORKERS", os.cpu_count() or 1))
+EXECUTOR_MAX_PENDING = int(os.environ.get("ADAPTNET_EXECUTOR_MAX_PENDING", 64))
+RETRY_AFTER_SECONDS = int(os.environ.get("ADAPTNET_RETRY_AFTER", 1))
+
+# Prediction cache (ADAPTNET_CACHE_SIZE=0 disables it)
+CACHE_SIZE = int(os.environ.get("ADAPTNET_CACHE_SIZE", 10000))
+CACHE_TTL = float(os.environ["ADAPTNET_CACHE_TTL"]) if os.environ.get("ADAPTNET_CACHE_TTL") else None
+CACHE_QUANTIZATION = parse_quantization(os.environ.get("ADAPTNET_CACHE_QUANTIZATION", ""))
+
+# Model registry: how many versions stay loaded for pinned clients, how often
+# to poll models/ for new artifacts (0 = only via /admin/reload) and the token
+# the admin endpoints require (unset = no check)
+MODEL_MAX_VERSIONS = int(os.environ.get("ADAPTNET_MODEL_MAX_VERSIONS", 3))
+MODEL_POLL_SECONDS = float(os.environ.get("ADAPTNET_MODEL_POLL_SECONDS", 0))
+ADMIN_TOKEN = os.environ.get("ADAPTNET_ADMIN_TOKEN")
+# With several pre-forked workers (app/server.py) an admin request would only
+# reach the worker that answers it, so the admin endpoints are refused and
+# every worker polls models/ instead, at least this often
+MULTI_WORKER_POLL_SECONDS = float(os.environ.get("ADAPTNET_MULTI_WORKER_POLL_SECONDS", 5))
+
+# Spatial index over models/clustered_data.csv (ADAPTNET_SPATIAL_INDEX=0 disables it)
+SPATIAL_INDEX_ENABLED = os.environ.get("ADAPTNET_SPATIAL_INDEX", "1") == "1"
+SPATIAL_CELL_DEG = float(os.environ.get("ADAPTNET_SPATIAL_CELL_DEG", DEFAULT_CELL_DEG))
+SPATIAL_MAX_RESULTS = int(os.environ.get("ADAPTNET_SPATIAL_MAX_RESULTS", 1000))
+
+# Prometheus metrics at /metrics (ADAPTNET_METRICS=0 disables them)
+METRICS_ENABLED = os.environ.get("ADAPTNET_METRICS", "1") == "1"
+
 app = FastAPI(
     title="AdaptNet Climate Adaptation API",
     description="API for climate adaptation recommendations using machine learning",
     version="1.0.0"
 )
+# Number of worker processes serving this app; app/server.py sets it before forking
+app.state.workers = 1
+
+cache = None
+spatial_index = None
+
+metrics = MetricsRegistry()
+REQUESTS = metrics.counter(
+    "adaptnet_requests_total", "HTTP requests by endpoint, method and status.", ("endpoint", "method", "status")
+)
+REQUEST_LATENCY = metrics.histogram(
+    "adaptnet_request_duration_seconds", "End-to-end request latency by endpoint.", ("endpoint",)
+)
+STAGE_LATENCY = metrics.histogram(
+    "adaptnet_stage_duration_seconds",
+    "Time spent in each stage of a request: parse_validate (body parsing and pydantic "
+    "validation), cache, inference (preprocessing and cluster assignment) and serialization.",
+    ("endpoint", "stage")
+)
+CLUSTER_ASSIGNMENTS = metrics.counter(
+    "adaptnet_cluster_assignments_total", "Records assigned to each cluster.", ("model_version", "cluster")
+)
+
+def observe_stage(endpoint, stage, start):
+    """Record the time since ``start`` for one stage; returns the current time."""
+    now = time.perf_counter()
+    if METRICS_ENABLED:
+        STAGE_LATENCY.observe(now - start, endpoint, stage)
+    return now
+
+def observe_parse_validate(request, endpoint):
+    """Time from the request arriving to the handler running, i.e. parsing and validation."""
+    start = request.scope.get("adaptnet.start")
+    if start is None:
+        return time.perf_counter()
+    return observe_stage(endpoint, "parse_validate", start)
+
+def count_assignments(version, clusters):
+    if METRICS_ENABLED:
+        for cluster, count in enumerate(np.bincount(clusters)):
+            if count:
+                CLUSTER_ASSIGNMENTS.inc(version, cluster, amount=int(count))
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, requests=REQUESTS, latency=REQUEST_LATENCY)
+
+# Off until started through /admin/profile/start
+profiler = SamplingProfiler()
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+def on_models_swapped(previous, models):
+    """(Re)build the prediction cache and spatial index for the new models."""
+    global cache, spatial_index
+    if SPATIAL_INDEX_ENABLED:
+        # The index depends on the scaler, so it follows the active version
+        try:
+            spatial_index = load_spatial_index(registry.model_dir, models, cell_deg=SPATIAL_CELL_DEG)
+        except Exception as e:
+            print(f"Error loading spatial index: {str(e)}")
+    if CACHE_SIZE <= 0:
+        return
+    if cache is None or cache.feature_names != models["compiled"]["feature_names"]:
+        cache = PredictionCache(
+            models["compiled"]["feature_names"],
+            max_size=CACHE_SIZE,
+            ttl=CACHE_TTL,
+            quantization=CACHE_QUANTIZATION
+        )
 
 # Load models
+registry = ModelRegistry(max_versions=MODEL_MAX_VERSIONS, on_swap=on_models_swapped)
 try:
-    models = load_all_models()
+    registry.reload()
 except Exception as e:
     print(f"Error loading models: {str(e)}")
-    models = None
+
+executor = InferenceExecutor(
+    mode=EXECUTOR_MODE,
+    max_workers=EXECUTOR_WORKERS,
+    max_pending=EXECUTOR_MAX_PENDING
+)
+
+# Values owned by other components are only read when /metrics is scraped
+metrics.collected(
+    "adaptnet_model_info", "The active model version (value is always 1).",
+    lambda: {(registry.active["version"], registry.active["format"]): 1} if registry.active is not None else {},
+    ("version", "format")
+)
+metrics.collected(
+    "adaptnet_model_load_seconds", "Seconds taken to load and validate each resident model version.",
+    lambda: {(version,): models.get("load_seconds") for version, models in registry.resident_versions()},
+    ("version",)
+)
+metrics.collected(
+    "adaptnet_model_reloads_total", "Model reload attempts by outcome.",
+    lambda: {("success",): registry.reloads, ("failure",): registry.failed_reloads},
+    ("outcome",), kind="counter"
+)
+metrics.collected(
+    "adaptnet_cache_lookups_total", "Prediction cache lookups by result.",
+    lambda: {("hit",): cache.hits, ("miss",): cache.misses} if cache is not None else {},
+    ("result",), kind="counter"
+)
+metrics.collected(
+    "adaptnet_executor_pending", "Prediction tasks queued or running.",
+    lambda: {(): executor.pending}
+)
+
+async def _predict_coalesced(records, models):
+    # Invalid records get their own error; the rest of the batch is still scored
+    clusters, confidences, errors = await executor.run(predict_records, models, records)
+    return [
+        Exception(f"Error preprocessing input: {errors[i]}") if i in errors else result
+        for i, result in enumerate(zip(clusters.tolist(), confidences.tolist()))
+    ]
+
+batcher = None
+if BATCHING_ENABLED:
+    batcher = PredictionBatcher(
+        _predict_coalesced,
+        window_ms=BATCH_WINDOW_MS,
+        max_batch=BATCH_MAX_SIZE
+    )
+
+def resolve_models(version: Optional[str]):
+    """Return the pinned model version if one was requested, else the active one."""
+    try:
+        models = registry.get(version)
+    except ModelVersionUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if models is None:
+        raise HTTPException(status_code=500, detail="Models not loaded")
+    registry.record_request(models["version"])
+    return models
+
+def check_admin_token(token: Optional[str]):
+    if app.state.workers > 1:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Admin actions would only reach one of {app.state.workers} workers; run a single worker "
+                   "to use them (new models in models/ are picked up by polling)"
+        )
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def service_unavailable(e: ExecutorSaturated) -> HTTPException:
+    """Tell clients to back off when the inference queue is full."""
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
 
 class InputData(BaseModel):
     features: Dict[str, float] = Field(
@@ -126,51 +321,309 @@ class PredictionResponse(BaseModel):
     recommendations: list[str]
     confidence: float
 
+class BatchInputData(BaseModel):
+    """Either a list of feature dicts or a dict of feature columns."""
+    records: Optional[List[Dict[str, float]]] = None
+    columns: Optional[Dict[str, List[float]]] = None
+
 @app.get("/")
 async def root():
+    models = registry.active
     return {
         "status": "active",
         "model_status": "loaded" if models is not None else "not loaded",
+        "model_version": models["version"] if models is not None else None,
+        "model_format": models["format"] if models is not None else None,
         "version": "1.0.0"
     }
 
+@app.on_event("startup")
+async def startup():
+    poll_seconds = MODEL_POLL_SECONDS
+    if app.state.workers > 1:
+        # Polling is the only way every worker picks up the same new version
+        poll_seconds = min(poll_seconds or MULTI_WORKER_POLL_SECONDS, MULTI_WORKER_POLL_SECONDS)
+    registry.start_polling(poll_seconds)
+
+@app.on_event("shutdown")
+async def shutdown():
+    registry.stop_polling()
+    executor.shutdown()
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition of request, stage, model and cache metrics."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+async def stats():
+    return {
+        "batching": batcher.stats() if batcher is not None else None,
+        "executor": executor.stats(),
+        "cache": cache.stats() if cache is not None else None,
+        "models": registry.stats(),
+        "spatial_index": spatial_index.stats() if spatial_index is not None else None,
+        "profiler": profiler.stats()
+    }
+
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: Optional[str] = Header(None)):
+    """Load, validate and activate the artifacts currently in models/."""
+    check_admin_token(x_admin_token)
+    try:
+        swapped = await run_in_threadpool(registry.reload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving the previous version: {str(e)}")
+    return {"reloaded": swapped, "active_version": registry.active["version"]}
+
+@app.post("/admin/activate/{version}")
+async def admin_activate(version: str, x_admin_token: Optional[str] = Header(None)):
+    """Switch back (or forward) to a version that is still resident."""
+    check_admin_token(x_admin_token)
+    try:
+        registry.activate(version)
+    except ModelVersionUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"active_version": version}
+
+@app.post("/admin/profile/start")
+async def admin_profile_start(
+    fraction: float = 1.0,
+    seconds: Optional[float] = None,
+    interval_ms: float = 1.0,
+    reset: bool = True,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Sample ``fraction`` of requests, for ``seconds`` if given (else until stopped)."""
+    check_admin_token(x_admin_token)
+    if interval_ms <= 0:
+        raise HTTPException(status_code=422, detail="interval_ms must be positive")
+    try:
+        profiler.start(fraction=fraction, seconds=seconds, interval=interval_ms / 1000.0, reset=reset)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return profiler.stats()
+
+@app.post("/admin/profile/stop")
+async def admin_profile_stop(x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    profiler.stop()
+    return profiler.stats()
+
+@app.get("/admin/profile")
+async def admin_profile(x_admin_token: Optional[str] = Header(None)):
+    """Download the aggregated stacks in collapsed format (flamegraph.pl, speedscope)."""
+    check_admin_token(x_admin_token)
+    return Response(
+        profiler.collapsed(),
+        media_type="text/plain",
+        headers={"Content-Disposition": 'attachment; filename="adaptnet-profile.folded"'}
+    )
+
 @app.post("/predict")
-async def predict(data: InputData):
-    if models is None:
-        raise HTTPException(status_code=500, detail="Models not loaded")
+async def predict(request: Request, data: InputData, x_model_version: Optional[str] = Header(None)):
+    mark = observe_parse_validate(request, "predict")
+    models = resolve_models(x_model_version)
     
     try:
-        # Preprocess input
-        processed_input = preprocess_input(data.features, models)
-        
-        # Make prediction
-        cluster = int(models["kmeans"].predict(processed_input)[0])
-        
-        # Get recommendations based on cluster
-        recommendations = get_recommendations(cluster, data.features)
+        # Serve repeated (quantized) inputs from the cache; otherwise assign the
+        # cluster with the precompiled NumPy path, coalescing with concurrent
+        # requests when batching is enabled
+        cache_key = cache.key(data.features) if cache is not None else None
+        result = cache.get(cache_key, models["version"]) if cache is not None else None
+        mark = observe_stage("predict", "cache", mark)
+        if result is None:
+            if batcher is not None:
+                result = await batcher.submit(data.features, models)
+            else:
+                result = await executor.run(predict_single, models, data.features)
+            if cache is not None:
+                cache.put(cache_key, result, models["version"])
+            mark = observe_stage("predict", "inference", mark)
+        cluster, confidence = result
+        if METRICS_ENABLED:
+            CLUSTER_ASSIGNMENTS.inc(models["version"], cluster)
         
-        return {
-            "prediction": {
-                "cluster": cluster,
-                "recommendations": recommendations,
-                "confidence": 0.85  # Example confidence score
-            }
+        # The body is assembled from bytes serialized when the models loaded
+        response = Response(
+            models["profiles"].prediction_json(cluster, confidence),
+            media_type="application/json",
+            headers={"X-Model-Version": models["version"]}
+        )
+        observe_stage("predict", "serialization", mark)
+        return response
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request, data: BatchInputData, x_model_version: Optional[str] = Header(None)):
+    mark = observe_parse_validate(request, "predict_batch")
+    models = resolve_models(x_model_version)
+    if (data.records is None) == (data.columns is None):
+        raise HTTPException(status_code=422, detail="Provide exactly one of 'records' or 'columns'")
+
+    try:
+        # One preprocessing pass and one KMeans call for the whole batch
+        records = data.records if data.records is not None else data.columns
+        clusters, confidences = await executor.run(predict_many, models, records)
+        mark = observe_stage("predict_batch", "inference", mark)
+        count_assignments(models["version"], clusters)
+
+        # Recommendations are per cluster, so send each distinct one only once
+        recommendations = {
+            int(cluster): models["profiles"].recommendations(int(cluster))
+            for cluster in np.unique(clusters)
         }
+
+        # Bypass jsonable_encoder, which walks large lists element by element
+        response = JSONResponse({
+            "predictions": {
+                "count": len(clusters),
+                "clusters": clusters.tolist(),
+                "confidence": confidences.tolist(),
+                "recommendations": recommendations
+            }
+        }, headers={"X-Model-Version": models["version"]})
+        observe_stage("predict_batch", "serialization", mark)
+        return response
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-def get_recommendations(cluster: int, features: Dict[str, float]) -> list[str]:
-    """Generate recommendations based on cluster and input features."""
-    # Add your recommendation logic here
-    base_recommendations = {
-        0: ["Low vulnerability - Focus on monitoring and maintenance"],
-        1: ["Moderate vulnerability - Implement basic adaptation measures"],
-        2: ["High vulnerability - Comprehensive adaptation strategy needed"],
-        3: ["Very high vulnerability - Urgent intervention required"],
-        4: ["Extreme vulnerability - Immediate action and support needed"]
+@app.get("/predict/binary/schema")
+async def predict_binary_schema(x_model_version: Optional[str] = Header(None)):
+    """Column order and dtypes of the binary request and response bodies."""
+    models = resolve_models(x_model_version)
+    return {
+        "request_content_type": FEATURES_CONTENT_TYPE,
+        "response_content_type": PREDICTIONS_CONTENT_TYPE,
+        "feature_names": models["compiled"]["feature_names"],
+        "feature_dtype": "<f4",
+        "response_layout": ["clusters <i4 x rows", "confidences <f4 x rows"],
+        "model_version": models["version"]
     }
-    
-    return base_recommendations.get(cluster, ["No specific recommendations available"])
+
+@app.post("/predict/binary")
+async def predict_binary(request: Request, x_model_version: Optional[str] = Header(None)):
+    """Score a little-endian float32 feature matrix; no JSON or pydantic on either side."""
+    mark = time.perf_counter()
+    models = resolve_models(x_model_version)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type != FEATURES_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"Expected Content-Type {FEATURES_CONTENT_TYPE}")
+
+    try:
+        # A read-only view over the body; encoding makes the one float64 copy
+        X = decode_features(await request.body(), len(models["compiled"]["feature_names"]))
+        mark = observe_stage("predict_binary", "parse_validate", mark)
+        clusters, confidences = await executor.run(predict_matrix, models, X)
+        mark = observe_stage("predict_binary", "inference", mark)
+        count_assignments(models["version"], clusters)
+        response = Response(
+            encode_predictions(clusters, confidences),
+            media_type=PREDICTIONS_CONTENT_TYPE,
+            headers={"X-Model-Version": models["version"], "X-Rows": str(len(clusters))}
+        )
+        observe_stage("predict_binary", "serialization", mark)
+        return response
+    except ExecutorSaturated as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/predict/stream")
+async def predict_stream(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    columns: Optional[str] = None,
+    x_model_version: Optional[str] = Header(None)
+):
+    """Score an uploaded CSV/Parquet file chunk by chunk and stream back labelled CSV.
+
+    ``columns`` (comma-separated, e.g. ``Latitude,Longitude,Cluster``)
+    limits the returned columns; by default every input column is echoed.
+    """
+    models = resolve_models(x_model_version)
+    if chunksize <= 0:
+        raise HTTPException(status_code=422, detail="chunksize must be positive")
+    selected = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+
+    try:
+        fmt = format or detect_format(file.filename)
+        scored = score_file(file.file, models["compiled"], fmt, chunksize)
+        if selected:
+            scored = (chunk[selected] for chunk in scored)
+        chunks = iter_csv(scored)
+        # Score the first chunk up front so bad input still gets a 400
+        first = next(chunks, "")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def body():
+        yield first
+        yield from chunks
+
+    # Starlette iterates sync generators in a thread pool, off the event loop
+    return StreamingResponse(body(), media_type="text/csv", headers={"X-Model-Version": models["version"]})
+
+def resolve_spatial_index(lat: float, lon: float):
+    if spatial_index is None:
+        raise HTTPException(status_code=500, detail="Spatial index not loaded")
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        raise HTTPException(status_code=422, detail="lat must be in [-90, 90] and lon in [-180, 180]")
+    return spatial_index
+
+@app.get("/sites/nearest")
+async def sites_nearest(lat: float, lon: float, k: int = 10):
+    """The k historical training sites closest to (lat, lon)."""
+    if not 0 < k <= SPATIAL_MAX_RESULTS:
+        raise HTTPException(status_code=422, detail=f"k must be between 1 and {SPATIAL_MAX_RESULTS}")
+    index = resolve_spatial_index(lat, lon)
+    # Cheap enough to answer on the event loop
+    rows, distances = index.nearest(lat, lon, k)
+    return JSONResponse({"count": len(rows), "sites": index.points(rows, distances)})
+
+@app.get("/sites/within")
+async def sites_within(lat: float, lon: float, radius_km: float = 50.0, limit: int = 100):
+    """Clusters present within radius_km of (lat, lon) and the closest sites."""
+    if radius_km <= 0:
+        raise HTTPException(status_code=422, detail="radius_km must be positive")
+    if not 0 <= limit <= SPATIAL_MAX_RESULTS:
+        raise HTTPException(status_code=422, detail=f"limit must be between 0 and {SPATIAL_MAX_RESULTS}")
+    index = resolve_spatial_index(lat, lon)
+    rows, distances = index.within(lat, lon, radius_km)
+    clusters, counts = np.unique(index.cluster[rows], return_counts=True)
+    closest = np.argsort(distances, kind="stable")[:limit]
+    return JSONResponse({
+        "count": len(rows),
+        "clusters": {int(cluster): int(count) for cluster, count in zip(clusters, counts)},
+        "sites": index.points(rows[closest], distances[closest])
+    })
+
+@app.get("/clusters")
+async def clusters(x_model_version: Optional[str] = Header(None)):
+    """Profiles of every cluster: size, centroid, feature means/quantiles and recommendations."""
+    models = resolve_models(x_model_version)
+    return Response(
+        models["profiles"].all_json(),
+        media_type="application/json",
+        headers={"X-Model-Version": models["version"]}
+    )
+
+@app.get("/clusters/{cluster_id}")
+async def cluster_profile(cluster_id: int, x_model_version: Optional[str] = Header(None)):
+    """Profile of one cluster, served from bytes serialized at load time."""
+    models = resolve_models(x_model_version)
+    body = models["profiles"].profile_json(cluster_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Unknown cluster {cluster_id}")
+    return Response(body, media_type="application/json", headers={"X-Model-Version": models["version"]})
 
 
 # from typing import Dict
@@ -1,22 +1,33 @@
 # model_utils.py
+import hashlib
 import os
 
-import joblib
 import numpy as np
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from app.bundle import BundleError, load_bundle
+
+# joblib, pandas and sklearn are imported inside the functions that need
+# them, so serving from a model bundle never imports them at all
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+BUNDLE_FILENAME = "model_bundle.adnb"
+
+def model_paths(model_dir):
+    """Paths of the pickled artifacts in ``model_dir``."""
+    return {
+        "scaler": os.path.join(model_dir, "scaler.pkl"),
+        "label_encoders": os.path.join(model_dir, "label_encoders.pkl"),
+        "feature_order": os.path.join(model_dir, "feature_order.pkl"),
+        "kmeans": os.path.join(model_dir, "kmeans_model.pkl")
+    }
 
-MODEL_PATHS = {
-    "scaler": os.path.join(BASE_DIR, "models", "scaler.pkl"),
-    "label_encoders": os.path.join(BASE_DIR, "models", "label_encoders.pkl"),
-    "feature_order": os.path.join(BASE_DIR, "models", "feature_order.pkl"),
-    "kmeans": os.path.join(BASE_DIR, "models", "kmeans_model.pkl")
-}
+MODEL_PATHS = model_paths(MODEL_DIR)
 
 def ensure_label_encoder_classes():
     """Ensure label encoders are trained with all possible classes"""
+    from sklearn.preprocessing import LabelEncoder
+
     climate_risk_encoder = LabelEncoder()
     land_use_encoder = LabelEncoder()
     
@@ -29,25 +40,319 @@ def ensure_label_encoder_classes():
         "Land_Use_Type": land_use_encoder
     }
 
-def load_all_models():
-    """Load all required models and preprocessors."""
+def artifact_version(paths):
+    """Short content hash identifying a set of model artifact files."""
+    digest = hashlib.sha256()
+    for key in sorted(paths):
+        with open(paths[key], "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+def load_pickled_models(model_dir=MODEL_DIR):
+    """Load the pickled sklearn artifacts and compile them."""
+    import joblib
+
     models = {}
+    paths = model_paths(model_dir)
+    # Load the models
+    for key, path in paths.items():
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model file not found: {path}")
+        models[key] = joblib.load(path)
+    
+    # Ensure label encoders are properly initialized
+    models["label_encoders"] = ensure_label_encoder_classes()
+
+    # Precompute the arrays used by the pandas-free inference path
+    models["compiled"] = compile_models(models)
+
+    # Identify this artifact set so caches can detect a model change
+    models["version"] = artifact_version(paths)
+    models["format"] = "pickle"
+    return models
+
+def load_bundled_models(model_dir=MODEL_DIR, expected_version=None):
+    """Memory-map the model bundle; no sklearn objects are loaded.
+
+    With ``expected_version`` set, a bundle exported from a different set
+    of pickled artifacts is rejected as stale.
+    """
+    compiled, metadata = load_bundle(os.path.join(model_dir, BUNDLE_FILENAME))
+    if expected_version is not None and metadata["source_version"] != expected_version:
+        raise BundleError(
+            f"Model bundle is stale (built from {metadata['source_version']}, "
+            f"artifacts are {expected_version})"
+        )
+    return {
+        "feature_order": {
+            "numerical_cols": compiled["numerical_cols"],
+            "categorical_cols": compiled["categorical_cols"]
+        },
+        "compiled": compiled,
+        "version": metadata["source_version"] or metadata["checksum"][:12],
+        "format": "bundle"
+    }
+
+def load_all_models(model_dir=MODEL_DIR, fmt=None):
+    """Load all required models and preprocessors.
+
+    ``fmt`` (default: the ADAPTNET_MODEL_FORMAT environment variable, else
+    ``auto``) is ``pickle``, ``bundle`` or ``auto``. ``auto`` uses the
+    bundle when present and built from the current pickled artifacts, and
+    falls back to the pickles otherwise.
+    """
+    fmt = fmt or os.environ.get("ADAPTNET_MODEL_FORMAT", "auto")
     try:
-        # Load the models
-        for key, path in MODEL_PATHS.items():
-            if not os.path.exists(path):
-                raise FileNotFoundError(f"Model file not found: {path}")
-            models[key] = joblib.load(path)
-        
-        # Ensure label encoders are properly initialized
-        models["label_encoders"] = ensure_label_encoder_classes()
-        
-        return models
+        if fmt == "pickle":
+            return load_pickled_models(model_dir)
+        if fmt == "bundle":
+            return load_bundled_models(model_dir)
+        if fmt != "auto":
+            raise ValueError(f"Unknown model format '{fmt}', expected 'auto', 'bundle' or 'pickle'")
+
+        paths = model_paths(model_dir)
+        if not os.path.exists(os.path.join(model_dir, BUNDLE_FILENAME)):
+            return load_pickled_models(model_dir)
+        # Hashing the pickles is cheap compared with unpickling them
+        expected = artifact_version(paths) if all(os.path.exists(p) for p in paths.values()) else None
+        try:
+            return load_bundled_models(model_dir, expected_version=expected)
+        except BundleError as e:
+            print(f"Ignoring model bundle: {str(e)}")
+            return load_pickled_models(model_dir)
     except Exception as e:
         raise Exception(f"Error loading models: {str(e)}")
 
+def compile_models(models):
+    """Extract the fitted parameters needed for pandas-free inference.
+
+    Everything is converted once into contiguous float64 arrays (and small
+    lookup dicts for the label encoders) so that a prediction only needs a
+    handful of NumPy operations.
+    """
+    feature_order = models["feature_order"]
+    numerical_cols = feature_order["numerical_cols"]
+    categorical_cols = feature_order["categorical_cols"]
+    feature_names = numerical_cols + categorical_cols
+
+    scaler = models["scaler"]
+    n_features = len(feature_names)
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+
+    # Map each raw categorical value to the index LabelEncoder.transform returns
+    encoder_tables = {
+        col: {int(value): index for index, value in enumerate(models["label_encoders"][col].classes_)}
+        for col in categorical_cols
+    }
+    encoder_classes = {
+        col: np.asarray(models["label_encoders"][col].classes_, dtype=np.int64)
+        for col in categorical_cols
+    }
+
+    centers = np.ascontiguousarray(models["kmeans"].cluster_centers_, dtype=np.float64)
+
+    return {
+        "feature_names": feature_names,
+        "numerical_cols": numerical_cols,
+        "categorical_cols": categorical_cols,
+        "encoder_tables": encoder_tables,
+        "encoder_classes": encoder_classes,
+        "mean": np.ascontiguousarray(mean, dtype=np.float64),
+        "scale": np.ascontiguousarray(scale, dtype=np.float64),
+        "centers": centers
+    }
+
+def margin_confidence(sq_distances):
+    """Confidence of the nearest-center assignment from squared distances.
+
+    ``1 - d1 / d2`` with ``d1`` and ``d2`` the distances to the nearest and
+    second-nearest centers (along the last axis): 1 at a center, 0 on the
+    boundary between two clusters.
+    """
+    if sq_distances.shape[-1] < 2:
+        return np.ones(sq_distances.shape[:-1])
+    nearest = np.sqrt(np.maximum(np.partition(sq_distances, 1, axis=-1)[..., :2], 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        confidence = 1.0 - nearest[..., 0] / nearest[..., 1]
+    return np.where(nearest[..., 1] > 0, confidence, 0.0)
+
+def predict_compiled(features, compiled, return_confidence=False):
+    """Assign a single feature dict to a cluster using precompiled arrays.
+
+    Produces the same cluster as ``preprocess_input`` followed by
+    ``kmeans.predict`` without building a DataFrame. With
+    ``return_confidence`` set, returns ``(cluster, confidence)`` scored
+    from the same distances (see ``margin_confidence``).
+    """
+    try:
+        x = np.empty(len(compiled["feature_names"]), dtype=np.float64)
+        i = 0
+        for col in compiled["numerical_cols"]:
+            x[i] = features[col]
+            i += 1
+        for col in compiled["categorical_cols"]:
+            value = int(features[col])
+            table = compiled["encoder_tables"][col]
+            if value not in table:
+                raise ValueError(f"y contains previously unseen labels: {value}")
+            x[i] = table[value]
+            i += 1
+
+        x -= compiled["mean"]
+        x /= compiled["scale"]
+        if not np.isfinite(x).all():
+            raise ValueError("Input contains NaN or infinity")
+
+        distances = ((compiled["centers"] - x) ** 2).sum(axis=1)
+        if return_confidence:
+            return int(distances.argmin()), float(margin_confidence(distances))
+        return int(distances.argmin())
+
+    except KeyError as e:
+        raise Exception(f"Error preprocessing input: missing feature {str(e)}")
+    except Exception as e:
+        raise Exception(f"Error preprocessing input: {str(e)}")
+
+def encode_batch(records, compiled):
+    """Build the standardized feature matrix for a batch using precompiled arrays.
+
+    ``records`` may be a list of feature dicts or a dict of feature columns.
+    """
+    feature_names = compiled["feature_names"]
+    if isinstance(records, dict):
+        missing = [col for col in feature_names if col not in records]
+        if missing:
+            raise ValueError(f"Missing required features: {missing}")
+        X = np.column_stack([np.asarray(records[col], dtype=np.float64) for col in feature_names])
+    else:
+        try:
+            X = np.array([[record[col] for col in feature_names] for record in records], dtype=np.float64)
+        except KeyError as e:
+            raise ValueError(f"Missing required feature: {str(e)}")
+        X = X.reshape(len(records), len(feature_names))
+    return standardize_in_place(X, compiled)
+
+def encode_records(records, compiled):
+    """Build the standardized matrix for a list of feature dicts, isolating bad records.
+
+    Unlike ``encode_batch``, a record with a missing feature, a non-number,
+    an unseen category or a non-finite value does not fail the batch.
+    Returns ``(X, errors)`` where ``errors`` maps the index of each bad
+    record to its message; those rows of ``X`` are zeroed.
+    """
+    feature_names = compiled["feature_names"]
+    errors = {}
+    try:
+        X = np.array([[record[col] for col in feature_names] for record in records], dtype=np.float64)
+        X = X.reshape(len(records), len(feature_names))
+    except (KeyError, TypeError, ValueError):
+        # Only now go record by record, to find which ones cannot be read
+        X = np.zeros((len(records), len(feature_names)))
+        for i, record in enumerate(records):
+            try:
+                X[i] = [record[col] for col in feature_names]
+            except KeyError as e:
+                errors[i] = f"missing feature {str(e)}"
+            except (TypeError, ValueError) as e:
+                errors[i] = str(e)
+
+    offset = len(compiled["numerical_cols"])
+    for j, col in enumerate(compiled["categorical_cols"], start=offset):
+        classes = compiled["encoder_classes"][col]
+        # NaN (also what None becomes) has no label; check it before casting to int
+        missing = np.isnan(X[:, j])
+        for i in np.flatnonzero(missing).tolist():
+            errors.setdefault(i, f"missing value for {col}")
+        values = np.where(missing, classes[0], X[:, j]).astype(np.int64)
+        index = np.searchsorted(classes, values).clip(0, len(classes) - 1)
+        for i in np.flatnonzero(classes[index] != values).tolist():
+            errors.setdefault(i, f"y contains previously unseen labels: {values[i]}")
+        X[:, j] = index
+
+    X -= compiled["mean"]
+    X /= compiled["scale"]
+    for i in np.flatnonzero(~np.isfinite(X).all(axis=1)).tolist():
+        errors.setdefault(i, "Input contains NaN or infinity")
+    if errors:
+        X[list(errors)] = 0.0
+    return X, errors
+
+def encode_matrix(X, compiled):
+    """Standardize a raw ``(n, n_features)`` matrix already in ``feature_names`` order.
+
+    Categoricals hold their raw codes, as in a feature dict. ``X`` may be a
+    read-only view (e.g. over a request body); it is converted into a new
+    float64 array, which is the only copy made.
+    """
+    n_features = len(compiled["feature_names"])
+    if X.ndim != 2 or X.shape[1] != n_features:
+        raise ValueError(f"Expected a matrix with {n_features} columns, got shape {X.shape}")
+    return standardize_in_place(np.array(X, dtype=np.float64), compiled)
+
+def standardize_in_place(X, compiled):
+    """Label-encode the categorical columns of a float64 matrix and standardize it in place."""
+    # Label-encode categoricals in place via binary search over the sorted classes
+    offset = len(compiled["numerical_cols"])
+    for j, col in enumerate(compiled["categorical_cols"], start=offset):
+        classes = compiled["encoder_classes"][col]
+        values = X[:, j].astype(np.int64)
+        index = np.searchsorted(classes, values).clip(0, len(classes) - 1)
+        unseen = classes[index] != values
+        if unseen.any():
+            raise ValueError(f"y contains previously unseen labels: {np.unique(values[unseen]).tolist()}")
+        X[:, j] = index
+
+    X -= compiled["mean"]
+    X /= compiled["scale"]
+    if not np.isfinite(X).all():
+        raise ValueError("Input contains NaN or infinity")
+    return X
+
+def assign_clusters(X, compiled, return_confidence=False):
+    """Return the index of the nearest center for each standardized row.
+
+    With ``return_confidence`` set, returns ``(labels, confidence)``.
+    """
+    centers = compiled["centers"]
+    # ||x||^2 is constant per row, so it does not affect the argmin
+    distances = (centers ** 2).sum(axis=1) - 2.0 * (X @ centers.T)
+    labels = distances.argmin(axis=1)
+    if not return_confidence:
+        return labels
+    # Adding it back gives the squared distances the confidence needs
+    distances += np.einsum("ij,ij->i", X, X)[:, None]
+    return labels, margin_confidence(distances)
+
+def predict_compiled_batch(records, compiled, return_confidence=False):
+    """Assign a batch of records to clusters using precompiled arrays."""
+    try:
+        return assign_clusters(encode_batch(records, compiled), compiled, return_confidence)
+    except Exception as e:
+        raise Exception(f"Error preprocessing batch: {str(e)}")
+
+def predict_compiled_records(records, compiled):
+    """Assign feature dicts to clusters; returns ``(labels, confidence, errors)``.
+
+    ``errors`` maps the index of each record that could not be scored to
+    its message (see ``encode_records``); the other records are unaffected.
+    """
+    X, errors = encode_records(records, compiled)
+    labels, confidence = assign_clusters(X, compiled, return_confidence=True)
+    return labels, confidence, errors
+
+def predict_compiled_matrix(X, compiled, return_confidence=False):
+    """Assign the rows of a raw feature matrix (see ``encode_matrix``) to clusters."""
+    try:
+        return assign_clusters(encode_matrix(X, compiled), compiled, return_confidence)
+    except Exception as e:
+        raise Exception(f"Error preprocessing batch: {str(e)}")
+
 def preprocess_input(features, models):
     """Preprocess input features using loaded models."""
+    import pandas as pd
+
     try:
         df = pd.DataFrame([features])
         
@@ -71,4 +376,46 @@ def preprocess_input(features, models):
         return df[columns_to_scale]
     
     except Exception as e:
-        raise Exception(f"Error preprocessing input: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error preprocessing input: {str(e)}")
+
+def preprocess_batch(records, models):
+    """Preprocess a batch of records in a single vectorized pass.
+
+    ``records`` may be a list of feature dicts or a dict of equally long
+    feature columns.
+    """
+    import pandas as pd
+
+    try:
+        feature_order = models["feature_order"]
+        numerical_cols = feature_order["numerical_cols"]
+        categorical_cols = feature_order["categorical_cols"]
+        columns_to_scale = numerical_cols + categorical_cols
+
+        if isinstance(records, dict):
+            missing = [col for col in columns_to_scale if col not in records]
+            if missing:
+                raise ValueError(f"Missing required features: {missing}")
+            # Converting each column to an array first is much cheaper than
+            # letting pandas infer dtypes from Python lists
+            df = pd.DataFrame({
+                col: np.asarray(records[col], dtype=float) for col in columns_to_scale
+            })
+        else:
+            df = pd.DataFrame(records, columns=columns_to_scale)
+
+        null_cols = [col for col in columns_to_scale if df[col].isnull().any()]
+        if null_cols:
+            raise ValueError(f"Missing or null values for features: {null_cols}")
+
+        # Encode categorical features
+        for col in categorical_cols:
+            df[col] = models["label_encoders"][col].transform(df[col].astype(int))
+
+        # Scale all features
+        df[columns_to_scale] = models["scaler"].transform(df[columns_to_scale])
+
+        return df
+
+    except Exception as e:
+        raise Exception(f"Error preprocessing batch: {str(e)}")
@@ -0,0 +1,203 @@
+# profiles.py
+"""Per-cluster profiles and recommendation payloads.
+
+The trainer writes ``cluster_profiles.json`` next to the other artifacts:
+cluster sizes and centroids, per-feature means and quantiles (all in
+original units) and the recommendations for each cluster. The API loads
+it once per model version into ``ClusterProfiles``, which keeps every
+response fragment as ready-made JSON bytes.
+"""
+import json
+import os
+
+import numpy as np
+
+PROFILES_FILENAME = "cluster_profiles.json"
+QUANTILES = (0.1, 0.5, 0.9)
+
+RECOMMENDATIONS = {
+    0: ["Low vulnerability - Focus on monitoring and maintenance"],
+    1: ["Moderate vulnerability - Implement basic adaptation measures"],
+    2: ["High vulnerability - Comprehensive adaptation strategy needed"],
+    3: ["Very high vulnerability - Urgent intervention required"],
+    4: ["Extreme vulnerability - Immediate action and support needed"]
+}
+DEFAULT_RECOMMENDATIONS = ["No specific recommendations available"]
+
+DETAILED_RECOMMENDATIONS = {
+    0: {
+        "risk_level": "Low Vulnerability",
+        "priority": "Monitor and Maintain",
+        "actions": [
+            "Implement regular monitoring systems for climate indicators",
+            "Develop early warning systems for extreme weather events",
+            "Create community awareness programs",
+            "Establish baseline data collection protocols"
+        ],
+        "timeline": "1-2 years",
+        "estimated_cost": "Low to Medium"
+    },
+    1: {
+        "risk_level": "Moderate Vulnerability",
+        "priority": "Preventive Action",
+        "actions": [
+            "Upgrade existing infrastructure for climate resilience",
+            "Implement water conservation measures",
+            "Develop heat action plans",
+            "Establish green corridors and urban forests"
+        ],
+        "timeline": "2-3 years",
+        "estimated_cost": "Medium"
+    },
+    2: {
+        "risk_level": "High Vulnerability",
+        "priority": "Immediate Action Required",
+        "actions": [
+            "Develop comprehensive flood management systems",
+            "Implement drought-resistant agriculture practices",
+            "Establish community cooling centers",
+            "Create disaster response protocols"
+        ],
+        "timeline": "1-2 years",
+        "estimated_cost": "High"
+    },
+    3: {
+        "risk_level": "Very High Vulnerability",
+        "priority": "Urgent Intervention",
+        "actions": [
+            "Relocate vulnerable communities from high-risk areas",
+            "Implement major infrastructure reinforcement",
+            "Develop comprehensive water management systems",
+            "Create emergency response centers"
+        ],
+        "timeline": "Immediate",
+        "estimated_cost": "Very High"
+    },
+    4: {
+        "risk_level": "Extreme Vulnerability",
+        "priority": "Critical Emergency Response",
+        "actions": [
+            "Immediate evacuation planning for high-risk areas",
+            "Rapid deployment of emergency infrastructure",
+            "Implementation of crisis management systems",
+            "International aid coordination"
+        ],
+        "timeline": "Immediate",
+        "estimated_cost": "Extremely High"
+    }
+}
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+def _by_feature(feature_names, values):
+    """``{feature: value}`` with NaN (e.g. an empty cluster) mapped to None."""
+    return {name: (float(v) if np.isfinite(v) else None) for name, v in zip(feature_names, values)}
+
+def build_profiles(feature_names, mean, scale, centers, sizes=None, means=None, quantiles=None,
+                   source_version=None):
+    """Assemble the profile artifact from standardized cluster statistics.
+
+    ``centers`` and ``means`` are ``(k, n_features)`` and ``quantiles`` is
+    ``(k, len(QUANTILES), n_features)``, all in standardized units; they
+    are mapped back to original units with the scaler's ``mean`` and
+    ``scale``. Statistics that are not given are left out.
+    """
+    mean = np.asarray(mean, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+    centers = np.asarray(centers, dtype=np.float64) * scale + mean
+    clusters = []
+    for c in range(len(centers)):
+        profile = {
+            "cluster": c,
+            "size": int(sizes[c]) if sizes is not None else None,
+            "centroid": _by_feature(feature_names, centers[c]),
+            "recommendations": RECOMMENDATIONS.get(c, DEFAULT_RECOMMENDATIONS),
+            "details": DETAILED_RECOMMENDATIONS.get(c, {})
+        }
+        if means is not None:
+            profile["means"] = _by_feature(feature_names, np.asarray(means[c], dtype=np.float64) * scale + mean)
+        if quantiles is not None:
+            profile["quantiles"] = {
+                f"p{round(q * 100)}": _by_feature(feature_names, np.asarray(quantiles[c][i], dtype=np.float64) * scale + mean)
+                for i, q in enumerate(QUANTILES)
+            }
+        clusters.append(profile)
+    return {"source_version": source_version, "features": list(feature_names), "clusters": clusters}
+
+def write_profiles(path, profiles):
+    with open(path, "w") as f:
+        json.dump(profiles, f, indent=2)
+
+class ClusterProfiles:
+    """Immutable, pre-serialized view of the cluster profiles.
+
+    Every lookup returns bytes built at load time, so serving a profile or
+    a prediction needs no per-request dict construction or JSON encoding.
+    """
+
+    def __init__(self, profiles, source="trained"):
+        clusters = profiles["clusters"]
+        self.source = source
+        self.source_version = profiles.get("source_version")
+        self._recommendations = tuple(
+            tuple(profile["recommendations"]) for profile in clusters
+        )
+        self._profile_json = tuple(_dumps(profile) for profile in clusters)
+        self._all_json = _dumps({"clusters": clusters})
+        # /predict bodies up to the confidence value, which varies per request
+        self._prediction_prefix = tuple(
+            b'{"prediction":{"cluster":%d,"recommendations":%s,"confidence":'
+            % (profile["cluster"], _dumps(profile["recommendations"]))
+            for profile in clusters
+        )
+
+    def __len__(self):
+        return len(self._profile_json)
+
+    def recommendations(self, cluster):
+        if 0 <= cluster < len(self):
+            return list(self._recommendations[cluster])
+        return RECOMMENDATIONS.get(cluster, DEFAULT_RECOMMENDATIONS)
+
+    def profile_json(self, cluster):
+        """JSON bytes of one cluster's profile, or None for an unknown cluster."""
+        return self._profile_json[cluster] if 0 <= cluster < len(self) else None
+
+    def all_json(self):
+        return self._all_json
+
+    def prediction_json(self, cluster, confidence):
+        """Complete ``/predict`` response body for ``cluster``."""
+        if 0 <= cluster < len(self):
+            prefix = self._prediction_prefix[cluster]
+        else:
+            prefix = b'{"prediction":{"cluster":%d,"recommendations":%s,"confidence":' % (
+                cluster, _dumps(self.recommendations(cluster))
+            )
+        return prefix + _dumps(float(confidence)) + b"}}"
+
+    def stats(self):
+        return {"clusters": len(self), "source": self.source, "source_version": self.source_version}
+
+def load_profiles(model_dir, models):
+    """Load the trained profiles for ``models``, or centroid-only defaults.
+
+    Profiles written for a different artifact version are ignored, since
+    their cluster numbering may not match.
+    """
+    compiled = models["compiled"]
+    path = os.path.join(model_dir, PROFILES_FILENAME)
+    if os.path.exists(path):
+        with open(path) as f:
+            profiles = json.load(f)
+        if profiles.get("source_version") == models["version"] and len(profiles["clusters"]) == len(compiled["centers"]):
+            return ClusterProfiles(profiles)
+        print(f"Ignoring stale cluster profiles (built from {profiles.get('source_version')}, "
+              f"models are {models['version']})")
+
+    profiles = build_profiles(
+        compiled["feature_names"], compiled["mean"], compiled["scale"], compiled["centers"],
+        source_version=models["version"]
+    )
+    return ClusterProfiles(profiles, source="default")
@@ -0,0 +1,162 @@
+# profiling.py
+"""On-demand sampling profiler for live requests.
+
+While a profiled request is in flight, a background thread samples the
+stacks of the event loop thread and the inference thread pool every
+``interval`` seconds and aggregates them as collapsed stacks
+(``outer;inner;leaf count`` per line), the input format of flamegraph.pl,
+speedscope and similar tools.
+
+Requests run concurrently on the event loop, so a sample taken while a
+profiled request is in flight may land in another request's code; the
+profile describes the service under load rather than a single request.
+Process-pool workers are not sampled.
+"""
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+INFERENCE_THREAD_PREFIX = "adaptnet-inference"
+
+def _frame_label(code):
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """Sample a fraction of requests, or every request for a time window.
+
+    Call ``start`` on the event loop thread. While it is off, the only cost
+    per request is one attribute check in ``ProfilingMiddleware``.
+    """
+
+    def __init__(self, interval=0.001, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.enabled = False
+        self.fraction = 0.0
+        self.deadline = None
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._loop_thread = None
+
+        # Metrics
+        self.samples = 0
+        self.profiled_requests = 0
+        self.started_at = None
+
+    def start(self, fraction=1.0, seconds=None, interval=None, reset=True):
+        """Profile ``fraction`` of requests, for ``seconds`` if given (else until ``stop``)."""
+        if not 0.0 < fraction <= 1.0:
+            raise ValueError("fraction must be in (0, 1]")
+        if seconds is not None and seconds <= 0:
+            raise ValueError("seconds must be positive")
+        if reset:
+            with self._lock:
+                self._stacks = Counter()
+            self.samples = 0
+            self.profiled_requests = 0
+        self.fraction = fraction
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+        self.interval = interval or self.interval
+        self._loop_thread = threading.get_ident()
+        self.started_at = time.time()
+        self.enabled = True
+        if self._stop.is_set() and self._sampler is not None:
+            # A stopped sampler exits within one wait; do not race it
+            self._sampler.join()
+        if self._sampler is None or not self._sampler.is_alive():
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._run, name="adaptnet-profiler", daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        self.enabled = False
+        self._stop.set()
+        self._wake.set()
+
+    def should_profile(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.stop()
+            return False
+        return self.fraction >= 1.0 or random.random() < self.fraction
+
+    def enter(self):
+        self._inflight += 1
+        self.profiled_requests += 1
+        self._wake.set()
+
+    def exit(self):
+        self._inflight -= 1
+
+    def _run(self):
+        own = threading.get_ident()
+        targets, refresh = set(), 0
+        while not self._stop.is_set():
+            if self._inflight <= 0:
+                self._wake.clear()
+                self._wake.wait(0.1)
+                continue
+            if refresh <= 0:
+                # Pool threads come and go; re-scan them every few hundred samples
+                targets = {self._loop_thread} | {
+                    thread.ident for thread in threading.enumerate()
+                    if thread.name.startswith(INFERENCE_THREAD_PREFIX)
+                }
+                targets.discard(own)
+                refresh = 500
+            refresh -= 1
+            self._sample(targets)
+            time.sleep(self.interval)
+
+    def _sample(self, targets):
+        for ident, frame in sys._current_frames().items():
+            if ident not in targets:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            with self._lock:
+                self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """The profile in collapsed-stack format, heaviest stacks first."""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "fraction": self.fraction,
+            "seconds_left": max(0.0, self.deadline - time.monotonic()) if self.deadline is not None else None,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "distinct_stacks": len(self._stacks),
+            "profiled_requests": self.profiled_requests,
+            "started_at": self.started_at
+        }
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware marking the requests the profiler should sample."""
+
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if not profiler.enabled or scope["type"] != "http" or not profiler.should_profile():
+            await self.app(scope, receive, send)
+            return
+        profiler.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.exit()
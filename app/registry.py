@@ -0,0 +1,228 @@
+# registry.py
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from app.bundle import load_bundle
+from app.model_utils import BUNDLE_FILENAME, MODEL_DIR, artifact_version, load_all_models, model_paths, predict_compiled
+from app.profiles import PROFILES_FILENAME, load_profiles
+
+class ModelVersionUnavailable(LookupError):
+    """Raised when a pinned model version is not resident."""
+
+def validate_models(models):
+    """Sanity-check a freshly loaded artifact set before it can serve traffic."""
+    compiled = models["compiled"]
+    n_features = len(compiled["feature_names"])
+    centers = compiled["centers"]
+    if centers.ndim != 2 or centers.shape[0] == 0 or centers.shape[1] != n_features:
+        raise ValueError(f"Cluster centers have shape {centers.shape}, expected (k, {n_features})")
+    for name in ("mean", "scale"):
+        if compiled[name].shape != (n_features,):
+            raise ValueError(f"Scaler {name} has shape {compiled[name].shape}, expected ({n_features},)")
+    if not (np.isfinite(centers).all() and np.isfinite(compiled["mean"]).all()
+            and np.isfinite(compiled["scale"]).all() and (compiled["scale"] > 0).all()):
+        raise ValueError("Model arrays contain non-finite values or non-positive scales")
+
+    # Smoke test: the training mean with the first known categories must score
+    n_numerical = len(compiled["numerical_cols"])
+    features = dict(zip(compiled["numerical_cols"], compiled["mean"][:n_numerical].tolist()))
+    for col in compiled["categorical_cols"]:
+        features[col] = int(compiled["encoder_classes"][col][0])
+    cluster = predict_compiled(features, compiled)
+    if not 0 <= cluster < len(centers):
+        raise ValueError(f"Smoke-test prediction returned invalid cluster {cluster}")
+
+def check_bundle_matches(model_dir):
+    """Raise unless the bundle, if there is one, was exported from the pickled artifacts beside it.
+
+    The trainer writes the pickles first and the bundle last, so a
+    mismatch usually means a training run is still writing the set.
+    """
+    paths = model_paths(model_dir)
+    bundle_path = os.path.join(model_dir, BUNDLE_FILENAME)
+    if not os.path.exists(bundle_path) or not all(os.path.exists(path) for path in paths.values()):
+        return
+    _, metadata = load_bundle(bundle_path, verify=False)
+    version = artifact_version(paths)
+    if metadata["source_version"] != version:
+        raise ValueError(
+            f"Model bundle was built from {metadata['source_version']} but the pickled artifacts are {version}; "
+            "not loading a mixed artifact set"
+        )
+
+class ModelRegistry:
+    """Hold loaded model versions and atomically swap the active one.
+
+    Reloads load and validate a new artifact set before publishing it, so
+    requests always see either the old or the new models in full. Up to
+    ``max_versions`` versions stay resident for clients that pin one, and
+    requests are counted per version. The poller only reloads files that
+    have been unchanged for a whole interval and whose bundle matches the
+    pickles, so a training run that is still writing is never picked up.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, max_versions=3, on_swap=None):
+        self.model_dir = model_dir
+        self.max_versions = max(1, max_versions)
+        self.on_swap = on_swap
+        self._versions = OrderedDict()
+        self._active = None
+        self._reload_lock = threading.Lock()
+        self._fingerprint = None
+        self._poller = None
+        self._stop = threading.Event()
+
+        # Metrics
+        self.request_counts = Counter()
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_error = None
+        self.last_reload_at = None
+        self.last_load_seconds = None
+
+    @property
+    def active(self):
+        """The models currently serving unpinned requests (None if none loaded)."""
+        return self._active
+
+    def get(self, version=None):
+        """Return the active models, or a specific resident version."""
+        if version is None:
+            return self._active
+        models = self._versions.get(version)
+        if models is None:
+            raise ModelVersionUnavailable(f"Model version '{version}' is not loaded")
+        return models
+
+    def resident_versions(self):
+        """``(version, models)`` pairs for every loaded version, oldest first."""
+        return list(self._versions.items())
+
+    def record_request(self, version):
+        self.request_counts[version] += 1
+
+    def _fingerprint_files(self):
+        """Cheap change detection: size and mtime of every artifact file."""
+        paths = list(model_paths(self.model_dir).values()) + [
+            os.path.join(self.model_dir, BUNDLE_FILENAME),
+            os.path.join(self.model_dir, PROFILES_FILENAME)
+        ]
+        fingerprint = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                fingerprint.append((path, stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                fingerprint.append((path, None, None))
+        return tuple(fingerprint)
+
+    def _install(self, models):
+        version = models["version"]
+        self._versions[version] = models
+        self._versions.move_to_end(version)
+        previous = self._active
+        # A single reference assignment: in-flight requests keep the models
+        # they already picked up, new ones see the new version
+        self._active = models
+        while len(self._versions) > self.max_versions:
+            self._versions.popitem(last=False)
+        if self.on_swap is not None and (previous is None or previous["version"] != version):
+            self.on_swap(previous, models)
+
+    def reload(self, check_consistent=False):
+        """Load, validate and activate the artifacts on disk.
+
+        Returns True if a new version was activated, False if the artifacts
+        on disk are the already-active version. Raises if loading or
+        validation fails, or if the files changed while they were being
+        loaded; the active version is left untouched. ``check_consistent``
+        also rejects a bundle that does not match the pickles (see
+        ``check_bundle_matches``).
+        """
+        with self._reload_lock:
+            fingerprint = self._fingerprint_files()
+            start = time.perf_counter()
+            try:
+                if check_consistent:
+                    check_bundle_matches(self.model_dir)
+                models = load_all_models(self.model_dir)
+                validate_models(models)
+                models["profiles"] = load_profiles(self.model_dir, models)
+                if self._fingerprint_files() != fingerprint:
+                    raise ValueError("Model artifacts changed while they were being loaded")
+                models["load_seconds"] = time.perf_counter() - start
+            except Exception as e:
+                self.failed_reloads += 1
+                self.last_error = str(e)
+                raise
+            finally:
+                # Do not retry the same broken files on every poll
+                self._fingerprint = fingerprint
+
+            self.last_error = None
+            self.last_reload_at = time.time()
+            self.last_load_seconds = models["load_seconds"]
+            if self._active is not None and self._active["version"] == models["version"]:
+                # Profiles can be written after the model files they describe
+                self._active["profiles"] = models["profiles"]
+                return False
+            self._install(models)
+            self.reloads += 1
+            return True
+
+    def activate(self, version):
+        """Make a resident version the active one (e.g. to roll back)."""
+        with self._reload_lock:
+            self._install(self.get(version))
+
+    def _poll(self, interval):
+        pending = None
+        while not self._stop.wait(interval):
+            fingerprint = self._fingerprint_files()
+            if fingerprint == self._fingerprint:
+                pending = None
+                continue
+            if fingerprint != pending:
+                # Training writes the artifacts one after another: only load
+                # once they have stayed unchanged for a whole interval
+                pending = fingerprint
+                continue
+            pending = None
+            try:
+                if self.reload(check_consistent=True):
+                    print(f"Model registry: activated version {self._active['version']}")
+            except Exception as e:
+                print(f"Model registry: reload failed: {str(e)}")
+
+    def start_polling(self, interval):
+        """Watch the model directory and reload in the background when it changes."""
+        if interval <= 0 or (self._poller is not None and self._poller.is_alive()):
+            return
+        if self._fingerprint is None:
+            self._fingerprint = self._fingerprint_files()
+        self._stop.clear()
+        self._poller = threading.Thread(target=self._poll, args=(interval,), name="model-registry-poller", daemon=True)
+        self._poller.start()
+
+    def stop_polling(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            "active_version": self._active["version"] if self._active is not None else None,
+            "resident_versions": [
+                {"version": version, "format": models["format"], "profiles": models["profiles"].source,
+                 "load_seconds": models["load_seconds"]}
+                for version, models in self._versions.items()
+            ],
+            "requests_per_version": dict(self.request_counts),
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+            "last_error": self.last_error,
+            "last_reload_at": self.last_reload_at,
+            "last_load_seconds": self.last_load_seconds
+        }
@@ -0,0 +1,189 @@
+# server.py
+"""Pre-fork production launcher for the API.
+
+The parent imports ``app.main`` (loading the model artifacts and spatial
+index once), binds the listening socket and forks ``--workers`` uvicorn
+processes that share both, so the loaded arrays stay shared copy-on-write.
+It then supervises the workers: crashed workers are replaced, and
+SIGTERM/SIGINT shut every worker down gracefully.
+
+Usage (from the repository root):
+
+    python -m app.server --workers 4 --port 8000
+
+A single worker is the default. Each worker has its own prediction cache,
+executor, metrics, profiler and model registry: ``/stats`` and
+``/metrics`` describe the worker that answered, the ``/admin`` endpoints
+are refused (they would change one worker only), and every worker polls
+models/ for new artifacts so they all switch to the same version.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock, log_level):
+    """Serve ``app`` on the inherited socket until told to stop (runs in the child)."""
+    import uvicorn
+
+    # The parent's handlers must not run in the child; uvicorn installs its own
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+class Supervisor:
+    """Fork, watch and restart worker processes.
+
+    More than ``max_restarts`` crashes within ``restart_window`` seconds is
+    treated as a crash loop: the supervisor stops everything and exits.
+    """
+
+    def __init__(self, app, sock, workers, log_level="info", graceful_timeout=30.0,
+                 max_restarts=10, restart_window=60.0):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.graceful_timeout = graceful_timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.children = set()
+        self.restarts = []
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.log_level)
+            except BaseException as e:
+                print(f"Worker {os.getpid()} failed: {str(e)}", file=sys.stderr)
+                code = 1
+            finally:
+                os._exit(code)
+        self.children.add(pid)
+        return pid
+
+    def handle_signal(self, signum, frame):
+        self.stopping = True
+
+    def reap(self):
+        """Collect exited workers; returns their (pid, status) pairs.
+
+        Waits on the worker pids only: other children of this process (such
+        as the Streamlit frontend started by render_app.py) belong to
+        whoever started them.
+        """
+        exited = []
+        for pid in list(self.children):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                # Already collected elsewhere; the exit status is unknown
+                done, status = pid, 0
+            if done == 0:
+                continue
+            self.children.discard(pid)
+            exited.append((pid, status))
+        return exited
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+        # Keep the loaded models out of the collector's generations so that
+        # collections in the workers do not touch (and copy) their pages
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"Supervisor {os.getpid()}: started {self.workers} workers", file=sys.stderr)
+
+        while not self.stopping:
+            for pid, status in self.reap():
+                if self.stopping:
+                    break
+                now = time.monotonic()
+                self.restarts = [t for t in self.restarts if now - t < self.restart_window] + [now]
+                if len(self.restarts) > self.max_restarts:
+                    print(f"Supervisor: {len(self.restarts)} worker crashes in {self.restart_window:.0f}s, giving up",
+                          file=sys.stderr)
+                    self.shutdown()
+                    return 1
+                print(f"Supervisor: worker {pid} exited ({os.waitstatus_to_exitcode(status)}), restarting",
+                      file=sys.stderr)
+                self.spawn()
+            time.sleep(0.2)
+
+        self.shutdown()
+        return 0
+
+    def shutdown(self):
+        """SIGTERM every worker (uvicorn drains in-flight requests), then SIGKILL stragglers."""
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.discard(pid)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        while self.children:
+            self.reap()
+            time.sleep(0.05)
+        print("Supervisor: all workers stopped", file=sys.stderr)
+
+def serve(host="0.0.0.0", port=8000, workers=None, log_level="info", graceful_timeout=30.0):
+    """Load the app once, then serve it from ``workers`` forked processes."""
+    workers = workers or 1
+
+    # Importing the app loads every artifact in this process, before forking
+    from app.main import app
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        app.state.workers = 1
+        import uvicorn
+        uvicorn.run(app, host=host, port=port, log_level=log_level)
+        return 0
+
+    app.state.workers = workers
+    sock = bind_socket(host, port)
+    try:
+        return Supervisor(app, sock, workers, log_level, graceful_timeout).run()
+    finally:
+        sock.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with pre-forked uvicorn workers.")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 0)) or None,
+                        help="Worker processes (default: WEB_CONCURRENCY, else 1); admin endpoints need a single worker")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Seconds to let workers finish in-flight requests on shutdown")
+    args = parser.parse_args(argv)
+    sys.exit(serve(args.host, args.port, args.workers, args.log_level, args.graceful_timeout))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# socket_server.py
+"""Low-latency scoring over a persistent TCP or Unix socket.
+
+Each frame is a 5-byte header (kind: uint8, payload length: little-endian
+uint32) followed by the payload. Clients send ``FEATURES`` frames holding
+the float32 matrix of the binary HTTP format (see ``app/binary.py``) and
+receive one ``PREDICTIONS`` frame (int32 clusters, then float32
+confidences) or ``ERROR`` frame (UTF-8 message) per request, in order.
+Clients may keep many requests in flight on one connection, so feature
+batches and results stream in both directions. A ``SCHEMA_REQUEST``
+frame is answered with a ``SCHEMA`` frame: JSON with the feature order
+and model version.
+
+Run the server (from the repository root):
+
+    python -m app.socket_server --port 9000
+    python -m app.socket_server --unix /tmp/adaptnet.sock
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+
+import numpy as np
+
+from app.binary import decode_features, decode_predictions, encode_features, encode_predictions
+from app.model_utils import predict_compiled_matrix
+from app.registry import ModelRegistry
+
+HEADER = struct.Struct("<BI")
+FEATURES, PREDICTIONS, ERROR, SCHEMA_REQUEST, SCHEMA = 1, 2, 3, 4, 5
+MAX_FRAME_BYTES = 64 * 2 ** 20
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a malformed or oversized frame."""
+
+def frame(kind, payload=b""):
+    return HEADER.pack(kind, len(payload)) + payload
+
+class ScoringServer:
+    """Serve predictions from the active model version of ``registry``."""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+        # Metrics
+        self.connections = 0
+        self.frames = 0
+        self.rows = 0
+        self.errors = 0
+
+    def score(self, kind, payload):
+        """Return the reply frame for one request frame."""
+        models = self.registry.active
+        if models is None:
+            return frame(ERROR, b"Models not loaded")
+        compiled = models["compiled"]
+        if kind == SCHEMA_REQUEST:
+            return frame(SCHEMA, json.dumps({
+                "feature_names": compiled["feature_names"],
+                "model_version": models["version"]
+            }).encode())
+        if kind != FEATURES:
+            raise ProtocolError(f"Unexpected frame kind {kind}")
+        try:
+            X = decode_features(payload, len(compiled["feature_names"]))
+            clusters, confidences = predict_compiled_matrix(X, compiled, return_confidence=True)
+        except Exception as e:
+            self.errors += 1
+            return frame(ERROR, str(e).encode())
+        self.rows += len(clusters)
+        return frame(PREDICTIONS, encode_predictions(clusters, confidences))
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        sock = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                try:
+                    kind, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+                except asyncio.IncompleteReadError:
+                    break
+                if length > MAX_FRAME_BYTES:
+                    writer.write(frame(ERROR, f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}".encode()))
+                    break
+                payload = await reader.readexactly(length)
+                self.frames += 1
+                try:
+                    writer.write(self.score(kind, payload))
+                except ProtocolError as e:
+                    writer.write(frame(ERROR, str(e).encode()))
+                    break
+                # Only wait for the socket when the peer is not reading fast enough
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+async def serve(host="127.0.0.1", port=9000, unix_path=None, poll_seconds=0.0):
+    registry = ModelRegistry()
+    registry.reload()
+    registry.start_polling(poll_seconds)
+    scoring = ScoringServer(registry)
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        server = await asyncio.start_unix_server(scoring.handle, path=unix_path)
+        print(f"Scoring server listening on {unix_path} (model {registry.active['version']})")
+    else:
+        server = await asyncio.start_server(scoring.handle, host, port)
+        print(f"Scoring server listening on {host}:{port} (model {registry.active['version']})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        registry.stop_polling()
+
+class ScoringClient:
+    """Blocking client for the socket protocol.
+
+    ``predict`` does one round trip; ``predict_stream`` pipelines batches,
+    keeping up to ``window`` requests in flight. A client is not thread-safe.
+    """
+
+    def __init__(self, host="127.0.0.1", port=9000, unix_path=None, timeout=30.0):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self.sock.makefile("rb")
+        self.feature_names = self.schema()["feature_names"]
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, kind, payload=b""):
+        self.sock.sendall(frame(kind, payload))
+
+    def _receive(self):
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ConnectionError("Scoring server closed the connection")
+        kind, length = HEADER.unpack(header)
+        payload = self._file.read(length)
+        if kind == ERROR:
+            raise ProtocolError(payload.decode(errors="replace"))
+        return kind, payload
+
+    def schema(self):
+        self._send(SCHEMA_REQUEST)
+        return json.loads(self._receive()[1])
+
+    def _payload(self, batch):
+        if isinstance(batch, np.ndarray):
+            return np.ascontiguousarray(batch, dtype="<f4").tobytes()
+        return encode_features(batch, self.feature_names)
+
+    def predict(self, batch):
+        """Score one batch (feature dicts, dict of columns or a matrix in feature order)."""
+        self._send(FEATURES, self._payload(batch))
+        return decode_predictions(self._receive()[1])
+
+    def predict_stream(self, batches, window=32):
+        """Yield ``(clusters, confidences)`` for each batch, in order, pipelining requests.
+
+        A sender thread writes up to ``window`` requests ahead while this
+        thread reads the replies. Sending and receiving from one thread
+        would deadlock once the unread replies and unsent requests fill both
+        socket buffers: the server stops reading while its writes wait. If
+        a reply is an error, the connection is left mid-stream; close it.
+        """
+        slots = threading.Semaphore(window)
+        sent = queue.Queue()
+        stop = threading.Event()
+        errors = []
+
+        def send_all():
+            try:
+                for batch in batches:
+                    slots.acquire()
+                    if stop.is_set():
+                        break
+                    self._send(FEATURES, self._payload(batch))
+                    sent.put(True)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                sent.put(None)
+
+        sender = threading.Thread(target=send_all, name="scoring-client-sender", daemon=True)
+        sender.start()
+        try:
+            while sent.get() is not None:
+                yield decode_predictions(self._receive()[1])
+                slots.release()
+            if errors:
+                raise errors[0]
+        finally:
+            stop.set()
+            slots.release()
+            sender.join(1.0)
+            if sender.is_alive():
+                # Stopped early while the sender is blocked writing: unblock it
+                self.sock.shutdown(socket.SHUT_RDWR)
+                sender.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve predictions over a length-prefixed socket protocol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--unix", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--poll-seconds", type=float, default=float(os.environ.get("ADAPTNET_MODEL_POLL_SECONDS", 0)),
+                        help="Reload models when the artifacts change (0 disables)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.poll_seconds))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
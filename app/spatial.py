@@ -0,0 +1,266 @@
+# spatial.py
+"""Grid index over the training sites in clustered_data.csv.
+
+Answers "which clusters lie within r km of this point" and "the k nearest
+historical sites" with great-circle (haversine) distances. Points are
+bucketed into fixed lat/lon cells and stored sorted by cell, so a query
+only computes distances for the handful of cells its search circle
+touches.
+
+Build the index ahead of time (from the repository root):
+
+    python -m app.spatial --cell-deg 0.5
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from app.model_utils import MODEL_DIR, load_all_models
+
+EARTH_RADIUS_KM = 6371.0088
+CLUSTERED_DATA_FILENAME = "clustered_data.csv"
+SPATIAL_INDEX_FILENAME = "spatial_index.npz"
+DEFAULT_CELL_DEG = 0.5
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance in km from one point to arrays of points (degrees)."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2.0) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def file_fingerprint(path):
+    """Size and mtime of ``path``, used to detect a stale prebuilt index."""
+    stat = os.stat(path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+def read_clustered_points(path, compiled=None, chunksize=1000000):
+    """Read Latitude, Longitude and Cluster from clustered_data.csv.
+
+    The trainer writes standardized coordinates; with ``compiled`` models
+    given, they are mapped back to degrees with the saved scaler.
+    """
+    # pandas is imported here so that importing the API does not pull it in
+    import pandas as pd
+
+    lats, lons, clusters = [], [], []
+    for chunk in pd.read_csv(path, usecols=["Latitude", "Longitude", "Cluster"], chunksize=chunksize):
+        lats.append(chunk["Latitude"].to_numpy(dtype=np.float64))
+        lons.append(chunk["Longitude"].to_numpy(dtype=np.float64))
+        clusters.append(chunk["Cluster"].to_numpy(dtype=np.int32))
+    lat = np.concatenate(lats) if lats else np.empty(0)
+    lon = np.concatenate(lons) if lons else np.empty(0)
+    cluster = np.concatenate(clusters) if clusters else np.empty(0, dtype=np.int32)
+
+    if compiled is not None:
+        names = compiled["feature_names"]
+        for values, col in ((lat, "Latitude"), (lon, "Longitude")):
+            j = names.index(col)
+            values *= compiled["scale"][j]
+            values += compiled["mean"][j]
+    return lat, lon, cluster
+
+class SpatialIndex:
+    """Points bucketed into ``cell_deg`` x ``cell_deg`` cells, sorted by cell.
+
+    ``cell_starts[c]:cell_starts[c + 1]`` is the slice of the sorted arrays
+    holding cell ``c``, so the cells in one latitude row that a query
+    touches are one or two contiguous slices. ``rows`` maps each sorted
+    point back to its row in clustered_data.csv.
+    """
+
+    def __init__(self, lat, lon, cluster, cell_deg=DEFAULT_CELL_DEG, rows=None, cell_starts=None, meta=None):
+        self.cell_deg = float(cell_deg)
+        self.n_lat = int(np.ceil(180.0 / self.cell_deg))
+        self.n_lon = int(np.ceil(360.0 / self.cell_deg))
+        self.meta = dict(meta or {})
+
+        if cell_starts is not None:
+            # Already sorted (loaded from a prebuilt artifact)
+            self.lat, self.lon, self.cluster = lat, lon, cluster
+            self.rows, self.cell_starts = rows, cell_starts
+            return
+
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        valid = np.isfinite(lat) & np.isfinite(lon)
+        rows = np.flatnonzero(valid)
+        lat = lat[valid].clip(-90.0, 90.0)
+        lon = (lon[valid] + 180.0) % 360.0 - 180.0
+
+        cells = self._cells(lat, lon)
+        order = np.argsort(cells, kind="stable")
+        self.lat = np.ascontiguousarray(lat[order])
+        self.lon = np.ascontiguousarray(lon[order])
+        self.cluster = np.ascontiguousarray(np.asarray(cluster)[valid][order], dtype=np.int32)
+        self.rows = np.ascontiguousarray(rows[order], dtype=np.int64)
+        self.cell_starts = np.searchsorted(cells[order], np.arange(self.n_lat * self.n_lon + 1)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.lat)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.lat, self.lon, self.cluster, self.rows, self.cell_starts))
+
+    def _cells(self, lat, lon):
+        i = ((lat + 90.0) // self.cell_deg).astype(np.int64).clip(0, self.n_lat - 1)
+        j = ((lon + 180.0) // self.cell_deg).astype(np.int64).clip(0, self.n_lon - 1)
+        return i * self.n_lon + j
+
+    def _candidates(self, lat, lon, radius_km):
+        """Indices of every point in the cells overlapping the search circle."""
+        angle = radius_km / EARTH_RADIUS_KM
+        if angle >= np.pi:
+            return np.arange(len(self))
+        lat_min = lat - np.degrees(angle)
+        lat_max = lat + np.degrees(angle)
+
+        # Longitude span of the circle; a circle over a pole spans every longitude
+        ratio = np.sin(angle) / np.cos(np.radians(lat)) if abs(lat) < 90.0 else 2.0
+        if lat_min <= -90.0 or lat_max >= 90.0 or ratio >= 1.0:
+            lon_ranges = [(0, self.n_lon - 1)]
+        else:
+            dlon = np.degrees(np.arcsin(ratio))
+            j0 = int((lon - dlon + 180.0) // self.cell_deg)
+            j1 = int((lon + dlon + 180.0) // self.cell_deg)
+            if j1 - j0 + 1 >= self.n_lon:
+                lon_ranges = [(0, self.n_lon - 1)]
+            elif j0 < 0:
+                lon_ranges = [(0, j1), (j0 + self.n_lon, self.n_lon - 1)]
+            elif j1 >= self.n_lon:
+                lon_ranges = [(j0, self.n_lon - 1), (0, j1 - self.n_lon)]
+            else:
+                lon_ranges = [(j0, j1)]
+
+        i0 = max(int((lat_min + 90.0) // self.cell_deg), 0)
+        i1 = min(int((lat_max + 90.0) // self.cell_deg), self.n_lat - 1)
+        slices = []
+        for i in range(i0, i1 + 1):
+            for j0, j1 in lon_ranges:
+                start = self.cell_starts[i * self.n_lon + j0]
+                stop = self.cell_starts[i * self.n_lon + j1 + 1]
+                if stop > start:
+                    slices.append(np.arange(start, stop))
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def within(self, lat, lon, radius_km):
+        """Indices (into the sorted arrays) and distances of points within ``radius_km``."""
+        candidates = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        mask = distances <= radius_km
+        return candidates[mask], distances[mask]
+
+    def nearest(self, lat, lon, k):
+        """Indices and distances of the ``k`` nearest points, closest first."""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Grow the search circle until it holds k points; a radius query is
+        # exact, so the k closest inside it are the k closest overall
+        radius_km = self.cell_deg * np.pi / 180.0 * EARTH_RADIUS_KM
+        while True:
+            index, distances = self.within(lat, lon, radius_km)
+            if len(index) >= k or radius_km >= np.pi * EARTH_RADIUS_KM:
+                break
+            radius_km *= 2.0
+        top = np.argpartition(distances, k - 1)[:k] if len(index) > k else np.arange(len(index))
+        top = top[np.argsort(distances[top], kind="stable")]
+        return index[top], distances[top]
+
+    def points(self, index, distances):
+        """JSON-ready description of the points at ``index``."""
+        return [
+            {"row": int(row), "latitude": float(lat), "longitude": float(lon),
+             "cluster": int(cluster), "distance_km": float(distance)}
+            for row, lat, lon, cluster, distance in zip(
+                self.rows[index], self.lat[index], self.lon[index], self.cluster[index], distances
+            )
+        ]
+
+    def save(self, path):
+        np.savez(
+            path,
+            lat=self.lat, lon=self.lon, cluster=self.cluster, rows=self.rows, cell_starts=self.cell_starts,
+            cell_deg=np.float64(self.cell_deg),
+            source_fingerprint=np.asarray(self.meta.get("source_fingerprint", [-1, -1]), dtype=np.int64),
+            model_version=np.str_(self.meta.get("model_version") or "")
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = {
+                "source_fingerprint": data["source_fingerprint"].tolist(),
+                "model_version": str(data["model_version"]) or None
+            }
+            return cls(
+                data["lat"], data["lon"], data["cluster"], cell_deg=float(data["cell_deg"]),
+                rows=data["rows"], cell_starts=data["cell_starts"], meta=meta
+            )
+
+    def stats(self):
+        return {
+            "points": len(self),
+            "cell_deg": self.cell_deg,
+            "memory_mb": round(self.nbytes / 2 ** 20, 2),
+            "model_version": self.meta.get("model_version"),
+            "source": self.meta.get("source")
+        }
+
+def load_spatial_index(model_dir=MODEL_DIR, models=None, cell_deg=DEFAULT_CELL_DEG, save=False):
+    """Load the prebuilt index if it matches clustered_data.csv, else build it.
+
+    ``models`` supplies the scaler used to turn the standardized
+    coordinates back into degrees; a prebuilt index made with a different
+    model version is rebuilt. A freshly built index is saved next to the
+    CSV only when ``save`` is set, as the build CLI does; the API builds in
+    memory and never writes to the (possibly read-only) model directory.
+    """
+    csv_path = os.path.join(model_dir, CLUSTERED_DATA_FILENAME)
+    index_path = os.path.join(model_dir, SPATIAL_INDEX_FILENAME)
+    fingerprint = file_fingerprint(csv_path).tolist()
+    version = models["version"] if models is not None else None
+
+    if os.path.exists(index_path):
+        try:
+            index = SpatialIndex.load(index_path)
+            if (index.meta["source_fingerprint"] == fingerprint and index.meta["model_version"] == version
+                    and index.cell_deg == cell_deg):
+                index.meta["source"] = "prebuilt"
+                return index
+        except Exception as e:
+            print(f"Ignoring spatial index: {str(e)}")
+
+    lat, lon, cluster = read_clustered_points(csv_path, models["compiled"] if models is not None else None)
+    index = SpatialIndex(lat, lon, cluster, cell_deg=cell_deg, meta={
+        "source_fingerprint": fingerprint,
+        "model_version": version
+    })
+    if save:
+        try:
+            index.save(index_path)
+        except OSError as e:
+            print(f"Could not save spatial index: {str(e)}")
+    index.meta["source"] = "built"
+    return index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the spatial index over clustered_data.csv")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--cell-deg", type=float, default=DEFAULT_CELL_DEG)
+    args = parser.parse_args(argv)
+
+    if args.cell_deg <= 0:
+        parser.error("--cell-deg must be positive")
+    models = load_all_models(args.model_dir)
+    index_path = os.path.join(args.model_dir, SPATIAL_INDEX_FILENAME)
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    index = load_spatial_index(args.model_dir, models, cell_deg=args.cell_deg, save=True)
+    print(f"Indexed {len(index)} points ({index.nbytes / 2 ** 20:.1f} MB) into {index_path}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
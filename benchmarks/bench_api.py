@@ -0,0 +1,256 @@
+# bench_api.py
+"""Load test of the FastAPI service plus in-process loader/preprocessing micro-benchmarks.
+
+Drives the API with concurrent async clients and a weighted mix of
+endpoints, then reports throughput and p50/p95/p99 latency per endpoint.
+By default the app runs in-process (ASGI transport, no sockets); pass
+``--start-server`` to launch uvicorn on localhost or ``--url`` to target a
+running server. Results are written as JSON so runs can be compared
+across commits with ``--baseline``. Run from the repository root:
+
+    python benchmarks/bench_api.py --concurrency 32 --requests 5000 \\
+        --mix predict=8,batch=1,clusters=1 --output bench_api.json
+
+Requires httpx (``pip install httpx``).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from bench_inference import random_features
+
+warnings.filterwarnings("ignore")
+
+ENDPOINTS = ("predict", "batch", "clusters", "nearest")
+
+def parse_mix(spec):
+    """Parse ``"predict=8,batch=1"`` into ``{"predict": 8.0, "batch": 1.0}``."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}', expected one of {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1.0)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The request mix needs at least one endpoint with a positive weight")
+    return mix
+
+def build_request(name, rng, batch_size):
+    """Method, path and JSON body for one request to endpoint ``name``."""
+    if name == "predict":
+        return "POST", "/predict", {"features": random_features(rng, 1)[0]}
+    if name == "batch":
+        return "POST", "/predict/batch", {"records": random_features(rng, batch_size)}
+    if name == "clusters":
+        return "GET", f"/clusters/{int(rng.integers(0, 5))}", None
+    site = random_features(rng, 1)[0]
+    return "GET", f"/sites/nearest?lat={site['Latitude']}&lon={site['Longitude']}&k=10", None
+
+def percentiles_ms(latencies):
+    if not latencies:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "max": max(latencies) * 1000}
+
+async def load_test(client, mix, n_requests, concurrency, batch_size, seed):
+    rng = np.random.default_rng(seed)
+    names = list(mix)
+    weights = np.array([mix[name] for name in names]) / sum(mix.values())
+    # Requests are generated up front so client-side work is not timed
+    plan = [(name, *build_request(name, rng, batch_size)) for name in rng.choice(names, n_requests, p=weights)]
+    results = {name: {"latencies": [], "errors": 0, "status": {}} for name in names}
+    position = 0
+
+    async def worker():
+        nonlocal position
+        while position < len(plan):
+            name, method, path, body = plan[position]
+            position += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except Exception:
+                status = "error"
+            elapsed = time.perf_counter() - start
+            result = results[name]
+            result["status"][str(status)] = result["status"].get(str(status), 0) + 1
+            if status == 200:
+                result["latencies"].append(elapsed)
+            else:
+                result["errors"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    report = {"wall_seconds": wall, "throughput_rps": n_requests / wall, "endpoints": {}}
+    for name, result in results.items():
+        report["endpoints"][name] = {
+            "requests": len(result["latencies"]) + result["errors"],
+            "errors": result["errors"],
+            "status": result["status"],
+            "throughput_rps": len(result["latencies"]) / wall,
+            "latency_ms": percentiles_ms(result["latencies"])
+        }
+    return report
+
+def start_server(port):
+    """Launch uvicorn on localhost and wait until ``GET /`` answers."""
+    import httpx
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT_DIR
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if httpx.get(url).status_code == 200:
+                return process, url
+        except httpx.TransportError:
+            pass
+        if process.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {process.returncode}")
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"Server on {url} did not start")
+
+def time_calls(func, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"median_ms": statistics.median(times) * 1000, "min_ms": min(times) * 1000, "runs": runs}
+
+def micro_benchmarks(runs, seed):
+    """In-process timings of load_all_models (per format) and preprocess_input."""
+    from app.model_utils import load_all_models, preprocess_input
+
+    results = {}
+    for fmt in ("pickle", "bundle"):
+        try:
+            results[f"load_all_models[{fmt}]"] = time_calls(lambda: load_all_models(fmt=fmt), max(1, runs // 100))
+        except Exception as e:
+            results[f"load_all_models[{fmt}]"] = {"error": str(e)}
+
+    models = load_all_models(fmt="pickle")
+    records = random_features(np.random.default_rng(seed), runs)
+    start = time.perf_counter()
+    for features in records:
+        preprocess_input(features, models)
+    results["preprocess_input"] = {"mean_us": (time.perf_counter() - start) / runs * 1e6, "runs": runs}
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def print_report(report, baseline=None):
+    print(f"{'endpoint':>10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, result in report["load"]["endpoints"].items():
+        latency = result["latency_ms"]
+        line = (f"{name:>10} {result['requests']:>9} {result['errors']:>7} {result['throughput_rps']:>9.1f} "
+                + " ".join(f"{latency[p]:>8.2f}" if latency[p] is not None else f"{'-':>8}" for p in ("p50", "p95", "p99")))
+        previous = baseline and baseline["load"]["endpoints"].get(name)
+        if previous and previous["latency_ms"]["p99"] and latency["p99"]:
+            line += (f"   vs baseline: req/s {result['throughput_rps'] / previous['throughput_rps'] - 1.0:+.1%}, "
+                     f"p99 {latency['p99'] / previous['latency_ms']['p99'] - 1.0:+.1%}")
+        print(line)
+    print(f"total: {report['load']['throughput_rps']:.1f} req/s over {report['load']['wall_seconds']:.2f} s")
+    for name, result in report.get("micro", {}).items():
+        print(f"{name:>24}: {json.dumps(result)}")
+
+async def run(args):
+    try:
+        import httpx
+    except ImportError:
+        raise SystemExit("bench_api.py requires httpx: pip install httpx")
+
+    process = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        target = args.url
+    elif args.start_server:
+        process, target = start_server(args.port)
+        client = httpx.AsyncClient(base_url=target, timeout=args.timeout)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+        target = "in-process"
+
+    try:
+        async with client:
+            # Warm up caches, pools and lazily imported modules before timing
+            await load_test(client, args.mix, min(args.requests, args.warmup), args.concurrency, args.batch_size, args.seed + 1)
+            return target, await load_test(client, args.mix, args.requests, args.concurrency, args.batch_size, args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--start-server", action="store_true", help="Launch uvicorn on localhost for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--mix", type=parse_mix, default="predict=8,batch=1,clusters=1",
+                        help=f"Weighted endpoints from: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--batch-size", type=int, default=100, help="Records per /predict/batch request")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--micro-runs", type=int, default=1000, help="0 skips the in-process micro-benchmarks")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a JSON file from an earlier run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    target, load = asyncio.run(run(args))
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "target": target,
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "mix": args.mix,
+            "batch_size": args.batch_size
+        },
+        "load": load
+    }
+    if args.micro_runs > 0:
+        report["micro"] = micro_benchmarks(args.micro_runs, args.seed)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Baseline: commit {baseline.get('commit')}, target {baseline.get('target')}")
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench_binary.py
+"""Payload size and throughput of the binary wire format vs JSON.
+
+Scores the same records through /predict/batch (JSON records and JSON
+columns) and /predict/binary at several batch sizes, and reports request
+and response bytes, rows per second end to end, and whether all three
+agree on the clusters. The app runs in-process over the ASGI transport
+unless ``--url`` is given. Run from the repository root:
+
+    python benchmarks/bench_binary.py --batch-sizes 1 100 10000 --repeats 20
+
+Requires httpx (``pip install httpx``).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.binary import FEATURES_CONTENT_TYPE, decode_predictions, encode_features
+from bench_inference import random_features
+
+warnings.filterwarnings("ignore")
+
+def json_body(payload):
+    return json.dumps(payload).encode()
+
+async def measure(client, path, body, content_type, repeats):
+    """Best-of-``repeats`` seconds for one request, and the last response."""
+    best, response = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = await client.post(path, content=body, headers={"Content-Type": content_type})
+        best = min(best, time.perf_counter() - start)
+        response.raise_for_status()
+    return best, response
+
+async def run(args):
+    try:
+        import httpx
+    except ImportError:
+        raise SystemExit("bench_binary.py requires httpx: pip install httpx")
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=120.0)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120.0)
+
+    rng = np.random.default_rng(args.seed)
+    async with client:
+        feature_names = (await client.get("/predict/binary/schema")).json()["feature_names"]
+        print(f"{'rows':>7} {'format':>13} {'request B':>11} {'response B':>11} {'rows/s':>12} {'vs JSON':>8}")
+        for n in args.batch_sizes:
+            records = random_features(rng, n)
+            # Round through float32 so every format scores identical values
+            records = [{name: float(np.float32(value)) for name, value in record.items()} for record in records]
+            columns = {name: [record[name] for record in records] for name in feature_names}
+            bodies = {
+                "json-records": (json_body({"records": records}), "application/json", "/predict/batch"),
+                "json-columns": (json_body({"columns": columns}), "application/json", "/predict/batch"),
+                "binary": (encode_features(records, feature_names), FEATURES_CONTENT_TYPE, "/predict/binary")
+            }
+
+            clusters = {}
+            baseline = None
+            for name, (body, content_type, path) in bodies.items():
+                seconds, response = await measure(client, path, body, content_type, args.repeats)
+                if name == "binary":
+                    clusters[name] = decode_predictions(response.content)[0].tolist()
+                else:
+                    clusters[name] = response.json()["predictions"]["clusters"]
+                rate = n / seconds
+                baseline = baseline or rate
+                print(f"{n:>7} {name:>13} {len(body):>11} {len(response.content):>11} {rate:>12,.0f} "
+                      f"{rate / baseline:>7.2f}x")
+            if not clusters["binary"] == clusters["json-records"] == clusters["json-columns"]:
+                print(f"{'':>7} WARNING: formats disagree on clusters for {n} rows")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
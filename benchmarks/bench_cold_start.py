@@ -0,0 +1,67 @@
+# bench_cold_start.py
+"""Cold-start time and RSS of loading models from pickles vs the mmap bundle.
+
+Every run is a fresh interpreter, so imports are included in the timing.
+Run from the repository root after training (or exporting the bundle):
+
+    python benchmarks/bench_cold_start.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter; prints one JSON line
+PROBE = """
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+if {app!r}:
+    import app.main as main
+    models = main.registry.active
+else:
+    from app.model_utils import load_all_models
+    models = load_all_models(fmt={fmt!r})
+from app.model_utils import predict_compiled
+features = {{name: 0.0 for name in models["compiled"]["feature_names"]}}
+predict_compiled(features, models["compiled"])
+elapsed = time.perf_counter() - start
+with open("/proc/self/status") as f:
+    rss = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": rss,
+    "format": models["format"],
+    "sklearn_imported": "sklearn" in sys.modules,
+    "pandas_imported": "pandas" in sys.modules
+}}))
+"""
+
+def probe(fmt, whole_app):
+    env = dict(os.environ, ADAPTNET_MODEL_FORMAT=fmt)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(fmt=fmt, app=whole_app)],
+        cwd=ROOT_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scope':>12} {'format':>8} {'median s':>9} {'RSS MB':>8} {'sklearn':>8} {'pandas':>7}")
+    for whole_app in (False, True):
+        for fmt in ("pickle", "bundle"):
+            results = [probe(fmt, whole_app) for _ in range(args.runs)]
+            print(f"{'app.main' if whole_app else 'loader':>12} {results[0]['format']:>8} "
+                  f"{statistics.median(r['seconds'] for r in results):>9.3f} "
+                  f"{statistics.median(r['rss_mb'] for r in results):>8.1f} "
+                  f"{str(results[0]['sklearn_imported']):>8} {str(results[0]['pandas_imported']):>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench_dataset_cache.py
+"""Load time and memory of the columnar dataset cache vs parsing the CSV.
+
+For each size, writes a synthetic CSV in the climate_vulnerability_dataset.csv
+schema and loads it in fresh processes four ways: ``pd.read_csv``, the
+first cached load (hash plus conversion), a warm cached load of every
+column, and a warm cached load of only the trainer's feature columns.
+Reports seconds, the extra peak RSS of the load and the resulting
+DataFrame's size. Run from the repository root:
+
+    python benchmarks/bench_dataset_cache.py --rows 5000 1000000 10000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "scripts"))
+
+import pandas as pd
+
+from bench_preprocess import current_rss_mb, peak_rss_mb, reset_peak_rss, synthetic_dataset
+from dataset_cache import ensure_cache, read_cached
+
+MODES = ("csv", "cache-build", "cache", "cache-features")
+FEATURE_COLS = [
+    "Temperature_Anomaly", "Precipitation_Change", "Drought_Index", "Latitude", "Longitude", "Elevation",
+    "Climate_Risk_Level", "Land_Use_Type"
+]
+
+def write_csv(path, n_rows, block=1000000):
+    """Write the synthetic dataset in blocks so the generator never holds it all."""
+    for start in range(0, n_rows, block):
+        synthetic_dataset(min(block, n_rows - start), seed=start).to_csv(
+            path, index=False, header=start == 0, mode="w" if start == 0 else "a"
+        )
+
+def run_worker(mode, csv_path, cache_dir):
+    """Load the dataset one way in this process and print the measurements."""
+    baseline = current_rss_mb() if reset_peak_rss() else peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "csv":
+        frame = pd.read_csv(csv_path)
+    else:
+        meta = ensure_cache(csv_path, cache_dir)
+        frame = read_cached(meta, FEATURE_COLS if mode == "cache-features" else None)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "mode": mode,
+        "seconds": elapsed,
+        "extra_peak_rss_mb": peak_rss_mb() - baseline,
+        "frame_mb": frame.memory_usage(deep=True).sum() / 2 ** 20
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 1000000, 10000000])
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "CSV", "CACHE_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    results = []
+    print(f"{'rows':>10} {'mode':>15} {'seconds':>9} {'vs CSV':>8} {'extra peak RSS (MB)':>20} {'frame (MB)':>11}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as work_dir:
+            csv_path = os.path.join(work_dir, "dataset.csv")
+            write_csv(csv_path, n_rows)
+            csv_seconds = None
+            for mode in MODES:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, csv_path, os.path.join(work_dir, "cache")],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                result["rows"] = n_rows
+                results.append(result)
+                csv_seconds = csv_seconds or result["seconds"]
+                print(f"{n_rows:>10} {mode:>15} {result['seconds']:>9.2f} {csv_seconds / result['seconds']:>7.1f}x "
+                      f"{result['extra_peak_rss_mb']:>20.0f} {result['frame_mb']:>11.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# bench_frontend.py
+"""Interactive prediction latency of the Streamlit frontend's API calls, before and after pooling.
+
+Replays what one button press costs the frontend against a (by default
+remote) backend:
+
+- before: ``requests.post`` per press, opening a new TCP/TLS connection;
+- pooled: ``ApiClient.predict`` over the keep-alive session that the
+  frontend now keeps in Streamlit's resource cache;
+- memoized: a rerun with unchanged inputs, answered from the data cache
+  without a request.
+
+Run from the repository root (``--url`` defaults to ADAPTNET_API_URL or
+the deployed Render service):
+
+    python benchmarks/bench_frontend.py --url http://127.0.0.1:8000 --presses 50
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "frontend"))
+
+from api_client import API_URL, ApiClient
+from bench_inference import random_features
+
+warnings.filterwarnings("ignore")
+
+def summarize(name, times):
+    ms = np.asarray(times) * 1e3
+    p50, p95 = np.percentile(ms, [50, 95])
+    print(f"{name:<28} {p50:>9.1f} {p95:>9.1f} {ms.max():>9.1f}")
+    return p50
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--presses", type=int, default=30, help="Distinct inputs submitted per mode")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    inputs = random_features(rng, args.presses)
+    url = args.url.rstrip("/")
+
+    # Wake the backend (Render free instances sleep) so neither mode pays the cold start
+    client = ApiClient(url)
+    client.predict(inputs[0])
+
+    before = []
+    for features in inputs:
+        start = time.perf_counter()
+        response = requests.post(f"{url}/predict", json={"features": features}, timeout=30)
+        response.raise_for_status()
+        response.json()
+        before.append(time.perf_counter() - start)
+
+    pooled, memo = [], {}
+    for features in inputs:
+        start = time.perf_counter()
+        memo[tuple(sorted(features.items()))] = client.predict(features)
+        pooled.append(time.perf_counter() - start)
+
+    memoized = []
+    for features in inputs:
+        start = time.perf_counter()
+        memo[tuple(sorted(features.items()))]
+        memoized.append(time.perf_counter() - start)
+
+    print(f"Backend: {url}")
+    print(f"{'mode':<28} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    baseline = summarize("before (new connection)", before)
+    p50 = summarize("pooled keep-alive", pooled)
+    summarize("memoized rerun", memoized)
+    print(f"Pooled p50 is {baseline / p50:.1f}x faster; client stats: {client.stats()}")
+    client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# bench_incremental.py
+"""Incremental warm-start retraining vs a full retrain after appending rows.
+
+Trains on a synthetic base dataset, appends new rows, and then both runs
+AdaptationNetTrainer.train_incremental and retrains from scratch with
+train() on the combined data. Reports the wall time of each, how far the
+incremental centroids are from the full refit's (matched one to one, in
+standardized units of the full refit's scaler), whether the full refit
+permuted the cluster IDs, and how often both agree on the new rows.
+Run from the repository root:
+
+    python benchmarks/bench_incremental.py --base-rows 1000000 --new-rows 1000 10000 100000
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "scripts"))
+
+from AdaptnetTM import AdaptationNetTrainer
+from bench_preprocess import synthetic_dataset
+from scipy.optimize import linear_sum_assignment
+
+def make_trainer(data_path, model_dir, cache_dir):
+    trainer = AdaptationNetTrainer()
+    trainer.data_path = data_path
+    trainer.model_dir = model_dir
+    trainer.cache_dir = cache_dir
+    return trainer
+
+def timed(fn):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+def saved_model(model_dir):
+    """Centroids in original units, plus the scaler and model."""
+    scaler = joblib.load(os.path.join(model_dir, "scaler.pkl"))
+    kmeans = joblib.load(os.path.join(model_dir, "kmeans_model.pkl"))
+    return kmeans.cluster_centers_ * scaler.scale_ + scaler.mean_, scaler, kmeans
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-rows", type=int, default=200000)
+    parser.add_argument("--new-rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        base_csv = os.path.join(work_dir, "base.csv")
+        base_models = os.path.join(work_dir, "base_models")
+        os.makedirs(base_models)
+        synthetic_dataset(args.base_rows, seed=0).to_csv(base_csv, index=False)
+        base_seconds = timed(make_trainer(base_csv, base_models, os.path.join(work_dir, "cache")).train)
+        print(f"Base model: {args.base_rows} rows trained in {base_seconds:.1f}s\n")
+
+        print(f"{'new rows':>9} {'incremental s':>14} {'full s':>8} {'speedup':>8} "
+              f"{'mean drift':>11} {'max drift':>10} {'full permuted':>14} {'new-row agreement':>18}")
+        for n_new in args.new_rows:
+            data_path = os.path.join(work_dir, f"data_{n_new}.csv")
+            shutil.copyfile(base_csv, data_path)
+            appended = synthetic_dataset(n_new, seed=n_new)
+            appended.to_csv(data_path, index=False, header=False, mode="a")
+
+            inc_dir = os.path.join(work_dir, f"incremental_{n_new}")
+            full_dir = os.path.join(work_dir, f"full_{n_new}")
+            # The base watermark still matches: data_path starts with base.csv's bytes
+            shutil.copytree(base_models, inc_dir)
+            os.makedirs(full_dir)
+
+            cache_dir = os.path.join(work_dir, "cache")
+            inc_seconds = timed(lambda: make_trainer(data_path, inc_dir, cache_dir).train_incremental(args.iterations))
+            full_seconds = timed(make_trainer(data_path, full_dir, cache_dir).train)
+
+            inc_centers, _, inc_model = saved_model(inc_dir)
+            full_centers, full_scaler, full_model = saved_model(full_dir)
+            # Pair each incremental cluster with its closest full-refit cluster
+            inc_std = (inc_centers - full_scaler.mean_) / full_scaler.scale_
+            full_std = (full_centers - full_scaler.mean_) / full_scaler.scale_
+            cost = np.linalg.norm(inc_std[:, None, :] - full_std[None, :, :], axis=2)
+            rows, cols = linear_sum_assignment(cost)
+            drift = cost[rows, cols]
+            permuted = bool((cols != rows).any())
+
+            # Agreement on the new rows once the full refit's IDs are mapped back
+            trainer = make_trainer(data_path, full_dir, cache_dir)
+            features = trainer.encode_categoricals(appended.copy(), trainer.build_label_encoders())
+            feature_cols = trainer.numerical_cols + trainer.categorical_cols
+            inc_labels = inc_model.predict(
+                trainer.impute_and_scale(features.copy(), joblib.load(os.path.join(inc_dir, "scaler.pkl")))[feature_cols]
+            )
+            full_labels = full_model.predict(trainer.impute_and_scale(features.copy(), full_scaler)[feature_cols])
+            to_incremental = np.empty(len(cols), dtype=int)
+            to_incremental[cols] = rows
+            agreement = float(np.mean(to_incremental[full_labels] == inc_labels))
+
+            print(f"{n_new:>9} {inc_seconds:>14.2f} {full_seconds:>8.2f} {full_seconds / inc_seconds:>7.1f}x "
+                  f"{drift.mean():>11.4f} {drift.max():>10.4f} {str(permuted):>14} {agreement:>17.1%}")
+
+if __name__ == "__main__":
+    main()
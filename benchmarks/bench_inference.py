@@ -0,0 +1,94 @@
+# bench_inference.py
+"""Micro-benchmark of single-record inference: sklearn path vs compiled path.
+
+Also measures what the confidence score costs on top of the cluster
+assignment, per request and in batch throughput. Run from the repository
+root:
+
+    python benchmarks/bench_inference.py --iterations 5000 --batch-size 10000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.model_utils import load_all_models, predict_compiled, predict_compiled_batch, preprocess_input
+
+warnings.filterwarnings("ignore")
+
+def random_features(rng, n):
+    """Generate ``n`` random feature dicts covering the valid categories."""
+    records = []
+    for _ in range(n):
+        records.append({
+            "Temperature_Anomaly": float(rng.normal(0.5, 1.5)),
+            "Precipitation_Change": float(rng.normal(0.0, 25.0)),
+            "Drought_Index": float(rng.uniform(0.0, 10.0)),
+            "Latitude": float(rng.uniform(-90.0, 90.0)),
+            "Longitude": float(rng.uniform(-180.0, 180.0)),
+            "Elevation": float(rng.uniform(0.0, 5000.0)),
+            "Climate_Risk_Level": int(rng.integers(0, 5)),
+            "Land_Use_Type": int(rng.integers(0, 4))
+        })
+    return records
+
+def sklearn_predict(features, models):
+    return int(models["kmeans"].predict(preprocess_input(features, models))[0])
+
+def time_per_call(func, records, models, **kwargs):
+    start = time.perf_counter()
+    for features in records:
+        func(features, models, **kwargs)
+    return (time.perf_counter() - start) / len(records)
+
+def batch_throughput(records, compiled, repeats, **kwargs):
+    """Best-of-``repeats`` rows per second of one batch call."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_compiled_batch(records, compiled, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return len(records["Latitude"]) / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    models = load_all_models()
+    compiled = models["compiled"]
+    records = random_features(np.random.default_rng(args.seed), args.iterations)
+
+    # The two paths must agree on every record before timing means anything
+    mismatches = sum(
+        sklearn_predict(features, models) != predict_compiled(features, compiled)
+        for features in records
+    )
+    print(f"Cluster mismatches: {mismatches}/{len(records)}")
+
+    sklearn_cost = time_per_call(sklearn_predict, records, models)
+    compiled_cost = time_per_call(predict_compiled, records, compiled)
+    print(f"sklearn path:  {sklearn_cost * 1e6:9.1f} us/request")
+    print(f"compiled path: {compiled_cost * 1e6:9.1f} us/request")
+    print(f"speedup:       {sklearn_cost / compiled_cost:9.1f}x")
+
+    scored_cost = time_per_call(predict_compiled, records, compiled, return_confidence=True)
+    print(f"+ confidence:  {scored_cost * 1e6:9.1f} us/request ({scored_cost / compiled_cost - 1.0:+.1%})")
+
+    batch = random_features(np.random.default_rng(args.seed + 1), args.batch_size)
+    columns = {name: [features[name] for features in batch] for name in batch[0]}
+    plain = batch_throughput(columns, compiled, args.repeats)
+    scored = batch_throughput(columns, compiled, args.repeats, return_confidence=True)
+    print(f"batch of {args.batch_size}: {plain:,.0f} rows/s, {scored:,.0f} rows/s with confidence "
+          f"({scored / plain - 1.0:+.1%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# bench_metrics.py
+"""Overhead of the /metrics instrumentation on the /predict hot path.
+
+Times the exact metric updates one /predict request makes (middleware
+counter and latency histogram, four stage observations, one cluster
+assignment) and compares them with the cost of the prediction itself,
+then times a scrape. Run from the repository root:
+
+    python benchmarks/bench_metrics.py --iterations 100000
+
+For an end-to-end A/B, run bench_api.py with ADAPTNET_METRICS=0 and
+ADAPTNET_METRICS=1 and compare the two with --baseline.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.metrics import MetricsRegistry
+from app.model_utils import load_all_models, predict_compiled
+from bench_inference import random_features
+
+warnings.filterwarnings("ignore")
+
+def instrumented_request(requests, latency, stages, assignments, start, cluster):
+    """The metric updates made by one /predict request."""
+    now = time.perf_counter()
+    stages.observe(now - start, "predict", "parse_validate")
+    stages.observe(now - start, "predict", "cache")
+    stages.observe(now - start, "predict", "inference")
+    assignments.inc("v1", cluster)
+    stages.observe(now - start, "predict", "serialization")
+    requests.inc("predict", "POST", 200)
+    latency.observe(time.perf_counter() - start, "predict")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    metrics = MetricsRegistry()
+    requests = metrics.counter("requests_total", "", ("endpoint", "method", "status"))
+    latency = metrics.histogram("request_duration_seconds", "", ("endpoint",))
+    stages = metrics.histogram("stage_duration_seconds", "", ("endpoint", "stage"))
+    assignments = metrics.counter("cluster_assignments_total", "", ("model_version", "cluster"))
+
+    clusters = np.random.default_rng(args.seed).integers(0, 5, args.iterations).tolist()
+    start = time.perf_counter()
+    for cluster in clusters:
+        instrumented_request(requests, latency, stages, assignments, time.perf_counter(), cluster)
+    overhead = (time.perf_counter() - start) / args.iterations
+
+    models = load_all_models()
+    records = random_features(np.random.default_rng(args.seed), min(args.iterations, 5000))
+    start = time.perf_counter()
+    for features in records:
+        predict_compiled(features, models["compiled"], return_confidence=True)
+    inference = (time.perf_counter() - start) / len(records)
+
+    start = time.perf_counter()
+    text = metrics.render()
+    scrape = time.perf_counter() - start
+
+    print(f"metric updates per request: {overhead * 1e6:8.2f} us")
+    print(f"compiled inference:         {inference * 1e6:8.2f} us ({overhead / inference:.1%} of it)")
+    print(f"scrape ({len(text.splitlines())} lines):       {scrape * 1e3:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
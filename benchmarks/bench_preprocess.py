@@ -0,0 +1,152 @@
+# bench_preprocess.py
+"""Wall time and peak RSS of AdaptationNetTrainer.preprocess_data vs the previous implementation.
+
+Each measurement runs in a fresh subprocess on a synthetic dataset so peak
+RSS is not polluted by earlier runs. Run from the repository root:
+
+    python benchmarks/bench_preprocess.py --rows 1000000 10000000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "scripts"))
+
+from AdaptnetTM import AdaptationNetTrainer
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+RISK_LEVELS = ["Very Low", "Low", "Medium", "High", "Very High", "Moderate"]
+LAND_USES = ["Natural", "Agricultural", "Urban", "Mixed", "Desert"]
+
+def synthetic_dataset(n_rows, seed=0, missing_rate=0.01):
+    """Build a dataset in the climate_vulnerability_dataset.csv schema."""
+    rng = np.random.default_rng(seed)
+    data = {
+        "Temperature_Anomaly": rng.normal(0.5, 1.5, n_rows),
+        "Precipitation_Change": rng.normal(0.0, 25.0, n_rows),
+        "Drought_Index": rng.uniform(0.0, 10.0, n_rows),
+        "Climate_Risk_Level": np.array(RISK_LEVELS, dtype=object)[rng.integers(0, len(RISK_LEVELS), n_rows)],
+        "Latitude": rng.uniform(-90.0, 90.0, n_rows),
+        "Longitude": rng.uniform(-180.0, 180.0, n_rows),
+        "Elevation": rng.integers(0, 5000, n_rows).astype(float),
+        "Land_Use_Type": np.array(LAND_USES, dtype=object)[rng.integers(0, len(LAND_USES), n_rows)],
+        "Employment_Rate": rng.uniform(30.0, 100.0, n_rows)
+    }
+    for col in ["Temperature_Anomaly", "Precipitation_Change", "Elevation"]:
+        data[col][rng.random(n_rows) < missing_rate] = np.nan
+    return pd.DataFrame(data)
+
+def legacy_preprocess(trainer, dataset):
+    """The original preprocess_data, kept here as the comparison baseline."""
+    dataset[trainer.numerical_cols] = dataset[trainer.numerical_cols].fillna(
+        dataset[trainer.numerical_cols].mean()
+    )
+    for col in trainer.categorical_cols:
+        print(f"{col}: {dataset[col].unique()}")
+    label_encoders = {}
+    risk_encoder = LabelEncoder()
+    if dataset['Climate_Risk_Level'].dtype == 'O':
+        dataset['Climate_Risk_Level'] = dataset['Climate_Risk_Level'].map(trainer.risk_level_mapping)
+    dataset['Climate_Risk_Level'] = dataset['Climate_Risk_Level'].fillna(0)
+    risk_encoder.fit([0, 1, 2, 3, 4])
+    dataset['Climate_Risk_Level'] = risk_encoder.transform(dataset['Climate_Risk_Level'].astype(int))
+    label_encoders['Climate_Risk_Level'] = risk_encoder
+    land_encoder = LabelEncoder()
+    if dataset['Land_Use_Type'].dtype == 'O':
+        dataset['Land_Use_Type'] = dataset['Land_Use_Type'].map(trainer.land_use_mapping)
+    dataset['Land_Use_Type'] = dataset['Land_Use_Type'].fillna(0)
+    land_encoder.fit([0, 1, 2, 3])
+    dataset['Land_Use_Type'] = land_encoder.transform(dataset['Land_Use_Type'].astype(int))
+    label_encoders['Land_Use_Type'] = land_encoder
+    scaler = StandardScaler()
+    feature_cols = trainer.numerical_cols + trainer.categorical_cols
+    dataset[feature_cols] = scaler.fit_transform(dataset[feature_cols])
+    trainer.save_preprocessors(label_encoders, scaler)
+    return dataset, feature_cols
+
+def _status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS counter (Linux); return False if unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def current_rss_mb():
+    try:
+        return _status_mb("VmRSS")
+    except (OSError, KeyError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    try:
+        return _status_mb("VmHWM")
+    except (OSError, KeyError):
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_worker(implementation, n_rows):
+    """Measure one implementation on one dataset size in this process."""
+    dataset = synthetic_dataset(n_rows)
+    # Without a reset the peak from building the dataset would mask ours
+    baseline = current_rss_mb() if reset_peak_rss() else peak_rss_mb()
+    with tempfile.TemporaryDirectory() as model_dir:
+        trainer = AdaptationNetTrainer()
+        trainer.model_dir = model_dir
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            if implementation == "legacy":
+                legacy_preprocess(trainer, dataset)
+            else:
+                trainer.preprocess_data(dataset)
+            elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "implementation": implementation,
+        "rows": n_rows,
+        "seconds": elapsed,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb()
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000, 10000000])
+    parser.add_argument("--worker", nargs=2, metavar=("IMPLEMENTATION", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], int(args.worker[1]))
+        return
+
+    print(f"{'rows':>10} {'implementation':>15} {'seconds':>9} {'extra peak RSS (MB)':>20}")
+    for n_rows in args.rows:
+        for implementation in ("legacy", "chunked"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", implementation, str(n_rows)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            extra = result["peak_rss_mb"] - result["baseline_rss_mb"]
+            print(f"{n_rows:>10} {implementation:>15} {result['seconds']:>9.2f} {extra:>20.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# bench_socket.py
+"""Per-call latency and throughput: socket scoring server vs FastAPI on one machine.
+
+Starts ``python -m app.socket_server`` and a single-worker
+``python -m app.server`` on localhost, then measures with one
+connection to each:
+
+- latency: sequential single-record calls (socket frame vs POST /predict
+  and POST /predict/binary over a keep-alive HTTP connection);
+- throughput: rows/s for batches of ``--batch-size`` records, pipelined
+  on the socket and sent back to back over HTTP;
+- large batches: ``--large-batches`` socket batches of
+  ``--large-batch-size`` rows, pipelined. With many megabytes in flight
+  this checks the stream does not stall on full socket buffers.
+
+Run from the repository root:
+
+    python benchmarks/bench_socket.py --calls 5000 --batch-size 1000 --large-batch-size 50000
+
+Requires httpx (``pip install httpx``).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.binary import FEATURES_CONTENT_TYPE, encode_features
+from app.socket_server import ScoringClient
+from bench_inference import random_features
+
+warnings.filterwarnings("ignore")
+
+def start(args, probe, timeout=60.0):
+    """Launch a server and wait until ``probe()`` succeeds."""
+    process = subprocess.Popen(args, cwd=ROOT_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{' '.join(args)} exited with code {process.returncode}")
+        try:
+            probe()
+            return process
+        except Exception:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"{' '.join(args)} did not start")
+
+def latency_us(call, payloads):
+    times = []
+    for payload in payloads:
+        start = time.perf_counter()
+        call(payload)
+        times.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(np.asarray(times) * 1e6, [50, 99])
+    return p50, p99
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--window", type=int, default=32, help="Socket requests kept in flight")
+    parser.add_argument("--large-batch-size", type=int, default=50000)
+    parser.add_argument("--large-batches", type=int, default=64)
+    parser.add_argument("--socket-port", type=int, default=9765)
+    parser.add_argument("--http-port", type=int, default=8767)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        import httpx
+    except ImportError:
+        raise SystemExit("bench_socket.py requires httpx: pip install httpx")
+
+    rng = np.random.default_rng(args.seed)
+    records = random_features(rng, args.calls)
+    batches = [random_features(rng, args.batch_size) for _ in range(args.batches)]
+    http_url = f"http://127.0.0.1:{args.http_port}"
+
+    socket_server = start(
+        [sys.executable, "-m", "app.socket_server", "--port", str(args.socket_port)],
+        lambda: ScoringClient(port=args.socket_port).close()
+    )
+    http_server = start(
+        [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(args.http_port),
+         "--workers", "1", "--log-level", "warning"],
+        lambda: httpx.get(http_url).raise_for_status()
+    )
+    try:
+        with ScoringClient(port=args.socket_port) as client, httpx.Client(base_url=http_url) as http:
+            names = client.feature_names
+            single = [encode_features([record], names) for record in records]
+            batch_bodies = [encode_features(batch, names) for batch in batches]
+            # The socket client sends matrices as-is; HTTP gets the same bytes
+            single_rows = [np.frombuffer(body, "<f4").reshape(1, -1) for body in single]
+            batch_rows = [np.frombuffer(body, "<f4").reshape(-1, len(names)) for body in batch_bodies]
+            binary_headers = {"Content-Type": FEATURES_CONTENT_TYPE}
+
+            # Warm up every path before timing
+            for record, row, body in zip(records[:200], single_rows[:200], single[:200]):
+                client.predict(row)
+                http.post("/predict", json={"features": record}).raise_for_status()
+                http.post("/predict/binary", content=body, headers=binary_headers).raise_for_status()
+
+            print(f"{'single-record latency':<34} {'p50 us':>9} {'p99 us':>9}")
+            rows = [
+                ("socket frame", client.predict, single_rows),
+                ("HTTP POST /predict (JSON)", lambda record: http.post("/predict", json={"features": record}), records),
+                ("HTTP POST /predict/binary",
+                 lambda body: http.post("/predict/binary", content=body, headers=binary_headers), single)
+            ]
+            for name, call, payloads in rows:
+                p50, p99 = latency_us(call, payloads)
+                print(f"{name:<34} {p50:>9.1f} {p99:>9.1f}")
+
+            n_rows = args.batch_size * args.batches
+            print(f"\n{f'throughput, batches of {args.batch_size}':<34} {'rows/s':>12}")
+            start_time = time.perf_counter()
+            for _ in client.predict_stream(batch_rows, window=args.window):
+                pass
+            print(f"{'socket (pipelined)':<34} {n_rows / (time.perf_counter() - start_time):>12,.0f}")
+
+            start_time = time.perf_counter()
+            for body in batch_bodies:
+                http.post("/predict/binary", content=body, headers=binary_headers).raise_for_status()
+            print(f"{'HTTP POST /predict/binary':<34} {n_rows / (time.perf_counter() - start_time):>12,.0f}")
+
+            start_time = time.perf_counter()
+            for batch in batches:
+                http.post("/predict/batch", content=json.dumps({"records": batch}),
+                          headers={"Content-Type": "application/json"}).raise_for_status()
+            print(f"{'HTTP POST /predict/batch (JSON)':<34} {n_rows / (time.perf_counter() - start_time):>12,.0f}")
+
+            # One large matrix sent repeatedly; the values do not matter for throughput
+            large = np.repeat(batch_rows[0], -(-args.large_batch_size // len(batch_rows[0])), axis=0)
+            large = large[:args.large_batch_size]
+            n_rows = len(large) * args.large_batches
+            print(f"\n{f'throughput, batches of {len(large)}':<34} {'rows/s':>12}")
+            start_time = time.perf_counter()
+            scored = sum(len(clusters) for clusters, _ in
+                         client.predict_stream((large for _ in range(args.large_batches)), window=args.window))
+            assert scored == n_rows, f"expected {n_rows} predictions, got {scored}"
+            print(f"{'socket (pipelined)':<34} {n_rows / (time.perf_counter() - start_time):>12,.0f}")
+    finally:
+        for process in (socket_server, http_server):
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
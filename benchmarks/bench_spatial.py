@@ -0,0 +1,73 @@
+# bench_spatial.py
+"""Build time, memory and query latency of the spatial site index.
+
+Points are drawn uniformly over the sphere, so every size is indexed and
+queried the same way. Run from the repository root:
+
+    python benchmarks/bench_spatial.py --sizes 5000 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.spatial import DEFAULT_CELL_DEG, SpatialIndex, haversine_km
+
+def random_sites(rng, n):
+    lat = np.degrees(np.arcsin(rng.uniform(-1.0, 1.0, n)))
+    lon = rng.uniform(-180.0, 180.0, n)
+    return lat, lon, rng.integers(0, 5, n).astype(np.int32)
+
+def latency_us(func, queries):
+    times = []
+    for lat, lon in queries:
+        start = time.perf_counter()
+        func(lat, lon)
+        times.append(time.perf_counter() - start)
+    times = np.asarray(times) * 1e6
+    return np.median(times), np.percentile(times, 99)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 1000000, 10000000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--radius-km", type=float, default=50.0)
+    parser.add_argument("--cell-deg", type=float, default=DEFAULT_CELL_DEG)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'points':>10} {'build s':>8} {'MB':>7} {'knn p50 us':>11} {'knn p99 us':>11} "
+          f"{'radius p50 us':>14} {'radius p99 us':>14} {'avg hits':>9}")
+    for n in args.sizes:
+        lat, lon, cluster = random_sites(rng, n)
+        start = time.perf_counter()
+        index = SpatialIndex(lat, lon, cluster, cell_deg=args.cell_deg)
+        build = time.perf_counter() - start
+
+        query_lat, query_lon, _ = random_sites(rng, args.queries)
+        queries = list(zip(query_lat.tolist(), query_lon.tolist()))
+
+        # Both query types must agree with a brute-force scan before timing means anything
+        for q_lat, q_lon in queries[:20]:
+            exact = haversine_km(q_lat, q_lon, index.lat, index.lon)
+            _, distances = index.nearest(q_lat, q_lon, args.k)
+            if not np.allclose(distances, np.sort(exact)[:args.k]):
+                raise SystemExit(f"nearest() disagrees with brute force at ({q_lat}, {q_lon})")
+            rows, _ = index.within(q_lat, q_lon, args.radius_km)
+            if len(rows) != int((exact <= args.radius_km).sum()):
+                raise SystemExit(f"within() disagrees with brute force at ({q_lat}, {q_lon})")
+
+        knn = latency_us(lambda a, b: index.nearest(a, b, args.k), queries)
+        radius = latency_us(lambda a, b: index.within(a, b, args.radius_km), queries)
+        hits = np.mean([len(index.within(a, b, args.radius_km)[0]) for a, b in queries[:200]])
+        print(f"{n:>10} {build:>8.2f} {index.nbytes / 2 ** 20:>7.1f} {knn[0]:>11.1f} {knn[1]:>11.1f} "
+              f"{radius[0]:>14.1f} {radius[1]:>14.1f} {hits:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# bench_workers.py
+"""Throughput scaling of the pre-fork launcher from 1 to N worker processes.
+
+For each worker count, starts ``python -m app.server`` on localhost and
+drives it with several bench_api.py client processes at once (a single
+Python client would saturate before the server does), then reports the
+combined throughput and the speedup over one worker. Run from the
+repository root:
+
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --clients 4 --requests 5000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_API = os.path.join(ROOT_DIR, "benchmarks", "bench_api.py")
+
+def wait_until_up(url, process, timeout=60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Launcher exited with code {process.returncode}")
+        try:
+            if httpx.get(url).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Server on {url} did not start")
+
+def run_clients(url, clients, requests, concurrency, mix, workdir):
+    """Run ``clients`` bench_api.py processes in parallel; returns their reports."""
+    outputs = [os.path.join(workdir, f"client{i}.json") for i in range(clients)]
+    processes = [
+        subprocess.Popen([
+            sys.executable, BENCH_API, "--url", url, "--requests", str(requests),
+            "--concurrency", str(concurrency), "--mix", mix, "--micro-runs", "0",
+            "--seed", str(i), "--output", output
+        ], cwd=ROOT_DIR, stdout=subprocess.DEVNULL)
+        for i, output in enumerate(outputs)
+    ]
+    for process in processes:
+        if process.wait() != 0:
+            raise SystemExit(f"bench_api.py failed with code {process.returncode}")
+    reports = []
+    for output in outputs:
+        with open(output) as f:
+            reports.append(json.load(f))
+    return reports
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=4, help="Client processes per run")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per client")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests per client")
+    parser.add_argument("--mix", default="predict=1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(args.port),
+             "--workers", str(workers), "--log-level", "warning"],
+            cwd=ROOT_DIR
+        )
+        try:
+            wait_until_up(url, server)
+            with tempfile.TemporaryDirectory() as workdir:
+                reports = run_clients(url, args.clients, args.requests, args.concurrency, args.mix, workdir)
+        finally:
+            server.terminate()
+            server.wait()
+
+        # Clients run concurrently, so their throughputs add up
+        endpoints = [endpoint for report in reports for endpoint in report["load"]["endpoints"].values()]
+        throughput = sum(report["load"]["throughput_rps"] for report in reports)
+        p50 = max(e["latency_ms"]["p50"] or 0.0 for e in endpoints)
+        p99 = max(e["latency_ms"]["p99"] or 0.0 for e in endpoints)
+        errors = sum(e["errors"] for e in endpoints)
+        baseline = results[0]["throughput_rps"] if results else throughput
+        results.append({"workers": workers, "throughput_rps": throughput, "p50_ms": p50, "p99_ms": p99,
+                        "errors": errors})
+        print(f"{workers:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x {p50:>8.2f} {p99:>8.2f} {errors:>7}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
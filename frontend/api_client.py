@@ -0,0 +1,104 @@
+# api_client.py
+"""HTTP client for the AdaptNet API, shared across Streamlit reruns.
+
+``ApiClient`` keeps one ``requests.Session`` with a keep-alive connection
+pool, so repeated predictions against the remote backend skip the TCP and
+TLS handshakes. Every call has connect/read timeouts, and connection
+errors, timeouts and 429/5xx responses (e.g. a cold start on Render) are
+retried with exponential backoff and full jitter. The Streamlit caching
+lives in ``app.py``; this module has no Streamlit dependency so it can
+also be benchmarked on its own (``benchmarks/bench_frontend.py``).
+"""
+import os
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = os.environ.get("ADAPTNET_API_URL", "https://adaptnet-final-j2oc.onrender.com")
+CONNECT_TIMEOUT = float(os.environ.get("ADAPTNET_API_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("ADAPTNET_API_READ_TIMEOUT", 30))
+RETRIES = int(os.environ.get("ADAPTNET_API_RETRIES", 3))
+BACKOFF_SECONDS = float(os.environ.get("ADAPTNET_API_BACKOFF_SECONDS", 0.25))
+POOL_SIZE = int(os.environ.get("ADAPTNET_API_POOL_SIZE", 10))
+RETRY_STATUSES = {429, 502, 503, 504}
+
+class ApiError(Exception):
+    """Raised when the API rejects a request or stays unreachable after retries."""
+
+class ApiClient:
+    """Pooled, retrying client for the prediction API."""
+
+    def __init__(self, base_url=API_URL, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries=RETRIES,
+                 backoff_seconds=BACKOFF_SECONDS, pool_size=POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Metrics
+        self.requests = 0
+        self.retried = 0
+        self.last_seconds = None
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, attempt):
+        # Full jitter: uniform in [0, base * 2^attempt]
+        time.sleep(random.uniform(0, self.backoff_seconds * 2 ** attempt))
+
+    def send(self, method, path, **kwargs):
+        """Send a request, retrying transient failures; returns the successful response."""
+        url = f"{self.base_url}{path}"
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            self.requests += 1
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last:
+                    raise ApiError(f"API unreachable at {self.base_url}: {e}") from e
+                self.retried += 1
+                self._backoff(attempt)
+                continue
+            if response.status_code in RETRY_STATUSES and not last:
+                self.retried += 1
+                self._backoff(attempt)
+                continue
+            self.last_seconds = time.perf_counter() - start
+            if response.status_code != 200:
+                try:
+                    detail = response.json()["detail"]
+                except (ValueError, KeyError, TypeError):
+                    detail = response.text or response.reason
+                raise ApiError(f"API returned {response.status_code}: {detail}")
+            return response
+
+    def request(self, method, path, **kwargs):
+        return self.send(method, path, **kwargs).json()
+
+    def predict(self, features):
+        return self.request("POST", "/predict", json={"features": features})
+
+    def score_csv(self, body, columns):
+        """Score CSV bytes (header plus rows) with /predict/stream; returns CSV of ``columns``."""
+        return self.send(
+            "POST", "/predict/stream",
+            params={"columns": ",".join(columns)},
+            files={"file": ("chunk.csv", body, "text/csv")}
+        ).content
+
+    def stats(self):
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "retried": self.retried,
+            "last_seconds": self.last_seconds
+        }
@@ -45,12 +45,17 @@
 # # Title and description
 # st.title("AdaptNet™ Climate Adaptation Recommendation System")
 # st.markdown("Welcome to AdaptNet™, your comprehensive climate adaptation planning assistant. Get detailed recommendations for adaptation measures based on your local conditions.")
+import os
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import requests
 import streamlit as st
 
+from api_client import API_URL, ApiClient, ApiError
+from map_view import cluster_map_figure, count_rows, iter_scored_chunks, reduce_points
+
 # Configure page
 st.set_page_config(
     page_title="AdaptNet™ Climate Adaptation Recommendation System",
@@ -86,95 +91,106 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# API endpoint
-API_URL = "https://adaptnet-final-j2oc.onrender.com/predict"  # Updated API URL
+# Streamlit reruns this whole script on every widget change. The API client
+# lives in the resource cache (one pooled session per server process) and
+# predictions, recommendations and figures in the data cache, so a rerun
+# with unchanged inputs makes no request and builds no new figure.
+# st.cache_resource/st.cache_data replaced the experimental names in 1.18.
+cache_resource = getattr(st, "cache_resource", None) or st.experimental_singleton
+cache_data = getattr(st, "cache_data", None) or st.experimental_memo
+PREDICTION_CACHE_SECONDS = int(os.environ.get("ADAPTNET_FRONTEND_CACHE_SECONDS", 600))
+
+# Dataset upload: rows per API request, and the most markers drawn on the map
+UPLOAD_CHUNK_ROWS = int(os.environ.get("ADAPTNET_UPLOAD_CHUNK_ROWS", 50000))
+MAP_MAX_POINTS = int(os.environ.get("ADAPTNET_MAP_MAX_POINTS", 100000))
+
+@cache_resource
+def get_client():
+    return ApiClient(API_URL)
+
+@cache_data(ttl=PREDICTION_CACHE_SECONDS, show_spinner=False)
+def predict(feature_items):
+    """Prediction for one input vector, given as sorted ``(name, value)`` pairs so it hashes cheaply."""
+    return get_client().predict(dict(feature_items))
 
 # Title and description
 st.title("AdaptNet™ Climate Adaptation Recommendation System")
 st.markdown("Welcome to AdaptNet™, your comprehensive climate adaptation planning assistant. Get detailed recommendations for adaptation measures based on your local conditions.")
 
+# Mirrors app/profiles.py; built once at import rather than on every prediction
+DETAILED_RECOMMENDATIONS = {
+    0: {
+        "risk_level": "Low Vulnerability",
+        "priority": "Monitor and Maintain",
+        "actions": [
+            "Implement regular monitoring systems for climate indicators",
+            "Develop early warning systems for extreme weather events",
+            "Create community awareness programs",
+            "Establish baseline data collection protocols"
+        ],
+        "timeline": "1-2 years",
+        "estimated_cost": "Low to Medium"
+    },
+    1: {
+        "risk_level": "Moderate Vulnerability",
+        "priority": "Preventive Action",
+        "actions": [
+            "Upgrade existing infrastructure for climate resilience",
+            "Implement water conservation measures",
+            "Develop heat action plans",
+            "Establish green corridors and urban forests"
+        ],
+        "timeline": "2-3 years",
+        "estimated_cost": "Medium"
+    },
+    2: {
+        "risk_level": "High Vulnerability",
+        "priority": "Immediate Action Required",
+        "actions": [
+            "Develop comprehensive flood management systems",
+            "Implement drought-resistant agriculture practices",
+            "Establish community cooling centers",
+            "Create disaster response protocols"
+        ],
+        "timeline": "1-2 years",
+        "estimated_cost": "High"
+    },
+    3: {
+        "risk_level": "Very High Vulnerability",
+        "priority": "Urgent Intervention",
+        "actions": [
+            "Relocate vulnerable communities from high-risk areas",
+            "Implement major infrastructure reinforcement",
+            "Develop comprehensive water management systems",
+            "Create emergency response centers"
+        ],
+        "timeline": "Immediate",
+        "estimated_cost": "Very High"
+    },
+    4: {
+        "risk_level": "Extreme Vulnerability",
+        "priority": "Critical Emergency Response",
+        "actions": [
+            "Immediate evacuation planning for high-risk areas",
+            "Rapid deployment of emergency infrastructure",
+            "Implementation of crisis management systems",
+            "International aid coordination"
+        ],
+        "timeline": "Immediate",
+        "estimated_cost": "Extremely High"
+    }
+}
+
+@cache_data
 def generate_detailed_recommendations(cluster):
     """Generate detailed adaptation recommendations based on cluster"""
-    base_recommendations = {
-        0: {
-            "risk_level": "Low Vulnerability",
-            "priority": "Monitor and Maintain",
-            "actions": [
-                "Implement regular monitoring systems for climate indicators",
-                "Develop early warning systems for extreme weather events",
-                "Create community awareness programs",
-                "Establish baseline data collection protocols"
-            ],
-            "timeline": "1-2 years",
-            "estimated_cost": "Low to Medium"
-        },
-        1: {
-            "risk_level": "Moderate Vulnerability",
-            "priority": "Preventive Action",
-            "actions": [
-                "Upgrade existing infrastructure for climate resilience",
-                "Implement water conservation measures",
-                "Develop heat action plans",
-                "Establish green corridors and urban forests"
-            ],
-            "timeline": "2-3 years",
-            "estimated_cost": "Medium"
-        },
-        2: {
-            "risk_level": "High Vulnerability",
-            "priority": "Immediate Action Required",
-            "actions": [
-                "Develop comprehensive flood management systems",
-                "Implement drought-resistant agriculture practices",
-                "Establish community cooling centers",
-                "Create disaster response protocols"
-            ],
-            "timeline": "1-2 years",
-            "estimated_cost": "High"
-        },
-        3: {
-            "risk_level": "Very High Vulnerability",
-            "priority": "Urgent Intervention",
-            "actions": [
-                "Relocate vulnerable communities from high-risk areas",
-                "Implement major infrastructure reinforcement",
-                "Develop comprehensive water management systems",
-                "Create emergency response centers"
-            ],
-            "timeline": "Immediate",
-            "estimated_cost": "Very High"
-        },
-        4: {
-            "risk_level": "Extreme Vulnerability",
-            "priority": "Critical Emergency Response",
-            "actions": [
-                "Immediate evacuation planning for high-risk areas",
-                "Rapid deployment of emergency infrastructure",
-                "Implementation of crisis management systems",
-                "International aid coordination"
-            ],
-            "timeline": "Immediate",
-            "estimated_cost": "Extremely High"
-        }
-    }
-    return base_recommendations.get(cluster, {})
+    return DETAILED_RECOMMENDATIONS.get(cluster, {})
 
-def display_impact_analysis(features, cluster, recommendations):
-    """Display detailed impact analysis visualizations"""
-    st.subheader("Vulnerability Assessment")
-    
-    # Create vulnerability radar chart
+@cache_data
+def vulnerability_figure(values):
+    """Radar chart of the vulnerability scores, built once per distinct score tuple"""
     categories = ['Climate Risk', 'Infrastructure', 'Socio-Economic', 'Resource Capacity']
-    
-    # Calculate vulnerability scores
-    climate_risk = (abs(features.get('Temperature_Anomaly', 0)) + 
-                   abs(features.get('Precipitation_Change', 0))/100) * 5
-    infrastructure = features.get('water_access', 50)/100 * 5
-    socio_economic = features.get('poverty_rate', 50)/100 * 5
-    resource = min(features.get('adaptation_budget', 1000)/10000 * 5, 5)  # Cap at 5
 
-    values = [climate_risk, infrastructure, socio_economic, resource]
-    
     fig = go.Figure()
     fig.add_trace(go.Scatterpolar(
         r=values,
@@ -191,8 +207,20 @@ def display_impact_analysis(features, cluster, recommendations):
             )),
         showlegend=False
     )
+    return fig
+
+def display_impact_analysis(features, cluster, recommendations):
+    """Display detailed impact analysis visualizations"""
+    st.subheader("Vulnerability Assessment")
     
-    st.plotly_chart(fig)
+    # Calculate vulnerability scores
+    climate_risk = (abs(features.get('Temperature_Anomaly', 0)) + 
+                   abs(features.get('Precipitation_Change', 0))/100) * 5
+    infrastructure = features.get('water_access', 50)/100 * 5
+    socio_economic = features.get('poverty_rate', 50)/100 * 5
+    resource = min(features.get('adaptation_budget', 1000)/10000 * 5, 5)  # Cap at 5
+
+    st.plotly_chart(vulnerability_figure((climate_risk, infrastructure, socio_economic, resource)))
 
     # Cost-Benefit Analysis
     st.subheader("Cost-Benefit Analysis")
@@ -213,7 +241,7 @@ def display_impact_analysis(features, cluster, recommendations):
         st.write("**Environmental Impact:** Positive")
 
 # Create tabs
-tabs = st.tabs(["Data Parameters", "Recommendations", "Impact Analysis"])
+tabs = st.tabs(["Data Parameters", "Recommendations", "Impact Analysis", "Dataset Map"])
 
 with tabs[0]:
     # Create three columns for main sections
@@ -293,41 +321,93 @@ with tabs[0]:
         }
 
         try:
-            response = requests.post(API_URL, json={"features": input_data})
-            if response.status_code == 200:
-                result = response.json()
-                st.success("Analysis Complete!")
-                
-                with tabs[1]:
-                    st.header("📋 Adaptation Recommendations")
-                    cluster = result['prediction']['cluster']
-                    recommendations = generate_detailed_recommendations(cluster)
-                    
-                    # Display risk level and priority
-                    st.subheader(f"Risk Level: {recommendations['risk_level']}")
-                    st.write(f"**Priority:** {recommendations['priority']}")
-                    
-                    # Display recommended actions
-                    st.subheader("Recommended Actions")
-                    for i, action in enumerate(recommendations['actions'], 1):
-                        st.write(f"{i}. {action}")
-                    
-                    # Display timeline and cost
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write(f"**Implementation Timeline:** {recommendations['timeline']}")
-                    with col2:
-                        st.write(f"**Estimated Cost Level:** {recommendations['estimated_cost']}")
-                
-                with tabs[2]:
-                    st.header("📊 Impact Analysis")
-                    display_impact_analysis(input_data, cluster, recommendations)
-                    
-            else:
-                st.error(f"Error: {response.json()['detail']}")
+            result = predict(tuple(sorted(input_data.items())))
+        except ApiError as e:
+            st.error(f"Error: {e}")
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
+        else:
+            st.success("Analysis Complete!")
+            
+            with tabs[1]:
+                st.header("📋 Adaptation Recommendations")
+                cluster = result['prediction']['cluster']
+                recommendations = generate_detailed_recommendations(cluster)
+                
+                # Display risk level and priority
+                st.subheader(f"Risk Level: {recommendations['risk_level']}")
+                st.write(f"**Priority:** {recommendations['priority']}")
+                
+                # Display recommended actions
+                st.subheader("Recommended Actions")
+                for i, action in enumerate(recommendations['actions'], 1):
+                    st.write(f"{i}. {action}")
+                
+                # Display timeline and cost
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write(f"**Implementation Timeline:** {recommendations['timeline']}")
+                with col2:
+                    st.write(f"**Estimated Cost Level:** {recommendations['estimated_cost']}")
+            
+            with tabs[2]:
+                st.header("📊 Impact Analysis")
+                display_impact_analysis(input_data, cluster, recommendations)
 
+with tabs[3]:
+    st.header("🗺️ Dataset Map")
+    st.markdown("Upload a CSV with the columns of `climate_vulnerability_dataset.csv` to assign every site to a cluster.")
+    uploaded = st.file_uploader("Climate vulnerability CSV", type="csv")
 
+    # Results live in the session so that later reruns (e.g. changing the map
+    # settings) redraw the map without scoring the file again
+    if uploaded is not None and st.button("Score dataset"):
+        total = count_rows(uploaded)
+        progress = st.progress(0.0)
+        status = st.empty()
+        running_counts = st.empty()
+        parts = []
+        site_counts = pd.Series(dtype="int64", name="Sites")
+        try:
+            for rows_sent, chunk in iter_scored_chunks(get_client(), uploaded, UPLOAD_CHUNK_ROWS):
+                parts.append(chunk)
+                progress.progress(min(rows_sent / max(total, 1), 1.0))
+                status.write(f"Scored {rows_sent:,} of {total:,} rows")
+                site_counts = site_counts.add(chunk["Cluster"].value_counts(), fill_value=0).sort_index()
+                running_counts.bar_chart(site_counts)
+        except ApiError as e:
+            st.error(f"Error after {sum(len(part) for part in parts):,} rows: {e}")
+        if parts:
+            scored = pd.concat(parts, ignore_index=True)
+            st.session_state["dataset_map"] = {
+                "name": uploaded.name,
+                "lat": scored["Latitude"].to_numpy(dtype=np.float32),
+                "lon": scored["Longitude"].to_numpy(dtype=np.float32),
+                "clusters": scored["Cluster"].to_numpy(dtype=np.int16),
+                "confidence": scored["Confidence"].to_numpy(dtype=np.float32)
+            }
 
+    results = st.session_state.get("dataset_map")
+    if results is not None:
+        clusters = results["clusters"]
+        st.subheader(f"{results['name']}: {len(clusters):,} sites")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Sites per cluster**")
+            st.dataframe(pd.DataFrame({
+                "Sites": pd.Series(clusters).value_counts().sort_index(),
+                "Mean confidence": pd.Series(results["confidence"]).groupby(clusters).mean().round(3)
+            }))
+        with col2:
+            mode = st.radio("Large datasets", ["Sample", "Bin"], horizontal=True,
+                            help=f"Used above {MAP_MAX_POINTS:,} sites")
+            bin_deg = st.select_slider("Bin size (degrees)", options=[0.25, 0.5, 1.0, 2.0, 5.0], value=1.0)
 
+        lat, lon, map_clusters, counts = reduce_points(
+            results["lat"], results["lon"], clusters, MAP_MAX_POINTS, mode.lower(), bin_deg
+        )
+        binned = mode == "Bin" and len(clusters) > MAP_MAX_POINTS
+        if len(map_clusters) < len(clusters):
+            st.caption(f"Showing {len(map_clusters):,} {'bins' if binned else 'sampled sites'} "
+                       f"of {len(clusters):,} sites")
+        st.plotly_chart(cluster_map_figure(lat, lon, map_clusters, counts, binned), use_container_width=True)
@@ -0,0 +1,92 @@
+# map_view.py
+"""Chunked scoring of uploaded datasets and the WebGL cluster map.
+
+``iter_scored_chunks`` splits an uploaded CSV into blocks of rows and
+scores each block with the API, so the dashboard can report progress as
+results arrive. Before anything is sent to the browser, ``reduce_points``
+caps what the map draws: up to ``max_points`` rows are plotted as they
+are; beyond that they are either randomly sampled or binned into a
+lat/lon grid with one marker per (cell, cluster) sized by its count.
+Maps use ``Scattermapbox`` traces, which plotly renders with WebGL.
+"""
+import io
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+MAP_COLUMNS = ["Latitude", "Longitude", "Cluster", "Confidence"]
+CLUSTER_COLORS = ["#4FD1C5", "#F6E05E", "#F6AD55", "#FC8181", "#B794F4"]
+
+def iter_scored_chunks(client, upload, chunk_rows):
+    """Yield ``(rows_sent, DataFrame of MAP_COLUMNS)`` for each block of ``chunk_rows`` rows.
+
+    Rows are split on line breaks without parsing, as the dataset schema
+    has one record per line.
+    """
+    upload.seek(0)
+    header = upload.readline()
+    rows_sent = 0
+    while True:
+        lines = list(islice(upload, chunk_rows))
+        if not lines:
+            break
+        body = client.score_csv(header + b"".join(lines), MAP_COLUMNS)
+        rows_sent += len(lines)
+        yield rows_sent, pd.read_csv(io.BytesIO(body))
+
+def count_rows(upload):
+    upload.seek(0)
+    rows = sum(chunk.count(b"\n") for chunk in iter(lambda: upload.read(2 ** 20), b""))
+    upload.seek(0)
+    return max(rows - 1, 0)
+
+def reduce_points(lat, lon, clusters, max_points, mode="sample", bin_deg=1.0, seed=0):
+    """Return ``(lat, lon, clusters, counts)`` with at most about ``max_points`` markers.
+
+    ``counts`` is the number of input rows behind each marker (all ones
+    unless binned).
+    """
+    n = len(clusters)
+    if n <= max_points:
+        return lat, lon, clusters, np.ones(n, dtype=np.int64)
+    if mode == "sample":
+        index = np.sort(np.random.default_rng(seed).choice(n, max_points, replace=False))
+        return lat[index], lon[index], clusters[index], np.ones(max_points, dtype=np.int64)
+
+    # One marker per occupied (cell, cluster) at the cell centre
+    rows = np.floor((lat + 90.0) / bin_deg).astype(np.int64)
+    cols = np.floor((lon + 180.0) / bin_deg).astype(np.int64)
+    n_cols = int(np.ceil(360.0 / bin_deg)) + 1
+    keys = (rows * n_cols + cols) * 256 + clusters.astype(np.int64)
+    unique, counts = np.unique(keys, return_counts=True)
+    cells, cell_clusters = np.divmod(unique, 256)
+    cell_rows, cell_cols = np.divmod(cells, n_cols)
+    return ((cell_rows + 0.5) * bin_deg - 90.0, (cell_cols + 0.5) * bin_deg - 180.0,
+            cell_clusters, counts)
+
+def cluster_map_figure(lat, lon, clusters, counts, binned=False):
+    """WebGL map with one trace per cluster, so the legend toggles clusters."""
+    fig = go.Figure()
+    for cluster in np.unique(clusters):
+        mask = clusters == cluster
+        marker = {"color": CLUSTER_COLORS[int(cluster) % len(CLUSTER_COLORS)], "opacity": 0.7}
+        if binned:
+            marker["size"] = 4 + 3 * np.log1p(counts[mask])
+            text = [f"{count:,} sites" for count in counts[mask]]
+        else:
+            marker["size"] = 4
+            text = None
+        fig.add_trace(go.Scattermapbox(
+            lat=lat[mask], lon=lon[mask], mode="markers", marker=marker, text=text,
+            name=f"Cluster {int(cluster)}"
+        ))
+    fig.update_layout(
+        mapbox={"style": "carto-darkmatter", "zoom": 1, "center": {"lat": 20, "lon": 0}},
+        margin={"l": 0, "r": 0, "t": 0, "b": 0},
+        height=600,
+        legend={"bgcolor": "rgba(0,0,0,0.4)"},
+        uirevision="cluster-map"
+    )
+    return fig
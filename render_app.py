@@ -103,29 +103,15 @@
 import os
 import subprocess
 import sys
-from threading import Thread
 
-# Import model_utils (works directly as it's in the same directory)
-from app.model_utils import load_all_models, preprocess_input
+from app.server import serve
 
-# Get port from environment variable
 PORT = int(os.environ.get("PORT", 10000))
 
-def run_fastapi():
-    """Run the FastAPI backend server"""
-    subprocess.run([
-        sys.executable,
-        "-m",
-        "uvicorn",
-        "app.main:app",  # FastAPI backend located in app.main
-        "--host", "0.0.0.0",
-        "--port", str(PORT)
-    ])
-
-def run_streamlit():
-    """Run the Streamlit frontend"""
+def start_streamlit():
+    """Start the Streamlit frontend as a child process"""
     os.environ["STREAMLIT_SERVER_PORT"] = str(PORT + 1)
-    subprocess.run([
+    return subprocess.Popen([
         sys.executable,
         "-m",
         "streamlit",
@@ -138,13 +124,12 @@ def run_streamlit():
     ])
 
 if __name__ == "__main__":
-    # Start both servers in separate threads
-    fastapi_thread = Thread(target=run_fastapi)
-    streamlit_thread = Thread(target=run_streamlit)
-
-    fastapi_thread.start()
-    streamlit_thread.start()
-
-    # Wait for both threads
-    fastapi_thread.join()
-    streamlit_thread.join()
+    # The API is served from this process by app/server.py (a single worker
+    # unless WEB_CONCURRENCY says otherwise); it returns once it has shut down
+    streamlit = start_streamlit()
+    try:
+        code = serve(port=PORT, workers=int(os.environ.get("WEB_CONCURRENCY", 0)) or None)
+    finally:
+        streamlit.terminate()
+        streamlit.wait()
+    sys.exit(code)
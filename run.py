@@ -82,11 +82,11 @@ import os
 import subprocess
 import sys
 import time
-from threading import Thread
 import requests
 
 # Get the port from the environment variable (Render provides it)
 PORT = os.environ.get("PORT", 8000)  # Default to 8000 if PORT not set
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 def check_server(url, max_retries=5):
     """Check if a server is running and responding"""
@@ -101,47 +101,32 @@ def check_server(url, max_retries=5):
             time.sleep(3)
     return False
 
-def run_fastapi():
-    """Run the FastAPI backend server"""
-    try:
-        print(f"Starting FastAPI server on http://0.0.0.0:{PORT}...")
-        os.chdir(os.path.join(os.path.dirname(__file__), "app"))
-        subprocess.run([sys.executable, "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", str(PORT), "--reload"], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error starting FastAPI server: {e}")
-        sys.exit(1)
+def start_fastapi():
+    """Start the FastAPI backend with the pre-fork launcher (app/server.py)"""
+    print(f"Starting FastAPI server on http://0.0.0.0:{PORT}...")
+    return subprocess.Popen([sys.executable, "-m", "app.server", "--host", "0.0.0.0", "--port", str(PORT)], cwd=ROOT_DIR)
 
-def run_streamlit():
-    """Run the Streamlit frontend server"""
-    try:
-        print("Starting Streamlit server...")
-        os.chdir(os.path.join(os.path.dirname(__file__), "frontend"))
-        subprocess.run([sys.executable, "-m", "streamlit", "run", "app.py"], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error starting Streamlit server: {e}")
-        sys.exit(1)
+def start_streamlit():
+    """Start the Streamlit frontend server"""
+    print("Starting Streamlit server...")
+    return subprocess.Popen([sys.executable, "-m", "streamlit", "run", "app.py"], cwd=os.path.join(ROOT_DIR, "frontend"))
 
 def main():
-    # Store the original working directory
-    original_dir = os.getcwd()
-
+    processes = []
     try:
-        # Start FastAPI server in a separate thread
-        fastapi_thread = Thread(target=run_fastapi)
-        fastapi_thread.start()
+        processes.append(start_fastapi())
 
         # Wait for FastAPI server to be ready
         if not check_server(f"http://127.0.0.1:{PORT}"):
             print(f"Failed to start FastAPI server on port {PORT}. Please check the server logs.")
             sys.exit(1)
 
-        # Start Streamlit server
-        streamlit_thread = Thread(target=run_streamlit)
-        streamlit_thread.start()
+        processes.append(start_streamlit())
 
-        # Keep the main thread alive
-        fastapi_thread.join()
-        streamlit_thread.join()
+        # Exit as soon as either server stops
+        while all(process.poll() is None for process in processes):
+            time.sleep(1)
+        sys.exit(max(process.returncode or 0 for process in processes))
 
     except KeyboardInterrupt:
         print("\nShutting down servers...")
@@ -150,8 +135,12 @@ def main():
         print(f"An error occurred: {e}")
         sys.exit(1)
     finally:
-        # Restore the original working directory
-        os.chdir(original_dir)
+        # The API launcher drains its workers on SIGTERM
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            process.wait()
 
 if __name__ == "__main__":
     main()
@@ -1,24 +1,120 @@
 # AdaptnetTM.py
+import argparse
+import hashlib
+import io
+import json
 import os
+import sys
+import time
 import warnings
 
 import joblib
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.exceptions import DataConversionWarning
+from sklearn.metrics import pairwise_distances_argmin
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 
+# The bundle format and compiled arrays are shared with the API in app/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.bundle import write_bundle
+from app.model_utils import BUNDLE_FILENAME, artifact_version, load_pickled_models, model_paths
+from app.profiles import (
+    DETAILED_RECOMMENDATIONS, PROFILES_FILENAME, QUANTILES, RECOMMENDATIONS, build_profiles, write_profiles
+)
+from dataset_cache import ensure_cache, iter_cached, read_cached, source_hash
+from pipeline_cache import StageCache, code_key
+
 # Suppress warnings
 warnings.filterwarnings('ignore', category=DataConversionWarning)
 
+TRAINING_STATE_FILENAME = 'training_state.json'
+WATERMARK_TAIL_BYTES = 65536
+
+class RunningStats:
+    """Mergeable per-column count, mean and sum of squared deviations.
+
+    Chunks are combined with the parallel Welford update (Chan et al.), so
+    statistics can be accumulated in one pass over data of any size.
+    Missing values are skipped. Category frequencies can be tracked too.
+    """
+
+    def __init__(self, feature_names):
+        self.feature_names = list(feature_names)
+        n_features = len(self.feature_names)
+        self.count = np.zeros(n_features)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.category_counts = {}
+
+    @classmethod
+    def from_scaler(cls, scaler, feature_names):
+        """Resume the statistics of a fitted StandardScaler (the inverse of ``to_scaler``)."""
+        stats = cls(feature_names)
+        # n_samples_seen_ is per feature when sklearn fitted the scaler on data with NaNs
+        stats.count = np.broadcast_to(
+            np.asarray(scaler.n_samples_seen_, dtype=np.float64), stats.count.shape
+        ).copy()
+        stats.mean = np.asarray(scaler.mean_, dtype=np.float64).copy()
+        stats.m2 = np.asarray(scaler.var_, dtype=np.float64) * stats.count
+        return stats
+
+    def update(self, block):
+        """Merge the statistics of a 2-D float block into the running totals."""
+        observed = ~np.isnan(block)
+        count = observed.sum(axis=0)
+        if not count.any():
+            return
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, np.nansum(block, axis=0) / count, 0.0)
+        m2 = np.nansum((block - mean) ** 2, axis=0)
+
+        total = self.count + count
+        delta = mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, count / total, 0.0)
+        self.mean += delta * weight
+        self.m2 += m2 + delta ** 2 * self.count * weight
+        self.count = total
+
+    def count_categories(self, name, values):
+        """Add the frequencies of ``values`` to the counts for ``name``."""
+        uniques, counts = np.unique(values, return_counts=True)
+        totals = self.category_counts.setdefault(name, {})
+        for value, count in zip(uniques.tolist(), counts.tolist()):
+            totals[value] = totals.get(value, 0) + count
+
+    def to_scaler(self, n_rows):
+        """Build a fitted StandardScaler as if missing values were mean-imputed.
+
+        Imputed rows sit exactly on the mean, so they add to the row count
+        but not to the squared deviations.
+        """
+        if n_rows == 0:
+            raise ValueError("Dataset is empty")
+        scaler = StandardScaler()
+        scaler.mean_ = self.mean.copy()
+        scaler.var_ = self.m2 / n_rows
+        scale = np.sqrt(scaler.var_)
+        scale[scale == 0.0] = 1.0
+        scaler.scale_ = scale
+        scaler.n_samples_seen_ = n_rows
+        scaler.n_features_in_ = len(self.feature_names)
+        scaler.feature_names_in_ = np.asarray(self.feature_names, dtype=object)
+        return scaler
+
 class AdaptationNetTrainer:
     def __init__(self):
         # Define paths
         self.current_dir = os.path.dirname(os.path.abspath(__file__))
         self.data_path = os.path.join(self.current_dir, '../data/climate_vulnerability_dataset.csv')
         self.model_dir = os.path.join(self.current_dir, '../models')
+        # Typed columnar copy of the CSV, rebuilt when the CSV content changes
+        self.cache_dir = os.path.join(self.current_dir, '../data/.cache')
+        self.use_cache = True
         
         # Define feature columns
         self.numerical_cols = [
@@ -53,10 +149,13 @@ class AdaptationNetTrainer:
         # Ensure model directory exists
         os.makedirs(self.model_dir, exist_ok=True)
         
-    def load_dataset(self):
-        """Load and validate the dataset."""
+    def load_dataset(self, columns=None):
+        """Load and validate the dataset, or only ``columns`` of it."""
         try:
-            dataset = pd.read_csv(self.data_path)
+            if self.use_cache:
+                dataset = read_cached(ensure_cache(self.data_path, self.cache_dir), columns)
+            else:
+                dataset = pd.read_csv(self.data_path, usecols=columns)
             print("Dataset loaded successfully!")
             print("\nDataset preview:")
             print(dataset.head())
@@ -75,50 +174,59 @@ class AdaptationNetTrainer:
         except Exception as e:
             raise Exception(f"Error loading dataset: {str(e)}")
 
-    def preprocess_data(self, dataset):
-        """Preprocess the dataset for training."""
+    def preprocess_data(self, dataset, chunksize=100000, save=True):
+        """Preprocess the dataset for training.
+
+        Runs as two passes over row chunks. The first encodes each chunk into
+        a preallocated float32 feature matrix while accumulating column
+        statistics and category counts; the second imputes missing values
+        and standardizes that matrix in place. The fitted preprocessors are
+        saved unless ``save`` is false.
+        """
         print("\nPreprocessing data...")
         try:
-            # Handle missing values in numerical columns
-            dataset[self.numerical_cols] = dataset[self.numerical_cols].fillna(
-                dataset[self.numerical_cols].mean()
-            )
-            
-            # Print unique values in categorical columns
-            print("\nUnique values in categorical columns:")
-            for col in self.categorical_cols:
-                print(f"{col}: {dataset[col].unique()}")
-            
-            # Create fresh copies of label encoders
-            label_encoders = {}
-            
-            # Handle Climate Risk Level
-            risk_encoder = LabelEncoder()
-            if dataset['Climate_Risk_Level'].dtype == 'O':  # If text categories
-                # Map text categories to numbers first
-                dataset['Climate_Risk_Level'] = dataset['Climate_Risk_Level'].map(self.risk_level_mapping)
-            dataset['Climate_Risk_Level'] = dataset['Climate_Risk_Level'].fillna(0)
-            risk_encoder.fit([0, 1, 2, 3, 4])
-            dataset['Climate_Risk_Level'] = risk_encoder.transform(dataset['Climate_Risk_Level'].astype(int))
-            label_encoders['Climate_Risk_Level'] = risk_encoder
-            
-            # Handle Land Use Type
-            land_encoder = LabelEncoder()
-            if dataset['Land_Use_Type'].dtype == 'O':  # If text categories
-                # Map text categories to numbers first
-                dataset['Land_Use_Type'] = dataset['Land_Use_Type'].map(self.land_use_mapping)
-            dataset['Land_Use_Type'] = dataset['Land_Use_Type'].fillna(0)
-            land_encoder.fit([0, 1, 2, 3])
-            dataset['Land_Use_Type'] = land_encoder.transform(dataset['Land_Use_Type'].astype(int))
-            label_encoders['Land_Use_Type'] = land_encoder
-            
-            # Scale numerical features
-            scaler = StandardScaler()
             feature_cols = self.numerical_cols + self.categorical_cols
-            dataset[feature_cols] = scaler.fit_transform(dataset[feature_cols])
-            
-            # Save preprocessors
-            self.save_preprocessors(label_encoders, scaler)
+            n_rows = len(dataset)
+            n_numerical = len(self.numerical_cols)
+            label_encoders = self.build_label_encoders()
+
+            # Pass 1: encode into X and accumulate statistics. X is column-major
+            # so each feature column is contiguous when handed back to pandas
+            X = np.empty((n_rows, len(feature_cols)), dtype=np.float32, order='F')
+            stats = RunningStats(feature_cols)
+            for start in range(0, n_rows, chunksize):
+                chunk = dataset.iloc[start:start + chunksize][feature_cols].copy()
+                block = self.encode_categoricals(chunk, label_encoders).to_numpy(dtype=np.float64)
+                stats.update(block)
+                for col in self.categorical_cols:
+                    stats.count_categories(col, chunk[col].to_numpy())
+                X[start:start + chunksize] = block
+
+            # Print category frequencies in categorical columns
+            print("\nCategory counts in categorical columns:")
+            for col in self.categorical_cols:
+                print(f"{col}: {stats.category_counts[col]}")
+
+            scaler = stats.to_scaler(n_rows)
+
+            # Pass 2: impute and scale in place
+            mean = scaler.mean_.astype(np.float32)
+            scale = scaler.scale_.astype(np.float32)
+            for start in range(0, n_rows, chunksize):
+                block = X[start:start + chunksize]
+                numerical = block[:, :n_numerical]
+                np.copyto(numerical, mean[:n_numerical], where=np.isnan(numerical))
+                block -= mean
+                block /= scale
+
+            # Replace one column at a time so only one original column and X
+            # are alive together
+            for j, col in enumerate(feature_cols):
+                dataset[col] = X[:, j]
+            del X
+
+            if save:
+                self.save_preprocessors(label_encoders, scaler)
             
             print("Preprocessing complete!")
             return dataset, feature_cols
@@ -144,16 +252,54 @@ class AdaptationNetTrainer:
         except Exception as e:
             raise Exception(f"Error saving preprocessors: {str(e)}")
 
-    def train_kmeans(self, data, feature_cols, n_clusters=5):
+    def export_bundle(self):
+        """Write the saved artifacts as a single mmap-able model bundle for the API."""
+        try:
+            models = load_pickled_models(self.model_dir)
+            bundle_path = os.path.join(self.model_dir, BUNDLE_FILENAME)
+            write_bundle(bundle_path, models["compiled"], source_version=models["version"])
+            print(f"Model bundle exported to {bundle_path}")
+        except Exception as e:
+            raise Exception(f"Error exporting model bundle: {str(e)}")
+
+    def export_profiles(self, kmeans_model, sizes, means, quantiles):
+        """Write per-cluster sizes, centroids, means and quantiles in original units.
+
+        ``sizes`` is a Series and ``means`` a DataFrame indexed by cluster;
+        ``quantiles`` (optional) is indexed by (cluster, quantile). All statistics are
+        of standardized features and are mapped back with the saved scaler.
+        """
+        try:
+            scaler = joblib.load(os.path.join(self.model_dir, 'scaler.pkl'))
+            feature_cols = self.numerical_cols + self.categorical_cols
+            clusters = range(kmeans_model.n_clusters)
+            grid = pd.MultiIndex.from_product([clusters, QUANTILES])
+            profiles = build_profiles(
+                feature_cols, scaler.mean_, scaler.scale_, kmeans_model.cluster_centers_,
+                sizes=sizes.reindex(clusters, fill_value=0).to_numpy(),
+                means=means.reindex(clusters)[feature_cols].to_numpy(dtype=np.float64),
+                quantiles=None if quantiles is None else quantiles.reindex(grid)[feature_cols].to_numpy(
+                    dtype=np.float64
+                ).reshape(len(clusters), len(QUANTILES), len(feature_cols)),
+                source_version=artifact_version(model_paths(self.model_dir))
+            )
+            profiles_path = os.path.join(self.model_dir, PROFILES_FILENAME)
+            write_profiles(profiles_path, profiles)
+            print(f"Cluster profiles saved to {profiles_path}")
+        except Exception as e:
+            raise Exception(f"Error exporting cluster profiles: {str(e)}")
+
+    def train_kmeans(self, data, feature_cols, n_clusters=5, random_state=42, n_init=10):
         """Train KMeans clustering model."""
         print("Training KMeans model...")
         try:
             kmeans = KMeans(
                 n_clusters=n_clusters,
-                random_state=42,
-                n_init=10
+                random_state=random_state,
+                n_init=n_init
             )
             kmeans.fit(data[feature_cols])
+            kmeans = self.finalize_kmeans(kmeans, feature_cols)
             
             # Save the model
             model_path = os.path.join(self.model_dir, 'kmeans_model.pkl')
@@ -164,15 +310,36 @@ class AdaptationNetTrainer:
         except Exception as e:
             raise Exception(f"Error during KMeans training: {str(e)}")
 
+    def finalize_kmeans(self, kmeans, feature_cols):
+        """Normalize a fitted model before it is saved.
+
+        Features are preprocessed as float32, but sklearn only predicts when
+        the input dtype matches the centers, and the API scores float64
+        input; the saved centers are therefore always float64.
+        """
+        kmeans.cluster_centers_ = np.ascontiguousarray(kmeans.cluster_centers_, dtype=np.float64)
+        if not hasattr(kmeans, 'feature_names_in_'):
+            kmeans.feature_names_in_ = np.asarray(feature_cols, dtype=object)
+        return kmeans
+
+    def predict_clusters(self, kmeans_model, data, feature_cols, chunksize=1000000):
+        """Assign clusters chunk by chunk, converting features to float64."""
+        labels = np.empty(len(data), dtype=np.int32)
+        for start in range(0, len(data), chunksize):
+            chunk = data[feature_cols].iloc[start:start + chunksize].astype(np.float64)
+            labels[start:start + chunksize] = kmeans_model.predict(chunk)
+        return labels
+
     def analyze_clusters(self, data, feature_cols, kmeans_model):
         """Analyze and save cluster information."""
         print("Analyzing clusters...")
         try:
             # Add cluster labels to dataset
-            data['Cluster'] = kmeans_model.predict(data[feature_cols])
+            data['Cluster'] = self.predict_clusters(kmeans_model, data, feature_cols)
             
             # Calculate cluster statistics
-            cluster_stats = data.groupby('Cluster')[self.numerical_cols].mean()
+            grouped = data.groupby('Cluster')[feature_cols]
+            cluster_stats = grouped.mean()
             
             # Save clustered data
             output_path = os.path.join(self.model_dir, 'clustered_data.csv')
@@ -180,30 +347,489 @@ class AdaptationNetTrainer:
             
             # Print cluster insights
             print("\nCluster Statistics:")
-            print(cluster_stats)
+            print(cluster_stats[self.numerical_cols])
             print("\nSamples per cluster:", data['Cluster'].value_counts())
+
+            self.export_profiles(kmeans_model, grouped.size(), cluster_stats, grouped.quantile(list(QUANTILES)))
             
         except Exception as e:
             raise Exception(f"Error during cluster analysis: {str(e)}")
 
-    def train(self):
-        """Execute the complete training pipeline."""
+    def build_label_encoders(self):
+        """Create label encoders fitted on every known category code."""
+        risk_encoder = LabelEncoder()
+        risk_encoder.fit([0, 1, 2, 3, 4])
+        land_encoder = LabelEncoder()
+        land_encoder.fit([0, 1, 2, 3])
+        return {
+            'Climate_Risk_Level': risk_encoder,
+            'Land_Use_Type': land_encoder
+        }
+
+    def encode_categoricals(self, chunk, label_encoders):
+        """Map text categories to codes and label-encode them, in place."""
+        mappings = {
+            'Climate_Risk_Level': self.risk_level_mapping,
+            'Land_Use_Type': self.land_use_mapping
+        }
+        for col in self.categorical_cols:
+            if not pd.api.types.is_numeric_dtype(chunk[col]):  # If text (or categorical) categories
+                chunk[col] = chunk[col].map(mappings[col]).astype(float)
+            chunk[col] = label_encoders[col].transform(chunk[col].fillna(0).astype(int))
+        return chunk
+
+    def iter_chunks(self, chunksize, usecols=None):
+        """Read the dataset in chunks of at most ``chunksize`` rows."""
+        try:
+            if self.use_cache:
+                return iter_cached(ensure_cache(self.data_path, self.cache_dir), chunksize, usecols)
+            return pd.read_csv(self.data_path, usecols=usecols, chunksize=chunksize)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Dataset not found at {self.data_path}")
+
+    def impute_and_scale(self, chunk, scaler):
+        """Fill missing numbers with the training mean and standardize the features."""
+        feature_cols = self.numerical_cols + self.categorical_cols
+        means = pd.Series(scaler.mean_[:len(self.numerical_cols)], index=self.numerical_cols)
+        chunk[self.numerical_cols] = chunk[self.numerical_cols].fillna(means)
+        chunk[feature_cols] = scaler.transform(chunk[feature_cols])
+        return chunk
+
+    def fit_scaler_streaming(self, label_encoders, chunksize, sample_size, random_state=42):
+        """First pass: fit the scaler over chunks and keep a uniform row sample.
+
+        Returns the fitted scaler, the total row count and the sample (still
+        unscaled, with missing values) for quality reporting.
+        """
+        feature_cols = self.numerical_cols + self.categorical_cols
+        rng = np.random.default_rng(random_state)
+        stats = RunningStats(feature_cols)
+        n_rows = 0
+        sample, sample_keys = None, np.empty(0)
+
+        for chunk in self.iter_chunks(chunksize, usecols=feature_cols):
+            chunk = self.encode_categoricals(chunk, label_encoders)[feature_cols]
+            stats.update(chunk.to_numpy(dtype=np.float64))
+            n_rows += len(chunk)
+
+            # Keep the rows with the smallest random keys: a uniform sample
+            keys = np.concatenate([sample_keys, rng.random(len(chunk))])
+            pool = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+            keep = np.argsort(keys)[:sample_size]
+            sample, sample_keys = pool.iloc[keep].reset_index(drop=True), keys[keep]
+
+        return stats.to_scaler(n_rows), n_rows, sample
+
+    def train_kmeans_streaming(self, scaler, label_encoders, sample, chunksize, n_clusters=5, epochs=1):
+        """Second pass: fit clusters with mini-batch updates over chunked reads.
+
+        Centers are initialized from a full KMeans fit on the sample, which
+        also serves as the quality baseline.
+        """
+        print("Training MiniBatchKMeans model...")
+        try:
+            feature_cols = self.numerical_cols + self.categorical_cols
+            sample = self.impute_and_scale(sample.copy(), scaler)
+            baseline = KMeans(n_clusters=n_clusters, random_state=42, n_init=10).fit(sample)
+
+            kmeans = MiniBatchKMeans(
+                n_clusters=n_clusters,
+                init=baseline.cluster_centers_,
+                n_init=1,
+                random_state=42
+            )
+            for _ in range(epochs):
+                for chunk in self.iter_chunks(chunksize, usecols=feature_cols):
+                    chunk = self.encode_categoricals(chunk, label_encoders)[feature_cols]
+                    kmeans.partial_fit(self.impute_and_scale(chunk, scaler))
+
+            model_path = os.path.join(self.model_dir, 'kmeans_model.pkl')
+            joblib.dump(kmeans, model_path)
+            print("MiniBatchKMeans model trained and saved successfully!")
+
+            # Inertia of both models on the same sample, per sampled row
+            quality = {
+                "sample_rows": len(sample),
+                "streaming_inertia": float(-kmeans.score(sample)) / len(sample),
+                "full_kmeans_inertia": float(baseline.inertia_) / len(sample)
+            }
+            quality["relative_increase"] = (
+                quality["streaming_inertia"] / quality["full_kmeans_inertia"] - 1.0
+            )
+            return kmeans, quality
+        except Exception as e:
+            raise Exception(f"Error during streaming KMeans training: {str(e)}")
+
+    def analyze_clusters_streaming(self, scaler, label_encoders, kmeans_model, chunksize, sample=None):
+        """Third pass: label every row, append to clustered_data.csv and summarize.
+
+        Sizes and means are exact; quantiles come from ``sample`` (unscaled
+        rows as kept by ``fit_scaler_streaming``) and are left out without it.
+        """
+        print("Analyzing clusters...")
+        try:
+            feature_cols = self.numerical_cols + self.categorical_cols
+            output_path = os.path.join(self.model_dir, 'clustered_data.csv')
+            sums, counts = None, None
+            header = True
+
+            for chunk in self.iter_chunks(chunksize):
+                chunk = self.impute_and_scale(self.encode_categoricals(chunk, label_encoders), scaler)
+                chunk['Cluster'] = kmeans_model.predict(chunk[feature_cols])
+                chunk.to_csv(output_path, index=False, header=header, mode='w' if header else 'a')
+                header = False
+
+                grouped = chunk.groupby('Cluster')[feature_cols]
+                sums = grouped.sum() if sums is None else sums.add(grouped.sum(), fill_value=0)
+                counts = grouped.size() if counts is None else counts.add(grouped.size(), fill_value=0)
+
+            means = sums.div(counts, axis=0)
+            print("\nCluster Statistics:")
+            print(means[self.numerical_cols])
+            print("\nSamples per cluster:", counts.astype(int))
+
+            quantiles = None
+            if sample is not None:
+                sample = self.impute_and_scale(sample.copy(), scaler)
+                sample['Cluster'] = kmeans_model.predict(sample[feature_cols])
+                quantiles = sample.groupby('Cluster')[feature_cols].quantile(list(QUANTILES))
+            self.export_profiles(kmeans_model, counts.astype(int), means, quantiles)
+            return counts.reindex(range(kmeans_model.n_clusters), fill_value=0).astype(int)
+        except Exception as e:
+            raise Exception(f"Error during cluster analysis: {str(e)}")
+
+    def _tail_sha256(self, offset):
+        """Hash of the bytes just before ``offset``; detects rewrites of already-trained rows."""
+        start = max(0, offset - WATERMARK_TAIL_BYTES)
+        with open(self.data_path, 'rb') as f:
+            f.seek(start)
+            return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+    def dataset_watermark(self):
+        """Mark the end of the dataset as it is now, before it is read."""
+        try:
+            offset = os.path.getsize(self.data_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Dataset not found at {self.data_path}")
+        return {"byte_offset": offset, "tail_sha256": self._tail_sha256(offset)}
+
+    @staticmethod
+    def centers_sha256(kmeans_model):
+        centers = np.ascontiguousarray(kmeans_model.cluster_centers_, dtype=np.float64)
+        return hashlib.sha256(centers.tobytes()).hexdigest()
+
+    def save_training_state(self, watermark, n_rows, cluster_sizes, mode, kmeans_model):
+        """Record what the saved models were trained on, for incremental retraining.
+
+        Call this whenever kmeans_model.pkl is saved: the centroid hash ties
+        the watermark and cluster sizes to that exact model.
+        """
+        state = {
+            "source": os.path.abspath(self.data_path),
+            "rows": int(n_rows),
+            "byte_offset": watermark["byte_offset"],
+            "tail_sha256": watermark["tail_sha256"],
+            "cluster_sizes": [int(size) for size in cluster_sizes],
+            "centers_sha256": self.centers_sha256(kmeans_model),
+            "mode": mode,
+            "trained_at": time.time()
+        }
+        with open(os.path.join(self.model_dir, TRAINING_STATE_FILENAME), 'w') as f:
+            json.dump(state, f, indent=2)
+
+    def load_training_state(self):
+        """Load the training watermark and check the dataset was only appended to since."""
+        try:
+            with open(os.path.join(self.model_dir, TRAINING_STATE_FILENAME)) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            raise ValueError("No training watermark found; run a full training first")
+        offset = state["byte_offset"]
+        if os.path.getsize(self.data_path) < offset or self._tail_sha256(offset) != state["tail_sha256"]:
+            raise ValueError("Dataset was modified before the training watermark; run a full training")
+        return state
+
+    def check_training_state(self, state, kmeans_model):
+        """Check the watermark was recorded for the saved model (e.g. not one saved by model selection)."""
+        if len(state["cluster_sizes"]) != kmeans_model.n_clusters:
+            raise ValueError(
+                f"Saved model has {kmeans_model.n_clusters} clusters but the training watermark records "
+                f"{len(state['cluster_sizes'])}; run a full training"
+            )
+        if state.get("centers_sha256") != self.centers_sha256(kmeans_model):
+            raise ValueError("Saved model is not the one the training watermark was recorded for; run a full training")
+
+    def read_appended(self, start, end):
+        """Read the rows stored between byte offsets ``start`` and ``end`` of the dataset."""
+        columns = pd.read_csv(self.data_path, nrows=0).columns
+        with open(self.data_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return pd.read_csv(io.BytesIO(data), names=columns, header=None)
+
+    def update_centroids(self, centers, sizes, X, iterations=3):
+        """Move ``centers`` towards the rows of ``X`` without reordering them.
+
+        Each center keeps the weight of the ``sizes[k]`` rows it already
+        summarizes, so it becomes the mean of its old and newly assigned
+        rows. Returns the centers and the labels of ``X``.
+        """
+        anchor = centers * sizes[:, None]
+        for _ in range(iterations):
+            labels = pairwise_distances_argmin(X, centers)
+            counts = np.bincount(labels, minlength=len(centers))
+            sums = np.zeros_like(centers)
+            for k in np.flatnonzero(counts):
+                sums[k] = X[labels == k].sum(axis=0)
+            total = sizes + counts
+            centers = np.where(total[:, None] > 0, (anchor + sums) / np.maximum(total, 1)[:, None], centers)
+        return centers, pairwise_distances_argmin(X, centers)
+
+    def update_clustered_data(self, old_scaler, new_scaler, new_rows, chunksize):
+        """Re-standardize clustered_data.csv for ``new_scaler`` and append ``new_rows``.
+
+        Existing rows keep their cluster labels. Returns the per-cluster
+        sizes and feature means over all rows.
+        """
+        feature_cols = self.numerical_cols + self.categorical_cols
+        output_path = os.path.join(self.model_dir, 'clustered_data.csv')
+        tmp_path = output_path + '.tmp'
+        columns = pd.read_csv(output_path, nrows=0).columns
+        # x_new = (x_old * old_scale + old_mean - new_mean) / new_scale
+        factor = old_scaler.scale_ / new_scaler.scale_
+        shift = (old_scaler.mean_ - new_scaler.mean_) / new_scaler.scale_
+        sums, counts = None, None
+
+        def chunks():
+            for chunk in pd.read_csv(output_path, chunksize=chunksize):
+                chunk[feature_cols] = chunk[feature_cols].to_numpy(dtype=np.float64) * factor + shift
+                yield chunk
+            yield new_rows.reindex(columns=columns)
+
+        try:
+            header = True
+            for chunk in chunks():
+                chunk.to_csv(tmp_path, index=False, header=header, mode='w' if header else 'a')
+                header = False
+                grouped = chunk.groupby('Cluster')[feature_cols]
+                sums = grouped.sum() if sums is None else sums.add(grouped.sum(), fill_value=0)
+                counts = grouped.size() if counts is None else counts.add(grouped.size(), fill_value=0)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return counts.astype(int), sums.div(counts, axis=0)
+
+    def train_streaming(self, chunksize=100000, sample_size=10000, epochs=1):
+        """Train without ever holding the full dataset in memory.
+
+        Peak memory is bounded by ``chunksize`` plus ``sample_size`` rows.
+        """
+        try:
+            print(f"Starting streaming AdaptationNet training (chunksize={chunksize})...")
+            watermark = self.dataset_watermark()
+            label_encoders = self.build_label_encoders()
+
+            scaler, n_rows, sample = self.fit_scaler_streaming(label_encoders, chunksize, sample_size)
+            print(f"Scaler fitted on {n_rows} rows")
+            self.save_preprocessors(label_encoders, scaler)
+
+            kmeans_model, quality = self.train_kmeans_streaming(
+                scaler, label_encoders, sample, chunksize, epochs=epochs
+            )
+            sizes = self.analyze_clusters_streaming(scaler, label_encoders, kmeans_model, chunksize, sample=sample)
+            self.export_bundle()
+            self.save_training_state(watermark, n_rows, sizes, 'streaming', kmeans_model)
+
+            print("\nClustering quality on a {sample_rows}-row sample (inertia per row):".format(**quality))
+            print(f"  streaming MiniBatchKMeans: {quality['streaming_inertia']:.4f}")
+            print(f"  full KMeans on sample:     {quality['full_kmeans_inertia']:.4f}")
+            print(f"  relative increase:         {quality['relative_increase']:+.2%}")
+            print("\nStreaming training pipeline completed successfully!")
+            return quality
+
+        except Exception as e:
+            print(f"\nError in streaming training pipeline: {str(e)}")
+            raise
+
+    def refit_drift(self, centers, scaler, n_clusters, random_state=42, n_init=10):
+        """Distance from each of ``centers`` to its counterpart in a KMeans refit on every row.
+
+        Both are in standardized units of ``scaler``. Clusters are paired
+        one to one by minimum total distance, so the refit's label order
+        does not matter. This reads and clusters the whole dataset.
+        """
+        feature_cols = self.numerical_cols + self.categorical_cols
+        dataset = self.encode_categoricals(self.load_dataset(feature_cols), self.build_label_encoders())
+        X = self.impute_and_scale(dataset, scaler)[feature_cols].to_numpy(dtype=np.float64)
+        refit = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=n_init).fit(X)
+        cost = np.linalg.norm(centers[:, None, :] - refit.cluster_centers_[None, :, :], axis=2)
+        rows, cols = linear_sum_assignment(cost)
+        return cost[rows, cols]
+
+    def train_incremental(self, iterations=3, chunksize=100000, compare_full=False):
+        """Fold the rows appended since the last training into the saved models.
+
+        Only the new rows are read from the dataset. The scaler statistics
+        are merged with theirs, the centroids are mapped into the updated
+        feature space and moved towards the new rows, and every centroid
+        keeps its index, so cluster IDs do not change. clustered_data.csv
+        is rewritten in chunks since it stores standardized features.
+        With ``compare_full`` the result is also compared with a full refit
+        (see ``refit_drift``), which costs as much as a full training.
+        """
+        try:
+            print("Starting incremental AdaptationNet training...")
+            state = self.load_training_state()
+            watermark = self.dataset_watermark()
+            if watermark["byte_offset"] == state["byte_offset"]:
+                print("No rows appended since the last training; models unchanged")
+                return None
+
+            feature_cols = self.numerical_cols + self.categorical_cols
+            label_encoders = self.build_label_encoders()
+            new_rows = self.read_appended(state["byte_offset"], watermark["byte_offset"])
+            print(f"Read {len(new_rows)} rows appended after row {state['rows']}")
+            new_rows = self.encode_categoricals(new_rows, label_encoders)
+
+            old_scaler = joblib.load(os.path.join(self.model_dir, 'scaler.pkl'))
+            kmeans_model = joblib.load(os.path.join(self.model_dir, 'kmeans_model.pkl'))
+            self.check_training_state(state, kmeans_model)
+
+            # Merge the new rows into the scaler statistics, mean-imputed as in a full run
+            block = new_rows[feature_cols].to_numpy(dtype=np.float64)
+            n_numerical = len(self.numerical_cols)
+            numerical = block[:, :n_numerical]
+            np.copyto(numerical, old_scaler.mean_[:n_numerical], where=np.isnan(numerical))
+            stats = RunningStats.from_scaler(old_scaler, feature_cols)
+            stats.update(block)
+            n_rows = state["rows"] + len(new_rows)
+            scaler = stats.to_scaler(n_rows)
+
+            # Same centroids expressed in the updated feature space, then warm-started
+            previous = (kmeans_model.cluster_centers_ * old_scaler.scale_ + old_scaler.mean_
+                        - scaler.mean_) / scaler.scale_
+            new_rows = self.impute_and_scale(new_rows, scaler)
+            centers, labels = self.update_centroids(
+                previous, np.asarray(state["cluster_sizes"], dtype=np.float64),
+                new_rows[feature_cols].to_numpy(dtype=np.float64), iterations
+            )
+            new_rows['Cluster'] = labels
+            kmeans_model.cluster_centers_ = centers
+            kmeans_model = self.finalize_kmeans(kmeans_model, feature_cols)
+            joblib.dump(kmeans_model, os.path.join(self.model_dir, 'kmeans_model.pkl'))
+            self.save_preprocessors(label_encoders, scaler)
+
+            sizes, means = self.update_clustered_data(old_scaler, scaler, new_rows, chunksize)
+            self.export_profiles(kmeans_model, sizes, means, None)
+            self.export_bundle()
+            sizes = sizes.reindex(range(kmeans_model.n_clusters), fill_value=0)
+            self.save_training_state(watermark, n_rows, sizes, 'incremental', kmeans_model)
+
+            # Drift in standardized units of the updated scaler
+            drift = np.linalg.norm(centers - previous, axis=1)
+            print("\nCentroid drift from the previous model (standardized units):", np.round(drift, 4).tolist())
+            report = {"new_rows": len(new_rows), "rows": n_rows, "centroid_drift": drift.tolist()}
+            if compare_full:
+                refit = self.refit_drift(centers, scaler, kmeans_model.n_clusters)
+                print("Distance to a full refit's matched centroids (standardized units):",
+                      np.round(refit, 4).tolist())
+                report["refit_drift"] = refit.tolist()
+            print("\nIncremental training completed successfully!")
+            return report
+
+        except Exception as e:
+            print(f"\nError in incremental training: {str(e)}")
+            raise
+
+    def train(self, n_clusters=5, random_state=42, n_init=10, force=False):
+        """Execute the training pipeline, skipping stages whose inputs are unchanged.
+
+        The stages are preprocess -> kmeans -> analyze, plus bundle after
+        kmeans. Each is keyed on the dataset content, the column lists and
+        mappings, its parameters and the code that implements it, chained
+        through the upstream keys, so e.g. editing the recommendations only
+        reruns analyze. ``force`` reruns every stage.
+        """
         try:
             print("Starting AdaptationNet training pipeline...")
-            
-            # Load dataset
-            dataset = self.load_dataset()
-            
-            # Preprocess data
-            processed_data, feature_cols = self.preprocess_data(dataset)
-            
-            # Train KMeans model
-            kmeans_model = self.train_kmeans(processed_data, feature_cols)
-            
-            # Analyze clusters
-            self.analyze_clusters(processed_data, feature_cols, kmeans_model)
-            
+            watermark = self.dataset_watermark()
+            pipeline_dir = os.path.join(self.cache_dir, 'pipeline')
+            stages = StageCache(os.path.join(pipeline_dir, 'state.json'), force)
+            feature_cols = self.numerical_cols + self.categorical_cols
+            features_path = os.path.join(pipeline_dir, 'features.npy')
+
+            def model_path(name):
+                return os.path.join(self.model_dir, name)
+
+            # Keys chain, so a change upstream invalidates everything below it
+            preprocess_key = stages.key(
+                'preprocess', source_hash(self.data_path, self.cache_dir),
+                self.numerical_cols, self.categorical_cols, self.risk_level_mapping, self.land_use_mapping,
+                code_key(RunningStats, self.preprocess_data, self.encode_categoricals, self.build_label_encoders)
+            )
+            kmeans_key = stages.key(
+                'kmeans', preprocess_key, n_clusters, random_state, n_init,
+                code_key(self.train_kmeans, self.finalize_kmeans)
+            )
+            analyze_key = stages.key(
+                'analyze', kmeans_key, RECOMMENDATIONS, DETAILED_RECOMMENDATIONS, list(QUANTILES),
+                code_key(self.analyze_clusters, self.predict_clusters, self.export_profiles, build_profiles)
+            )
+            bundle_key = stages.key(
+                'bundle', preprocess_key, kmeans_key, code_key(self.export_bundle, load_pickled_models, write_bundle)
+            )
+
+            # Upstream results are only materialized when a later stage needs them
+            results = {}
+
+            def processed_data():
+                if 'processed' not in results:
+                    dataset = self.load_dataset()
+                    X = np.load(features_path)
+                    for j, col in enumerate(feature_cols):
+                        dataset[col] = X[:, j]
+                    results['processed'] = dataset
+                return results['processed']
+
+            def preprocess():
+                dataset, _ = self.preprocess_data(self.load_dataset())
+                os.makedirs(pipeline_dir, exist_ok=True)
+                np.save(features_path, dataset[feature_cols].to_numpy(dtype=np.float32))
+                results['processed'] = dataset
+
+            def kmeans():
+                if 'processed' in results:
+                    features = results['processed'][feature_cols]
+                else:
+                    features = pd.DataFrame(np.load(features_path), columns=feature_cols)
+                results['kmeans'] = self.train_kmeans(features, feature_cols, n_clusters, random_state, n_init)
+
+            def analyze():
+                if 'kmeans' in results:
+                    kmeans_model = results['kmeans']
+                else:
+                    kmeans_model = joblib.load(model_path('kmeans_model.pkl'))
+                data = processed_data()
+                self.analyze_clusters(data, feature_cols, kmeans_model)
+                # Record the watermark for later incremental runs
+                sizes = np.bincount(data['Cluster'], minlength=kmeans_model.n_clusters)
+                self.save_training_state(watermark, len(data), sizes, 'full', kmeans_model)
+
+            stages.run('preprocess', preprocess_key, [
+                model_path('label_encoders.pkl'), model_path('scaler.pkl'), model_path('feature_order.pkl'),
+                features_path
+            ], preprocess)
+            stages.run('kmeans', kmeans_key, [model_path('kmeans_model.pkl')], kmeans)
+            stages.run('analyze', analyze_key, [
+                model_path('clustered_data.csv'), model_path(PROFILES_FILENAME), model_path(TRAINING_STATE_FILENAME)
+            ], analyze)
+            # Export the bundle the API serves from
+            stages.run('bundle', bundle_key, [model_path(BUNDLE_FILENAME)], self.export_bundle)
+
+            stages.print_report()
             print("\nTraining pipeline completed successfully!")
+            return stages.report
             
         except Exception as e:
             print(f"\nError in training pipeline: {str(e)}")
@@ -211,9 +837,35 @@ class AdaptationNetTrainer:
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Train the AdaptationNet clustering model.")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Train out-of-core with chunked reads and MiniBatchKMeans")
+    parser.add_argument('--chunksize', type=int, default=100000, help="Rows per chunk in streaming mode")
+    parser.add_argument('--sample-size', type=int, default=10000,
+                        help="Rows kept for the quality report in streaming mode")
+    parser.add_argument('--epochs', type=int, default=1, help="Passes over the data in streaming mode")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Update the saved models with rows appended since the last training")
+    parser.add_argument('--iterations', type=int, default=3,
+                        help="Centroid update passes over the new rows in incremental mode")
+    parser.add_argument('--compare-full', action='store_true',
+                        help="In incremental mode, also report centroid drift against a full refit")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Parse the CSV directly instead of using the columnar dataset cache")
+    parser.add_argument('--clusters', type=int, default=5, help="Number of clusters")
+    parser.add_argument('--force', action='store_true',
+                        help="Rerun every pipeline stage even if its inputs are unchanged")
+    args = parser.parse_args()
+
     try:
         trainer = AdaptationNetTrainer()
-        trainer.train()
+        trainer.use_cache = not args.no_cache
+        if args.incremental:
+            trainer.train_incremental(args.iterations, args.chunksize, args.compare_full)
+        elif args.streaming:
+            trainer.train_streaming(args.chunksize, args.sample_size, args.epochs)
+        else:
+            trainer.train(n_clusters=args.clusters, force=args.force)
     except Exception as e:
         print(f"Training failed: {str(e)}")
         exit(1)
@@ -0,0 +1,233 @@
+# dataset_cache.py
+"""Columnar cache of the training CSV as typed, memory-mapped NumPy files.
+
+The first load of a CSV converts it chunk by chunk, never holding the
+whole file in memory, into one directory per source content hash
+(``<cache_dir>/<sha256[:16]>/``) holding a ``.npy`` file per column plus
+``meta.json``. Numeric columns keep the dtype
+``pd.read_csv`` would give them, so values round-trip exactly; text
+columns are stored as categoricals, i.e. int16 codes (-1 for missing)
+with the categories listed in ``meta.json``. Later loads of the same
+content memory-map only the requested columns instead of parsing the CSV.
+
+Hashing a large CSV takes a while, so ``index.json`` remembers the hash
+of each source path together with its size and mtime; the file is only
+re-hashed when those change. Entries no longer named by the index, such
+as those of a CSV's earlier contents, are deleted. Usage:
+
+    python scripts/dataset_cache.py data/climate_vulnerability_dataset.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 500000
+CODE_DTYPE = np.int16
+META_FILENAME = "meta.json"
+INDEX_FILENAME = "index.json"
+ENTRY_NAME = re.compile(r"[0-9a-f]{16}")
+
+def file_sha256(path, block_size=2 ** 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def source_hash(source, cache_dir):
+    """Content hash of ``source``, reusing the recorded one while size and mtime are unchanged."""
+    st = os.stat(source)
+    index_path = os.path.join(cache_dir, INDEX_FILENAME)
+    index = _read_json(index_path, {})
+    key = os.path.abspath(source)
+    entry = index.get(key)
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["sha256"]
+
+    sha256 = file_sha256(source)
+    index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2)
+    return sha256
+
+def _scan(source, chunksize):
+    """First pass: column kinds, numeric dtypes, the categories of text columns and the row count."""
+    kinds, dtypes, categories, n_rows = None, {}, {}, 0
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        if kinds is None:
+            kinds = {
+                col: "numeric" if pd.api.types.is_numeric_dtype(chunk[col]) else "categorical"
+                for col in chunk.columns
+            }
+            categories = {col: set() for col, kind in kinds.items() if kind == "categorical"}
+        for col, kind in kinds.items():
+            if kind == "numeric":
+                dtype = pd.to_numeric(chunk[col], errors="coerce").dtype
+                # Chunks may differ (e.g. ints in one, NaN in another); promote like a single read_csv
+                dtypes[col] = np.result_type(dtypes[col], dtype) if col in dtypes else dtype
+            else:
+                categories[col].update(chunk[col].dropna().astype(object).unique())
+        n_rows += len(chunk)
+    if not n_rows:
+        raise ValueError(f"{source} has no rows")
+    for col, values in categories.items():
+        if len(values) > np.iinfo(CODE_DTYPE).max:
+            raise ValueError(f"Column {col} has too many categories to cache")
+        categories[col] = pd.Index(list(values), dtype=object).sort_values()
+    return kinds, dtypes, categories, n_rows
+
+def build_cache(source, entry_dir, sha256, chunksize=DEFAULT_CHUNK_SIZE):
+    """Convert ``source`` into a cache entry, column types taken from the first chunk.
+
+    Reads the CSV twice: once to settle the dtypes, categories and row
+    count, then again to fill memory-mapped ``.npy`` files chunk by chunk,
+    so at most one chunk is held in memory.
+    """
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    # Build next to the final location and rename, so a crash never leaves a partial entry
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".building-")
+    try:
+        kinds, dtypes, categories, n_rows = _scan(source, chunksize)
+
+        columns, arrays = {}, {}
+        for i, (col, kind) in enumerate(kinds.items()):
+            meta = {"kind": kind, "dtype": np.dtype(dtypes[col] if kind == "numeric" else CODE_DTYPE).str,
+                    "file": f"{i}.npy"}
+            if kind == "categorical":
+                meta["categories"] = categories[col].tolist()
+            columns[col] = meta
+            arrays[col] = np.lib.format.open_memmap(
+                os.path.join(tmp_dir, meta["file"]), mode="w+", dtype=meta["dtype"], shape=(n_rows,)
+            )
+
+        start = 0
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            stop = start + len(chunk)
+            if stop > n_rows:
+                raise ValueError(f"{source} changed while it was being cached")
+            for col, kind in kinds.items():
+                if kind == "numeric":
+                    arrays[col][start:stop] = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=dtypes[col])
+                else:
+                    # Codes against the categories of the whole file (-1 for missing)
+                    arrays[col][start:stop] = pd.Categorical(
+                        chunk[col].astype(object), categories=categories[col]
+                    ).codes
+            start = stop
+        if start != n_rows:
+            raise ValueError(f"{source} changed while it was being cached")
+        for values in arrays.values():
+            values.flush()
+        del arrays
+
+        with open(os.path.join(tmp_dir, META_FILENAME), "w") as f:
+            json.dump({
+                "source": os.path.abspath(source),
+                "sha256": sha256,
+                "rows": n_rows,
+                "created": time.time(),
+                "columns": columns
+            }, f, indent=2)
+        if os.path.isdir(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+def evict_stale(cache_dir):
+    """Delete cache entries whose hash no source in the index has anymore."""
+    index = _read_json(os.path.join(cache_dir, INDEX_FILENAME), {})
+    live = {entry["sha256"][:16] for entry in index.values()}
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if ENTRY_NAME.fullmatch(name) and name not in live and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+def ensure_cache(source, cache_dir, chunksize=DEFAULT_CHUNK_SIZE):
+    """Return the metadata of the cache entry for ``source``, building it if needed."""
+    sha256 = source_hash(source, cache_dir)
+    entry_dir = os.path.join(cache_dir, sha256[:16])
+    meta = _read_json(os.path.join(entry_dir, META_FILENAME), None)
+    if meta is None or meta["sha256"] != sha256:
+        start = time.perf_counter()
+        build_cache(source, entry_dir, sha256, chunksize)
+        meta = _read_json(os.path.join(entry_dir, META_FILENAME), None)
+        print(f"Cached {meta['rows']} rows of {source} in {time.perf_counter() - start:.1f}s")
+        evict_stale(cache_dir)
+    meta["dir"] = entry_dir
+    return meta
+
+def _column(meta, col, start=None, stop=None):
+    """One column as a NumPy array or Categorical; numeric slices stay memory-mapped."""
+    info = meta["columns"][col]
+    values = np.load(os.path.join(meta["dir"], info["file"]), mmap_mode="r")[start:stop]
+    if info["kind"] == "numeric":
+        return values
+    return pd.Categorical.from_codes(values, categories=info["categories"])
+
+def _select(meta, columns):
+    columns = list(meta["columns"]) if columns is None else list(columns)
+    missing = [col for col in columns if col not in meta["columns"]]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+    return columns
+
+def _frame(meta, columns, start=None, stop=None):
+    # Copy numbers out of the memory map so the frame is writable like a read_csv result
+    data = {}
+    for col in columns:
+        values = _column(meta, col, start, stop)
+        data[col] = np.array(values) if isinstance(values, np.ndarray) else values
+    start = start or 0
+    stop = meta["rows"] if stop is None else min(stop, meta["rows"])
+    return pd.DataFrame(data, index=pd.RangeIndex(start, stop))
+
+def read_cached(meta, columns=None):
+    """Load ``columns`` (default: all) of a cache entry as a DataFrame."""
+    return _frame(meta, _select(meta, columns))
+
+def iter_cached(meta, chunksize, columns=None):
+    """Yield DataFrames of at most ``chunksize`` rows, reading only those rows from disk."""
+    columns = _select(meta, columns)
+    for start in range(0, meta["rows"], chunksize):
+        yield _frame(meta, columns, start, start + chunksize)
+
+def load_dataset(source, columns=None, cache_dir=None, chunksize=DEFAULT_CHUNK_SIZE):
+    """``pd.read_csv(source, usecols=columns)`` served from the columnar cache."""
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(source)), ".cache")
+    return read_cached(ensure_cache(source, cache_dir, chunksize), columns)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the columnar cache of a CSV dataset.")
+    parser.add_argument("source", help="CSV file to cache")
+    parser.add_argument("--cache-dir", help="Cache directory (default: .cache next to the source)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk while converting")
+    args = parser.parse_args()
+
+    cache_dir = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.source)), ".cache")
+    meta = ensure_cache(args.source, cache_dir, args.chunksize)
+    print(f"{meta['dir']}: {meta['rows']} rows")
+    for col, info in meta["columns"].items():
+        detail = f"{len(info['categories'])} categories" if info["kind"] == "categorical" else info["dtype"]
+        print(f"  {col:<24} {info['kind']:<12} {detail}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# model_selection.py
+"""Choose the number of clusters with a parallel KMeans sweep.
+
+The dataset is loaded and preprocessed once; the resulting feature matrix
+is saved as .npy and memory-mapped by every worker process, which fits
+KMeans for one (k, seed) pair and scores it by inertia and a sampled
+silhouette coefficient. Workers send back only the scores and centroids;
+the chosen model is rebuilt from its centroids in the parent. Usage:
+
+    python scripts/model_selection.py --k 3 4 5 6 7 8 --seeds 0 1 2 --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+
+from AdaptnetTM import AdaptationNetTrainer
+
+def fit_candidate(matrix_path, k, seed, n_init, silhouette_sample):
+    """Fit one KMeans candidate on the memory-mapped matrix; return its scores and centroids."""
+    # Parallelism comes from the process pool, so keep each fit single-threaded
+    with threadpool_limits(limits=1):
+        X = np.load(matrix_path, mmap_mode='r')
+        start = time.perf_counter()
+        kmeans = KMeans(n_clusters=k, random_state=seed, n_init=n_init).fit(X)
+        fit_seconds = time.perf_counter() - start
+
+        rng = np.random.default_rng(seed)
+        size = min(silhouette_sample, len(X))
+        index = np.sort(rng.choice(len(X), size=size, replace=False))
+        silhouette = float(silhouette_score(X[index], kmeans.labels_[index]))
+
+    return {
+        "k": k,
+        "seed": seed,
+        "inertia": float(kmeans.inertia_),
+        "silhouette": silhouette,
+        "iterations": int(kmeans.n_iter_),
+        "fit_seconds": fit_seconds
+    }, kmeans.cluster_centers_
+
+def run_sweep(matrix_path, ks, seeds, n_init=10, silhouette_sample=10000, workers=None):
+    """Fit every (k, seed) pair in parallel; return results and centroids by (k, seed)."""
+    results, centers = [], {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(fit_candidate, matrix_path, k, seed, n_init, silhouette_sample)
+            for k in ks for seed in seeds
+        ]
+        for future in futures:
+            result, cluster_centers = future.result()
+            print(f"k={result['k']:<3} seed={result['seed']:<4} inertia={result['inertia']:.1f} "
+                  f"silhouette={result['silhouette']:.4f} ({result['fit_seconds']:.1f}s)")
+            results.append(result)
+            centers[(result["k"], result["seed"])] = cluster_centers
+    return results, centers
+
+def rebuild(X, cluster_centers):
+    """Fitted KMeans for centroids a worker already converged.
+
+    Runs a single Lloyd iteration from them (one assignment pass, a
+    centroid update that barely moves converged centers, and the final
+    assignment), which sets ``labels_`` and ``inertia_`` without refitting.
+    """
+    return KMeans(n_clusters=len(cluster_centers), init=cluster_centers, n_init=1, max_iter=1).fit(X)
+
+def summarize(results):
+    """Aggregate candidate results per k."""
+    frame = pd.DataFrame(results)
+    summary = frame.groupby("k").agg(
+        mean_inertia=("inertia", "mean"),
+        mean_silhouette=("silhouette", "mean"),
+        std_silhouette=("silhouette", "std"),
+        candidates=("seed", "count")
+    ).reset_index()
+    # A single seed per k has no spread; report 0 rather than NaN
+    summary["std_silhouette"] = summary["std_silhouette"].fillna(0.0)
+    return frame, summary
+
+def choose(frame, summary, k=None):
+    """Pick k (highest mean silhouette unless given) and its lowest-inertia seed."""
+    if k is None:
+        k = int(summary.loc[summary["mean_silhouette"].idxmax(), "k"])
+    candidates = frame[frame["k"] == k]
+    if candidates.empty:
+        raise ValueError(f"k={k} was not part of the sweep")
+    best = candidates.loc[candidates["inertia"].idxmin()]
+    return int(best["k"]), int(best["seed"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel KMeans model selection for AdaptationNet.")
+    parser.add_argument('--k', type=int, nargs='+', default=[3, 4, 5, 6, 7, 8], help="Cluster counts to try")
+    parser.add_argument('--seeds', type=int, nargs='+', default=[42], help="Random seeds per k")
+    parser.add_argument('--n-init', type=int, default=10, help="KMeans restarts per candidate")
+    parser.add_argument('--silhouette-sample', type=int, default=10000, help="Rows used for silhouette")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--choose-k', type=int, default=None, help="Save this k instead of the best silhouette")
+    parser.add_argument('--no-save', action='store_true', help="Only write the report, keep the current model")
+    args = parser.parse_args()
+
+    try:
+        trainer = AdaptationNetTrainer()
+        watermark = trainer.dataset_watermark()
+        # The sweep needs only the features; saving rewrites clustered_data.csv, which keeps every column
+        columns = trainer.numerical_cols + trainer.categorical_cols if args.no_save else None
+        dataset = trainer.load_dataset(columns)
+        # With --no-save the current model and its preprocessors stay untouched
+        processed_data, feature_cols = trainer.preprocess_data(dataset, save=not args.no_save)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            matrix_path = os.path.join(work_dir, 'features.npy')
+            np.save(matrix_path, processed_data[feature_cols].to_numpy(dtype=np.float32))
+
+            print(f"\nFitting {len(args.k) * len(args.seeds)} candidates...")
+            results, centers = run_sweep(
+                matrix_path, args.k, args.seeds, args.n_init, args.silhouette_sample, args.workers
+            )
+
+        frame, summary = summarize(results)
+        k, seed = choose(frame, summary, args.choose_k)
+
+        report_path = os.path.join(trainer.model_dir, 'model_selection_report.json')
+        with open(report_path, 'w') as f:
+            json.dump({
+                "feature_cols": feature_cols,
+                "rows": len(processed_data),
+                "candidates": frame.to_dict(orient='records'),
+                "summary": summary.to_dict(orient='records'),
+                "chosen": {"k": k, "seed": seed}
+            }, f, indent=2)
+        frame.to_csv(os.path.join(trainer.model_dir, 'model_selection_report.csv'), index=False)
+
+        print("\nSummary per k:")
+        print(summary.to_string(index=False))
+        print(f"\nChosen model: k={k}, seed={seed}. Report written to {report_path}")
+
+        if not args.no_save:
+            kmeans_model = rebuild(processed_data[feature_cols], centers[(k, seed)])
+            kmeans_model = trainer.finalize_kmeans(kmeans_model, feature_cols)
+            joblib.dump(kmeans_model, os.path.join(trainer.model_dir, 'kmeans_model.pkl'))
+            print("Chosen KMeans model saved successfully!")
+            trainer.analyze_clusters(processed_data, feature_cols, kmeans_model)
+            trainer.export_bundle()
+            # Keep incremental retraining consistent with the model just saved
+            sizes = np.bincount(processed_data['Cluster'], minlength=kmeans_model.n_clusters)
+            trainer.save_training_state(watermark, len(processed_data), sizes, 'model_selection', kmeans_model)
+    except Exception as e:
+        print(f"Model selection failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
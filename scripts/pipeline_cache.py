@@ -0,0 +1,81 @@
+# pipeline_cache.py
+"""Skip training pipeline stages whose inputs have not changed.
+
+Each stage is identified by a key: a hash of everything it depends on
+(upstream stage keys, parameters, column lists, mappings and the source
+code of the functions that implement it). After a stage runs, its key
+and a fingerprint (size, mtime) of every output file are recorded in
+``state.json``. On the next run a stage is fresh, and can be skipped, if
+its key is unchanged and its outputs are still exactly the files it
+wrote; ``force=True`` disables skipping.
+"""
+import hashlib
+import inspect
+import json
+import os
+import time
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+def code_key(*functions):
+    """Hash of the source of ``functions``, so editing a stage invalidates it."""
+    return hashlib.sha256("\n".join(inspect.getsource(fn) for fn in functions).encode()).hexdigest()
+
+class StageCache:
+    def __init__(self, state_path, force=False):
+        self.state_path = state_path
+        self.force = force
+        try:
+            with open(state_path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+        self.report = []
+
+    @staticmethod
+    def key(*parts):
+        """Stable hash of JSON-serializable ``parts`` (dict keys are sorted)."""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def fresh(self, stage, key):
+        """Whether ``stage`` last ran with ``key`` and its outputs are untouched since."""
+        entry = self.state.get(stage)
+        if self.force or entry is None or entry["key"] != key:
+            return False
+        try:
+            return all(_fingerprint(path) == fingerprint for path, fingerprint in entry["outputs"].items())
+        except OSError:
+            return False
+
+    def run(self, stage, key, outputs, fn):
+        """Run ``fn`` unless ``stage`` is fresh; record its outputs and timing either way."""
+        if self.fresh(stage, key):
+            self.report.append({"stage": stage, "ran": False, "seconds": 0.0})
+            return False
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+        self.state[stage] = {
+            "key": key,
+            "outputs": {path: _fingerprint(path) for path in outputs},
+            "seconds": seconds,
+            "finished_at": time.time()
+        }
+        self.save()
+        self.report.append({"stage": stage, "ran": True, "seconds": seconds})
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def print_report(self):
+        print("\nPipeline stages:")
+        for entry in self.report:
+            status = f"ran in {entry['seconds']:.2f}s" if entry["ran"] else "skipped (unchanged)"
+            print(f"  {entry['stage']:<12} {status}")